@@ -48,7 +48,8 @@ display.setrotation(0)
 
 # Specify the image-filename to display on the screen.
 # The image-file must:
-# - be in  24bit(!!!) *.bmp format AND 
+# - be in 24bit or 1/2/4/8bit palettized *.bmp format AND
+#   (tools/pl_convert.py --format bmp converts any image into a small 4bit one)
 # - fit in size (pixel*pixel) to the display-dimensions (smaller is possible) AND
 # - stored in the root-directory of the microcontroller-board 
 
@@ -10,6 +10,7 @@ import digitalio
 import busio
 import board
 from pl_uc8156 import PL_UC8156
+import pl_log
 
 
 ble = BLERadio()
@@ -175,6 +176,21 @@ while True:
                     display.image_bmp(filename = str(argument[0]))
                     display.update(0)
                     
+                elif (command == 'spistats'):
+                    # counts the SPI-traffic of the following commands and sends the counters
+                    # and the trace of the last transactions back
+                    # Arguments: 1 = start counting (trace of 32 transactions), 0 = send and stop
+                    if int(argument[0]):
+                        display.setspistats(True, trace = 32)
+                    elif display.getspistats() is not None:
+                        display.getspistats().dump(lambda line: uart_server.write((line + "\n").encode()))
+                        display.setspistats(False)
+                    
+                elif (command == 'log'):
+                    # sends the messages kept in the event-log of the driver (see pl_log) back
+                    # Arguments: none
+                    pl_log.dump(lambda line: uart_server.write((line + "\n").encode()))
+                    
                 else:
                     print("Unknown command")
    
@@ -0,0 +1,48 @@
+# SETUP
+# =====
+# Two displays sharing one SPI-bus, each with its own chip-select, reset and busy pin.
+# Both are updated at the same time: the images are uploaded one after the other and the
+# update-cycles of the displays overlap.
+
+import digitalio
+import busio
+import board
+import pl_bus
+from pl_uc8156 import PL_UC8156
+
+# create the spi-device shared by both displays
+spi = busio.SPI(clock = board.SCK, MOSI = board.MOSI, MISO = board.MISO)
+
+# the first display wired like in simpletest.py, the second one at D6 (cs), D13 (reset) and D10 (busy)
+left = PL_UC8156(spi = spi, cs_pin = digitalio.DigitalInOut(board.D5),
+                 rst_pin = digitalio.DigitalInOut(board.D12), busy_pin = digitalio.DigitalInOut(board.D9))
+right = PL_UC8156(spi = spi, cs_pin = digitalio.DigitalInOut(board.D6),
+                  rst_pin = digitalio.DigitalInOut(board.D13), busy_pin = digitalio.DigitalInOut(board.D10))
+
+# the bus-manager keeps track of both displays
+bus = pl_bus.PL_Bus((left, right))
+
+WHITE = PL_UC8156.WHITE
+BLACK = PL_UC8156.BLACK
+
+
+# DRAWING FUNCTIONS
+# =================
+
+# MANDATORY command! Begin communication with all displays
+bus.begin(reset = False)
+
+# every display is drawn on like a single one
+left.fill(color = WHITE)
+left.text(string = 'left', x = 1, y = 1, color = BLACK, font_name = 'font5x8.bin')
+right.fill(color = WHITE)
+right.text(string = 'right', x = 1, y = 1, color = BLACK, font_name = 'font5x8.bin')
+right.circle(center_x = right._width // 2, center_y = right._height // 2, radius = 20, color = BLACK)
+
+# Update all displays at once, takes about as long as the update of one display
+# mode: 0 = full update, 1 = only changed pixels are updated, 2 = monochrome
+bus.update(mode = 0)
+
+# only some of the displays can be updated as well
+right.fill_rect(x = 0, y = 10, width = 18, height = 18, color = BLACK)
+bus.update(mode = 1, displays = (right,))
@@ -59,6 +59,10 @@ display.set_vborder_color(color = BLACK)
 # 3 = 270° rotation clockwise
 display.setrotation(0)
 
+# OPTIONAL: let the driver turn the image while uploading it instead of rotating every
+# pixel while drawing (faster drawing of images, rows and blits at 90/ 180/ 270 degrees)
+# display.sethwrotation(True)
+
 # NOTE: The used cordinate-system also rotates accordingly,
 # with origin at the top-left, X-positive right, Y-positive down
 
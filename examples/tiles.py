@@ -0,0 +1,50 @@
+# SETUP
+# =====
+# Two displays side by side used as one drawing surface. Drawing-calls are split between the
+# displays, an update only uploads and refreshes the displays whose content changed.
+
+import digitalio
+import busio
+import board
+import pl_tiles
+from pl_uc8156 import PL_UC8156
+
+# create the spi-device shared by both displays
+spi = busio.SPI(clock = board.SCK, MOSI = board.MOSI, MISO = board.MISO)
+
+# the first display wired like in simpletest.py, the second one at D6 (cs), D13 (reset) and D10 (busy)
+left = PL_UC8156(spi = spi, cs_pin = digitalio.DigitalInOut(board.D5),
+                 rst_pin = digitalio.DigitalInOut(board.D12), busy_pin = digitalio.DigitalInOut(board.D9))
+right = PL_UC8156(spi = spi, cs_pin = digitalio.DigitalInOut(board.D6),
+                  rst_pin = digitalio.DigitalInOut(board.D13), busy_pin = digitalio.DigitalInOut(board.D10))
+
+# the right display is mounted upside down, 8 pixel of bezel lie between both panels
+tiles = pl_tiles.PL_Tiles()
+tiles.add(left, x = 0, y = 0)
+tiles.add(right, x = left._width + 8, y = 0, rotation = 2)
+
+WHITE = PL_UC8156.WHITE
+LGRAY = PL_UC8156.LGRAY
+BLACK = PL_UC8156.BLACK
+
+
+# DRAWING FUNCTIONS
+# =================
+
+# MANDATORY command! Begin communication with all displays
+tiles.begin(reset = False)
+
+# drawn across both displays
+tiles.fill(color = WHITE)
+tiles.rect(x = 0, y = 0, width = tiles.width, height = tiles.height, color = BLACK)
+tiles.line(x_0 = 0, y_0 = 0, x_1 = tiles.width - 1, y_1 = tiles.height - 1, color = BLACK)
+tiles.fill_circle(center_x = tiles.width // 2, center_y = tiles.height // 2, radius = 30, color = LGRAY)
+tiles.text(string = 'one surface', x = 4, y = 4, color = BLACK, size = 2)
+
+# both displays changed and are updated at once
+# mode: 0 = full update, 1 = only changed pixels are updated, 2 = monochrome
+tiles.update(mode = 0)
+
+# only the left display changed, the right one isn't updated
+tiles.fill_rect(x = 4, y = 30, width = 10, height = 10, color = BLACK)
+tiles.update(mode = 1)
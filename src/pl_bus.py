@@ -0,0 +1,111 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_bus'
+# ====================================================
+# CircuitPython module driving several displays on one SPI-bus
+# * Author(s): pl-micro-epd contributors
+#
+# Every display (PL_UC8156) has its own CS-, RST- and BUSY-pin, the SPI-bus is shared. A
+# display needs the bus only for its commands and the upload of its image, not while its
+# display engine runs the waveform (~800 ms for a full update). update() uploads to one
+# display after the other and starts the engine of each right after its upload, then waits
+# for all of them, watching every busy pin on its own. Updating N displays takes about the
+# time of one update-cycle plus N uploads instead of N update-cycles.
+# Each display scrambles its uploads with the configuration of its own panel, so displays
+# with different panels can be mixed. Overlapping needs the busy pins: a display without one
+# is finished (powered down) right after its start, like with its own update().
+#
+# usage:
+#   spi = busio.SPI(clock=board.SCK, MOSI=board.MOSI, MISO=board.MISO)
+#   left = PL_UC8156(spi, cs_pin=..., rst_pin=..., busy_pin=...)
+#   right = PL_UC8156(spi, cs_pin=..., rst_pin=..., busy_pin=...)
+#   bus = pl_bus.PL_Bus((left, right))
+#   bus.begin()
+#   ... draw on both ...
+#   bus.update(0)
+
+import time
+
+
+class PL_Bus:
+    # the displays sharing one SPI-bus
+
+    def __init__(self, displays=()):
+        self.displays = list(displays)
+
+    def add(self, display):
+        self.displays.append(display)
+
+    def begin(self, reset=False):
+        for display in self.displays:
+            display.begin(reset)
+
+    def update(self, mode, displays=None):
+    # uploads the framebuffers of ``displays`` (all by default) and updates them with ``mode``
+    # (see PL_UC8156.update), the update-cycles overlap. Every display gets one record of
+    # the update in its stats (its engine-phase includes the time spent on the others).
+        displays = self.displays if displays is None else displays
+        recorded = []
+        running = []
+        try:
+            for display in displays:
+                display.stats.begin(mode)
+                recorded.append(display)
+                display.write_ram()
+                display.start_refresh(mode)
+                running.append(display)
+        finally:
+            # started update-cycles are finished even if an upload failed
+            try:
+                self.wait(running)
+            finally:
+                for display in recorded:
+                    display.stats.end()
+
+    def refresh(self, mode, displays=None):
+    # updates ``displays`` (all by default) with the images already in their RAM
+        displays = self.displays if displays is None else displays
+        started = []
+        try:
+            for display in displays:
+                display.start_refresh(mode)
+                started.append(display)
+        finally:
+            self.wait(started)
+
+    def wait(self, displays, poll=0.001):
+    # waits for the update-cycles of ``displays`` (started with start_refresh), each display is
+    # finished and powered down as soon as its busy pin reports the end of the cycle
+        running = list(displays)
+        while running:
+            for display in running:
+                if not display.isbusy():
+                    running.remove(display)
+                    display.finish_refresh()
+                    break
+            else:
+                time.sleep(poll)
+
+    def busy(self):
+    # the displays which are busy at the moment
+        return [display for display in self.displays if display.isbusy()]
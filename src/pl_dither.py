@@ -0,0 +1,148 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_dither'
+# ====================================================
+# CircuitPython dithering module
+# * Author(s): pl-micro-epd contributors
+#
+# Converts 8 bit gray values (0 = black ... 255 = white) into the four graylevels row by row.
+# Error diffusion only keeps the errors of the rows below the current one, no full-frame buffer.
+# All calculations are done with integers so that tools/pl_convert.py (NumPy) produces exactly
+# the same result on the host.
+
+BAYER = 'bayer'
+FLOYD_STEINBERG = 'floyd-steinberg'
+ATKINSON = 'atkinson'
+METHODS = (BAYER, FLOYD_STEINBERG, ATKINSON)
+
+# 4x4 Bayer-matrix (thresholds 0...15), indexed by (y & 3) * 4 + (x & 3)
+BAYER_MATRIX = bytes((0, 8, 2, 10,
+                      12, 4, 14, 6,
+                      3, 11, 1, 9,
+                      15, 7, 13, 5))
+
+# error diffusion: (dx, dy, weight) of the neighbours getting the error, and the divisor
+KERNELS = {
+    FLOYD_STEINBERG: (((1, 0, 7), (-1, 1, 3), (0, 1, 5), (1, 1, 1)), 16),
+    ATKINSON: (((1, 0, 1), (2, 0, 1), (-1, 1, 1), (0, 1, 1), (1, 1, 1), (0, 2, 1)), 8),
+}
+
+# gray value of the graylevels 0...3
+LEVEL_VALUE = (0, 85, 170, 255)
+
+
+def bayer_level(value, threshold):
+# graylevel of a gray value with the Bayer-threshold (0...15) of its position:
+# floor(value * 3 / 255 + (threshold + 0.5) / 16) in integers
+    level = (96 * value + 255 * (2 * threshold + 1)) // 8160
+    return 3 if level > 3 else level
+
+
+def nearest_level(value):
+# closest graylevel of a (possibly out of range) gray value
+    level = (value * 3 + 127) // 255
+    if level < 0:
+        return 0
+    return 3 if level > 3 else level
+
+
+class Ditherer:
+    # Dithers an image of ``width`` pixel row by row with one of METHODS, the rows have to be
+    # passed in the order they should be diffused in (usually top to bottom).
+
+    def __init__(self, width, method=FLOYD_STEINBERG):
+        if method not in METHODS:
+            raise ValueError("Unknown dithering method: " + str(method))
+        self.width = width
+        self.method = method
+        # error-rows of the current and the next one (two for Atkinson) rows,
+        # with two pixels of margin on both sides
+        if method == ATKINSON:
+            self._errors = [[0] * (width + 4) for _ in range(3)]
+        elif method == FLOYD_STEINBERG:
+            self._errors = [[0] * (width + 4) for _ in range(2)]
+        self._zeros = [0] * (width + 4)
+
+    def reset(self):
+    # forgets the errors of the rows passed so far, e.g. for the next image
+        if self.method != BAYER:
+            for errors in self._errors:
+                errors[:] = self._zeros
+
+    def row(self, y, gray, levels):
+    # dithers the gray values of row y into ``levels`` (0...3)
+        if self.method == BAYER:
+            self._bayer(y, gray, levels)
+        elif self.method == FLOYD_STEINBERG:
+            self._floyd_steinberg(gray, levels)
+        else:
+            self._atkinson(gray, levels)
+
+    def _bayer(self, y, gray, levels):
+        matrix = BAYER_MATRIX
+        offset = (y & 0x03) << 2
+        for x in range(self.width):
+            level = (96 * gray[x] + 255 * (2 * matrix[offset + (x & 0x03)] + 1)) // 8160
+            levels[x] = 3 if level > 3 else level
+
+    def _floyd_steinberg(self, gray, levels):
+        current, below = self._errors
+        index = 2
+        for x in range(self.width):
+            value = gray[x] + current[index]
+            level = (value * 3 + 127) // 255
+            if level < 0:
+                level = 0
+            elif level > 3:
+                level = 3
+            levels[x] = level
+            error = value - level * 85
+            current[index + 1] += error * 7 // 16
+            below[index - 1] += error * 3 // 16
+            below[index] += error * 5 // 16
+            below[index + 1] += error // 16
+            index += 1
+        current[:] = self._zeros
+        self._errors = [below, current]
+
+    def _atkinson(self, gray, levels):
+        current, below, below2 = self._errors
+        index = 2
+        for x in range(self.width):
+            value = gray[x] + current[index]
+            level = (value * 3 + 127) // 255
+            if level < 0:
+                level = 0
+            elif level > 3:
+                level = 3
+            levels[x] = level
+            error = (value - level * 85) // 8
+            current[index + 1] += error
+            current[index + 2] += error
+            below[index - 1] += error
+            below[index] += error
+            below[index + 1] += error
+            below2[index] += error
+            index += 1
+        current[:] = self._zeros
+        self._errors = [below, below2, current]
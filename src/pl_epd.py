@@ -29,13 +29,26 @@
 # License: MIT License (https://opensource.org/licenses/MIT)
 
 import time
+import struct
+import array
 from digitalio import Direction
 import busio
 from micropython import const
 import pl_framebuf
 import pl_scrambler
+import pl_dither
+import pl_timing
+import pl_spistats
+import pl_log
 
 
+# gray value (0...255) for each sum of the three 8-bit color-values of a pixel (0...765)
+_GRAYVALUE = bytes((rgb_sum // 3) for rgb_sum in range(766))
+
+# graylevel for each sum of the three 8-bit color-values of a pixel (0...765),
+# thresholds of (b + g + r) // 3 at 0x40, 0x80 and 0xc0
+_GRAYLEVEL = bytes(((rgb_sum // 3) >> 6) for rgb_sum in range(766))
+
 
 class PL_EPD:
     
@@ -48,6 +61,9 @@ class PL_EPD:
     def __init__(self, spi, cs_pin, rst_pin, busy_pin):
         
         self._framebuf = None
+        
+        # display-list of the deferred rendering mode, None in immediate mode (default)
+        self._displaylist = None
                        
         # Setup of image-rotation
         # 0 = 0° rotation (default)
@@ -55,9 +71,30 @@ class PL_EPD:
         # 2 = 180° rotation clockwise
         # 3 = 270° rotation clockwise
         self.rotation = 0
+        # False: the framebuffer rotates every pixel while drawing (default), True: the driver
+        # turns the image while uploading it where it can (see sethwrotation)
+        self._hwrotation = False
         
         # initial value for epd-type, will be auto-updated 
         self.epdsize = 99
+        
+        # scrambling of the panel (see pl_scrambler), set by the subclass when the panel is
+        # detected and handed to pl_scrambler before every upload, so that displays with
+        # different panels can share the module (see pl_bus). None: pl_scrambler is used as set.
+        self._scramblemode = None
+        self._slcount = 0
+        self._glcount = 0
+        
+        # timing of the phases of every update, see pl_timing
+        self.stats = pl_timing.UpdateStats()
+        
+        # SPI-traffic accounting, None while disabled (see setspistats)
+        self._spistats = None
+        
+        # buffers of the command-byte and of read_byte, preallocated so register-accesses
+        # don't allocate anything
+        self._cmdbuf = bytearray(1)
+        self._readbuf = bytearray(1)
                               
         # Setup reset pin, if we have one
         self._rst = rst_pin
@@ -80,7 +117,7 @@ class PL_EPD:
         self._spi_polarity = 1
         self._spi_phase = 1
                      
-        print("Init EPD...")
+        pl_log.info("Init EPD...")
         
     def getrotation(self):
         return self.rotation
@@ -94,9 +131,34 @@ class PL_EPD:
             self._width += self._height
             self._height = self._width - self._height
             self._width -= self._height
+        # pending commands of the display-list were recorded for the previous rotation
+        self.render()
         # handover of new assigned rotation-modes
+        # With sethwrotation(True) a change between portrait- and landscape-mode may replace
+        # the framebuffer by one of the new geometry (getframebuf returns the current one), its
+        # content is not preserved and has to be drawn again.
         self.rotation = x
-        self._framebuf._rotation = x
+        self._rotate_framebuf(x)
+        
+    def _rotate_framebuf(self, rotation):
+        # sets up the framebuffer for ``rotation``, rotated while drawing unless the subclass
+        # rotates the uploads (see sethwrotation)
+        self._framebuf._rotation = rotation
+        
+    def gethwrotation(self):
+        return self._hwrotation
+        
+    def sethwrotation(self, x):
+        # True: the framebuffer is drawn on in the orientation of the rotated display, without
+        # rotating every pixel, and the driver turns the image while uploading it (see
+        # PL_UC8156._rotate_framebuf). False: the framebuffer rotates while drawing (default).
+        # The content of the framebuffer is not preserved: in portrait-mode (rotation 1 or 3)
+        # the framebuffer may be replaced by one of the new geometry (getframebuf returns the
+        # current one), otherwise the stored pixels are shown in the new orientation. Draw
+        # again after the change.
+        self.render()
+        self._hwrotation = bool(x)
+        self._rotate_framebuf(self.rotation)
                
     def getframebuf(self):
         return self._framebuf
@@ -104,6 +166,33 @@ class PL_EPD:
     def setframebuf(self, x):
         self._framebuf = x
         
+    def getstats(self):
+        # pl_timing.UpdateStats of the updates so far, stats.callback can be set to a function
+        # receiving the record of each update
+        return self.stats
+        
+    def getspistats(self):
+        # pl_spistats.SPIStats of the SPI-traffic since it was enabled, None if disabled
+        return self._spistats
+        
+    def setspistats(self, x, trace=0):
+        # Enables (True) or disables (False) counting the SPI-traffic, ``trace``: number of
+        # transactions kept in the trace (0: none)
+        self._spistats = pl_spistats.SPIStats(trace) if x else None
+        
+    def getstatic(self):
+        return not self.stats.enabled
+        
+    def setstatic(self, x):
+        # True: allocation-free steady state, repeated updates allocate nothing (see pl_memory).
+        # The timing of the updates is switched off, its records and timestamps are allocated.
+        self.stats.enabled = not x
+        
+    def getdirty(self):
+        # area of the framebuffer changed since the last upload as (x, y, width, height)
+        # in unrotated coordinates, None if nothing changed
+        return self._framebuf.dirty
+        
     def getbaudrate(self):
         return self._spi_baudrate
         
@@ -132,32 +221,54 @@ class PL_EPD:
             self._rst.value = True
             time.sleep(0.035)
     
-    def command(self, cmd, data):
+    def command(self, cmd, data, wait=True):
     # Send command byte followed by the instruction byte(s) to display.
+    # wait: waits for the busy pin afterwards, False returns right away (e.g. after starting
+    # the display engine, see isbusy)
+        spins = 0
         while not self._spi.try_lock():
-            pass
+            spins += 1
         self._spi.configure(baudrate = self._spi_baudrate, phase = self._spi_phase, polarity = self._spi_polarity)
         self._cs.value = False
-        self._spi.write(cmd.to_bytes(1, 1))
+        self._cmdbuf[0] = cmd
+        self._spi.write(self._cmdbuf)
         self._spi.write(data)
         self._cs.value = True
         self._spi.unlock()
-        self.busy_wait(0.001)
+        if self._spistats is not None:
+            self._spistats.transaction(cmd, 1 + len(data), 0, spins)
+        if wait:
+            self.busy_wait(0.001)
+        
+    def isbusy(self):
+        # True while the display is busy (busy pin low), always False without a busy pin
+        return self._busy is not None and not self._busy.value
         
     def read(self, cmd, amount_bytes):     
     # Send command byte and read register-value.
+        spi_buffer = bytearray(amount_bytes)
+        self.read_into(cmd, spi_buffer)
+        return spi_buffer
+        
+    def read_byte(self, cmd):
+    # reads a single byte register-value into a preallocated buffer, returned as int
+        self.read_into(cmd, self._readbuf)
+        return self._readbuf[0]
+        
+    def read_into(self, cmd, buffer):
+    # Send command byte and read len(buffer) bytes of register-value into buffer.
+        spins = 0
         while not self._spi.try_lock():
-            pass
+            spins += 1
         self._spi.configure(baudrate = self._spi_baudrate, phase = self._spi_phase, polarity = self._spi_polarity)
         self._cs.value = False
-        spi_buffer = bytearray(amount_bytes)
-        instruction = (cmd | 0x80).to_bytes(1, 1)
-        self._spi.write(instruction)
-        self._spi.readinto(spi_buffer)
+        self._cmdbuf[0] = cmd | 0x80
+        self._spi.write(self._cmdbuf)
+        self._spi.readinto(buffer)
         self._cs.value = True
         self._spi.unlock()
-        return spi_buffer
-        self.busy_wait(0.001)
+        if self._spistats is not None:
+            self._spistats.transaction(cmd | 0x80, 1, len(buffer), spins)
         
     def clear(self):
     # set all pixel-values to "white"
@@ -183,15 +294,29 @@ class PL_EPD:
     # Does not use drawing-functions of "pl_framebuf" module or scrambling 
     # to allow faster updates
     
+        if self._displaylist:
+            del self._displaylist[:]            # would be cleared from the buffer as well
+        stats = self.stats
+        stats.begin('whiteerase')
         tmp = pl_scrambler.getscramblemode()    # save scramblingmode in temporary variable
         pl_scrambler.setscramblemode(0)         # disable scrambling
-        self.clear()
-        self.update(2)
-        self.invert_buffer()
-        self.update(2)
-        self.invert_buffer()
-        self.update(2)
-        pl_scrambler.setscramblemode(tmp)       # restores original scramblingmode
+        scramblemode = self._scramblemode       # and the one of the panel (see _use_scrambling)
+        if scramblemode is not None:
+            self._scramblemode = 0
+        try:
+            self.clear()
+            stats.mark('buffer')
+            self.update(2)
+            self.invert_buffer()
+            stats.mark('buffer')
+            self.update(2)
+            self.invert_buffer()
+            stats.mark('buffer')
+            self.update(2)
+        finally:
+            pl_scrambler.setscramblemode(tmp)   # restores original scramblingmode
+            self._scramblemode = scramblemode
+            stats.end()
      
     def power_up(self):
         # Power up the display in preparation for writing RAM and updating.
@@ -206,6 +331,25 @@ class PL_EPD:
         # Update the display from internal memory, must be implemented in subclass
         raise NotImplementedError()
 
+    def start_refresh(self, mode):
+        # Starts the update-cycle without waiting for its end (see finish_refresh),
+        # must be implemented in subclass
+        raise NotImplementedError()
+
+    def finish_refresh(self):
+        # Waits for the end of the update-cycle started by start_refresh,
+        # must be implemented in subclass
+        raise NotImplementedError()
+
+    def _use_scrambling(self, rotation=0):
+        # configures pl_scrambler for the panel of this display before an upload, ``rotation``:
+        # 2 turns the uploaded image by 180 degrees (see pl_scrambler.setrotation)
+        pl_scrambler.setrotation(rotation)
+        if self._scramblemode is not None:
+            pl_scrambler.setscramblemode(self._scramblemode)
+            pl_scrambler.setslcount(self._slcount)
+            pl_scrambler.setglcount(self._glcount)
+
     def write_ram(self):
         # Send the one byte command for starting the RAM write process. 
         # must be implemented in subclass
@@ -215,38 +359,167 @@ class PL_EPD:
         # Set the RAM address location, must be implemented in subclass
         raise NotImplementedError()
         
+    def setdeferred(self, x):
+        # Enables (True) or disables (False) the deferred rendering mode. Drawing-calls are then
+        # recorded in a display-list of command-tuples instead of being rasterized immediately.
+        # At the next update, commands completely covered by a later fill/ fill_rect are dropped,
+        # the others are rasterized in one pass in their original order (overlapping
+        # commands can't be reordered without changing the result).
+        if x:
+            if self._displaylist is None:
+                self._displaylist = []
+        else:
+            self.render()
+            self._displaylist = None
+            
+    def getdeferred(self):
+        return self._displaylist is not None
+        
+    def render(self):
+        # Rasterizes all pending commands of the display-list into the framebuffer.
+        # Called by the upload to the display, does nothing in immediate mode.
+        commands = self._displaylist
+        if not commands:
+            return
+        # walk backwards through the list, collecting the areas later covered by opaque fills
+        covers = []
+        keep = []
+        for command in reversed(commands):
+            name, args, kwargs, x_0, y_0, x_1, y_1 = command
+            if x_0 is not None:
+                culled = False
+                for c_x0, c_y0, c_x1, c_y1 in covers:
+                    if c_x0 <= x_0 and c_y0 <= y_0 and x_1 <= c_x1 and y_1 <= c_y1:
+                        culled = True
+                        break
+                if culled:
+                    continue
+            keep.append(command)
+            if name == 'fill':
+                break   # everything drawn before is overwritten anyway
+            if name == 'fill_rect' and len(covers) < 8:
+                covers.append((x_0, y_0, x_1, y_1))
+        del commands[:]
+        
+        methods = {}
+        for name, args, kwargs, _, _, _, _ in reversed(keep):
+            method = methods.get(name)
+            if method is None:
+                method = methods[name] = getattr(self._framebuf, name)
+            if kwargs is None:
+                method(*args)
+            else:
+                method(*args, **kwargs)
+        
+    def _record(self, name, args, x_0=None, y_0=None, x_1=None, y_1=None, kwargs=None):     # pylint: disable=too-many-arguments
+        # appends a drawing-command with its bounding box (None if unknown) to the display-list
+        self._displaylist.append((name, args, kwargs, x_0, y_0, x_1, y_1))
+        
     def draw(self, func, args, color):
-        drw = getattr(self._framebuf, func)
-        drw(*args, color = color)
+        # generic drawing-call of the framebuffer-method ``func``
+        if self._displaylist is not None:
+            self._record(func, args, kwargs={'color': color})
+        else:
+            drw = getattr(self._framebuf, func)
+            drw(*args, color = color)
         
     def pixel(self, x, y, color):
         # draw a single pixel in the display buffer
-        self.draw('pixel', (x, y), color)
+        if self._displaylist is not None:
+            self._record('pixel', (x, y, color), x, y, x, y)
+        else:
+            self._framebuf.pixel(x, y, color)
         
     def fill(self, color):
         # fill the screen with the passed color
-        self._framebuf.fill(color)
+        if self._displaylist is not None:
+            self._record('fill', (color,))
+        else:
+            self._framebuf.fill(color)
         
     def rect(self, x, y, width, height, color):     # pylint: disable=too-many-arguments
         # draw a rectangle
-        self.draw('rect', (x, y, width, height), color)
+        if self._displaylist is not None:
+            self._record('rect', (x, y, width, height, color), x, y, x + width - 1, y + height - 1)
+        else:
+            self._framebuf.rect(x, y, width, height, color)
         
     def fill_rect(self, x, y, width, height, color):     # pylint: disable=too-many-arguments
         # fill a rectangle with the passed color
-        self.draw('fill_rect', (x, y, width, height), color)
+        if self._displaylist is not None:
+            self._record('fill_rect', (x, y, width, height, color), x, y, x + width - 1, y + height - 1)
+        else:
+            self._framebuf.fill_rect(x, y, width, height, color)
         
     def line(self, x_0, y_0, x_1, y_1, color):     # pylint: disable=too-many-arguments
         # Draw a line from (x_0, y_0) to (x_1, y_1) in passed color
-        self.draw('line', (x_0, y_0, x_1, y_1), color)
+        if self._displaylist is not None:
+            self._record('line', (x_0, y_0, x_1, y_1, color),
+                         min(x_0, x_1), min(y_0, y_1), max(x_0, x_1), max(y_0, y_1))
+        else:
+            self._framebuf.line(x_0, y_0, x_1, y_1, color)
         
     def circle(self, center_x, center_y, radius, color):
         # Draw a circle at the given midpoint location, radius and color.
         # The ```circle``` method draws only a 1 pixel outline.
-        self._framebuf.circle(center_x, center_y, radius, color)
+        if self._displaylist is not None:
+            self._record('circle', (center_x, center_y, radius, color), center_x - radius,
+                         center_y - radius, center_x + radius, center_y + radius)
+        else:
+            self._framebuf.circle(center_x, center_y, radius, color)
+        
+    def fill_circle(self, center_x, center_y, radius, color):
+        # Draw a filled circle at the given midpoint location, radius and color.
+        if self._displaylist is not None:
+            self._record('fill_circle', (center_x, center_y, radius, color), center_x - radius,
+                         center_y - radius, center_x + radius, center_y + radius)
+        else:
+            self._framebuf.fill_circle(center_x, center_y, radius, color)
+        
+    def triangle(self, x_0, y_0, x_1, y_1, x_2, y_2, color):     # pylint: disable=too-many-arguments
+        # Draw the outline of a triangle with the given corners
+        self.polygon(((x_0, y_0), (x_1, y_1), (x_2, y_2)), color)
+        
+    def fill_triangle(self, x_0, y_0, x_1, y_1, x_2, y_2, color):     # pylint: disable=too-many-arguments
+        # Draw a filled triangle with the given corners
+        self.fill_polygon(((x_0, y_0), (x_1, y_1), (x_2, y_2)), color)
+        
+    def polygon(self, points, color):
+        # Draw the outline of a closed polygon through the list of (x, y) points
+        if self._displaylist is not None:
+            self._record_polygon('polygon', points, color)
+        else:
+            self._framebuf.polygon(points, color)
+        
+    def fill_polygon(self, points, color):
+        # Draw a filled polygon through the list of (x, y) points
+        if self._displaylist is not None:
+            self._record_polygon('fill_polygon', points, color)
+        else:
+            self._framebuf.fill_polygon(points, color)
+            
+    def _record_polygon(self, name, points, color):
+        points = tuple(points)
+        if points:
+            self._record(name, (points, color),
+                         min(p[0] for p in points), min(p[1] for p in points),
+                         max(p[0] for p in points), max(p[1] for p in points))
         
     def text(self, string, x, y, color, *, font_name):
         # Write text string at location (x, y) in given color, using font file
-        self._framebuf.text(string, x, y , color, font_name=font_name)
+        if self._displaylist is not None:
+            self._record('text', (string, x, y, color), kwargs={'font_name': font_name})
+        else:
+            self._framebuf.text(string, x, y , color, font_name=font_name)
+        
+    def blit(self, source, x, y, key=None, palette=None):     # pylint: disable=too-many-arguments
+        # Draw the FrameBuffer ``source`` (e.g. an icon) at (x, y). Pixels of color ``key`` are
+        # transparent, ``palette`` maps source-colors to display-colors (see pl_framebuf)
+        if self._displaylist is not None:
+            self._record('blit', (source, x, y, key, palette),
+                         x, y, x + source.width - 1, y + source.height - 1)
+        else:
+            self._framebuf.blit(source, x, y, key, palette)
         
     def hline(self, x, y, width, color):
         # draw a horizontal line
@@ -256,38 +529,30 @@ class PL_EPD:
         # draw a vertical line
         self.fill_rect(x, y, 1, height, color)
         
-    def image(self, image):
-        # Set buffer to value of Python Imaging Library image.  The image should
-        # be in RGB mode and a size equal to the display size.
-        # 
-        #if image.mode != 'RGB':
-        #    raise ValueError('Image must be in mode RGB.')
+    def image(self, image, dither=None):
+        # Set buffer to value of Python Imaging Library image. The image can be of any mode
+        # and must have the size of the (rotated) display. Gray values are (r + g + b) // 3 like
+        # in image_bmp, converted by PIL and packed into the framebuffer in one pass.
+        # dither: None (fixed thresholds) or one of pl_dither.METHODS
         imwidth, imheight = image.size
         if imwidth != self._width or imheight != self._height:
             raise ValueError('Image must be same dimensions as display ({0}x{1}).' \
                 .format(self._width, self._height))
         
-        # Grab all the pixels from the image, faster than getpixel.
-        pix = image.load()
-        # clear out any display buffers
-        self.fill(WHITE)
-
-        for y in range(image.size[1]):
-            for x in range(image.size[0]):
-                pixel = pix[x, y]
-                graylevel = (pixel[0] + pixel[1] + pixel[2]) // 3
-                if (graylevel < 0x40):
-                    # very dark up to black
-                    self.pixel(x, y, BLACK)
-                elif (graylevel < 0x80):
-                    # dark gray
-                    self.pixel(x, y, DGRAY)
-                elif (graylevel < 0xc0):
-                    # light gray
-                    self.pixel(y, y, LGRAY)
-                else:
-                    # very bright up to white
-                    self.pixel(x, y, WHITE)
+        # pending commands are drawn first, the image itself isn't recorded
+        self.render()
+        if dither is None:
+            self._framebuf.load_colors(pl_framebuf.image_levels(image))
+            return
+        # dithered row by row, top to bottom
+        values = pl_framebuf.gray_image(image).tobytes()
+        graylevels = bytearray(imwidth * imheight)
+        view = memoryview(graylevels)
+        ditherer = pl_dither.Ditherer(imwidth, dither)
+        for y in range(imheight):
+            start = y * imwidth
+            ditherer.row(y, values[start:start + imwidth], view[start:start + imwidth])
+        self._framebuf.load_colors(graylevels)
 
 
 # The following code is taken and/ or derived from
@@ -306,76 +571,324 @@ class PL_EPD:
 
                   
                     
-    def image_bmp(self, filename):    
+    def image_bmp(self, filename, dither=None):
     # draws an bitmap-image on the screen (converted to 2-bit grayscale)
+    # dither: None (fixed thresholds) or one of pl_dither.METHODS, errors are diffused in the
+    # order the rows are stored in the file (usually bottom to top)
     # the image-file must:
-    # - be in  24bit(!!!) *.bmp format AND 
+    # - be in 24bit or 1/2/4/8bit palettized *.bmp format (RLE-compression possible, see BMPImage) AND
     # - fit in size (pixel*pixel) to the display-dimensions (smaller is possible) AND
     # - stored in the root-directory of the microcontroller-board     
         try:
             f = open("/" + filename, "rb")
         except OSError:
-            print("Couldn't open file")
+            pl_log.error("Couldn't open file")
             return
 
-        print("File opened")
+        pl_log.debug("File opened")
         try:
-            if f.read(2) != b'BM':  # check signature
-                raise BMPError("Not BitMap file")
-
-            bmpFileSize = self.read_le(f.read(4))
-            f.read(4)  # Read & ignore creator bytes
-
-            bmpImageoffset = self.read_le(f.read(4))  # Start of image data
-            headerSize = self.read_le(f.read(4))
-            bmpWidth = self.read_le(f.read(4))
-            bmpHeight = self.read_le(f.read(4))
-            flip = True
-
-            print("Size: %d\nImage offset: %d\nHeader size: %d" % (bmpFileSize, bmpImageoffset, headerSize))
-            print("Width: %d\nHeight: %d" % (bmpWidth, bmpHeight))
-
-            if self.read_le(f.read(2)) != 1:
-                raise BMPError("Not singleplane")
-            bmpDepth = self.read_le(f.read(2))  # bits per pixel
-            print("Bit depth: %d" % (bmpDepth))
-            if bmpDepth != 24:
-                raise BMPError("Not 24-bit")
-            if self.read_le(f.read(2)) != 0:
-                raise BMPError("Compressed file")
-
-            print("Image OK! Drawing...")
-
-            rowSize = (bmpWidth * 3 + 3) & ~3  # 32-bit line boundary
-
-            for row in range(bmpHeight):  # For each scanline...
-                if flip:  # Bitmap is stored bottom-to-top order (normal BMP)
-                    pos = bmpImageoffset + (bmpHeight - 1 - row) * rowSize
-                else:  # Bitmap is stored top-to-bottom
-                    pos = bmpImageoffset + row * rowSize
-
-                # print ("seek to %d" % pos)
-                f.seek(pos)
-                rowdata = f.read(3*bmpWidth)
-                for col in range(bmpWidth):
-                    b, g, r = rowdata[3*col:3*col+3]  # BMP files store RGB in BGR
-                    graylevel = (b + g + r) // 3    # convert into grayscale-values
-                    if (graylevel < 0x40):      # very dark up to black
-                        self.pixel(col, row, BLACK)
-                    elif (graylevel < 0x80):    # dark gray
-                        self.pixel(col, row, DGRAY)
-                    elif (graylevel < 0xc0):    # light gray
-                        self.pixel(col, row, LGRAY)
-                    else:                       # very bright up to white  
-                        self.pixel(col, row, WHITE)
+            bmp = BMPImage(f)
+
+            pl_log.debug("Image OK! Drawing...")
+            start = time.monotonic()
+            # pending commands are drawn first, the image itself isn't recorded pixel by pixel
+            self.render()
+            set_row = self._framebuf.set_row
+
+            # only the part fitting on the display is converted
+            graylevels = bytearray(min(bmp.width, self._width))
+            ditherer = None
+            if dither is not None:
+                ditherer = pl_dither.Ditherer(len(graylevels), dither)
+            for row in bmp.rows(min(bmp.height, self._height)):
+                bmp.read_row(row, graylevels, ditherer)
+                set_row(row, 0, graylevels)
+            pl_log.info("Image drawn in %d ms", int((time.monotonic() - start) * 1000))
         except OSError:
-            print("Couldn't read file")
+            pl_log.error("Couldn't read file")
         except BMPError as e:
-            print("Failed to parse BMP: " + e.args[0])
+            pl_log.error("Failed to parse BMP: %s", e.args[0])
         finally:
             f.close()
-        print("Finished drawing")    
+        pl_log.debug("Finished drawing")    
 
 class BMPError(Exception):
-        pass          
-        
\ No newline at end of file
+        pass
+
+
+class BMPImage:
+    # Reads the header of an opened *.bmp-file and converts its rows into graylevels, one byte
+    # per pixel. Supported are 24 bit images and 1, 2, 4 or 8 bit images with a palette, stored
+    # bottom-to-top or top-to-bottom, uncompressed or RLE-compressed (BI_RLE8/ BI_RLE4).
+    # The palette is mapped to the four graylevels once when the header is read.
+
+    def __init__(self, f):
+        self._file = f
+        header = f.read(54)
+        if len(header) < 54 or header[0:2] != b'BM':  # check signature
+            raise BMPError("Not BitMap file")
+        (filesize, self._offset, headersize, self.width, self.height, planes, self.depth,
+         self._compression, colors) = struct.unpack('<2xI4xIIiiHHI12xI', header[0:50])
+
+        pl_log.debug("Size: %d, image offset: %d, header size: %d", (filesize, self._offset, headersize))
+        pl_log.debug("Width: %d, height: %d", (self.width, self.height))
+
+        if headersize < 40:
+            raise BMPError("Unsupported header")
+        if planes != 1:
+            raise BMPError("Not singleplane")
+        pl_log.debug("Bit depth: %d", self.depth)
+        if self.depth not in (1, 2, 4, 8, 24):
+            raise BMPError("Not 1, 2, 4, 8 or 24-bit")
+        if not (self._compression == 0 or (self._compression, self.depth) in ((1, 8), (2, 4))):
+            raise BMPError("Unsupported compression")
+
+        # negative height: image is stored top-to-bottom (not allowed for compressed images)
+        self._topdown = self.height < 0
+        if self._topdown:
+            if self._compression:
+                raise BMPError("Compressed top-down image")
+            self.height = -self.height
+
+        if self.depth != 24:
+            # graylevels of the palette-entries (blue, green, red, reserved)
+            colors = colors or (1 << self.depth)
+            f.seek(14 + headersize)
+            palette = f.read(4 * colors)
+            self._palette = bytearray(1 << self.depth)
+            self._palettevalues = bytearray(1 << self.depth)
+            for i in range(min(colors, len(palette) // 4, len(self._palette))):
+                rgb_sum = palette[4 * i] + palette[4 * i + 1] + palette[4 * i + 2]
+                self._palette[i] = _GRAYLEVEL[rgb_sum]
+                self._palettevalues[i] = _GRAYVALUE[rgb_sum]
+        if self.depth < 8 and not self._compression:
+            # graylevels of all pixels in each possible byte-value
+            ppb = 8 // self.depth
+            mask = (1 << self.depth) - 1
+            self._bytegray = bytearray(256 * ppb)
+            for value in range(256):
+                for pixel in range(ppb):
+                    shift = 8 - self.depth * (pixel + 1)
+                    self._bytegray[value * ppb + pixel] = self._palette[(value >> shift) & mask]
+
+        if self._compression:
+            self._indices = bytearray(self.width)   # palette-indices of the decoded row
+            self._chunk = bytearray(64)             # read-buffer for the compressed data
+            # state of the decoder at the start of every decoded row: file-position (-1: not
+            # decoded yet), rows and columns left to skip
+            self._rowstates = array.array('i', [-1]) * (3 * self.height)
+            self._restart()
+        else:
+            self._rowsize = ((self.width * self.depth + 31) // 32) * 4  # 32-bit line boundary
+            self._rowdata = bytearray(self._rowsize)
+            self._next = None   # row at the current file-position
+        self._values = None     # gray values of a row, for dithering
+
+    def rows(self, count):
+    # the first ``count`` rows in the order they are stored in the file
+        if self._topdown:
+            return range(count)
+        return range(count - 1, -1, -1)
+
+    def read_row(self, row, graylevels, ditherer=None):
+    # converts the pixels of ``row`` (0 = top) into ``graylevels``, pixels beyond the width of
+    # the image are set to white. Reading the rows in the order of ``rows`` is fastest,
+    # compressed images are decoded up to the row otherwise (a row below the last decoded one
+    # from its own start again).
+    # With a pl_dither.Ditherer the gray values of the row are dithered instead of using the
+    # fixed thresholds.
+        width = min(len(graylevels), self.width)
+        self._read(row)
+        if ditherer is None:
+            self._graylevels(graylevels, width)
+        else:
+            if self._values is None:
+                self._values = bytearray(self.width)
+            self._grayvalues(self._values, width)
+            ditherer.row(row, self._values, graylevels)
+        for col in range(width, len(graylevels)):
+            graylevels[col] = 0x03
+
+    def _read(self, row):
+    # reads (or decodes) the data of row
+        if self._compression:
+            self._read_rle_row(row)
+            return
+        if row != self._next:
+            if self._topdown:
+                self._file.seek(self._offset + row * self._rowsize)
+            else:
+                self._file.seek(self._offset + (self.height - 1 - row) * self._rowsize)
+        self._file.readinto(self._rowdata)
+        self._next = row + 1 if self._topdown else row - 1
+
+    def _graylevels(self, graylevels, width):
+    # graylevels of the first width pixels of the row just read
+        if self._compression:
+            indices = self._indices
+            palette = self._palette
+            for col in range(width):
+                graylevels[col] = palette[indices[col]]
+            return
+        rowdata = self._rowdata
+        if self.depth == 24:
+            # BMP files store RGB in BGR, the sum of the three selects the graylevel
+            gray = _GRAYLEVEL
+            i = 0
+            for col in range(width):
+                graylevels[col] = gray[rowdata[i] + rowdata[i + 1] + rowdata[i + 2]]
+                i += 3
+        elif self.depth == 8:
+            palette = self._palette
+            for col in range(width):
+                graylevels[col] = palette[rowdata[col]]
+        else:
+            # all pixels of a byte at once
+            ppb = 8 // self.depth
+            target = memoryview(graylevels)
+            source = memoryview(self._bytegray)
+            col = 0
+            for i in range(width // ppb):
+                value = rowdata[i] * ppb
+                target[col:col + ppb] = source[value:value + ppb]
+                col += ppb
+            if col < width:
+                value = rowdata[width // ppb] * ppb
+                target[col:width] = source[value:value + width - col]
+
+    def _grayvalues(self, values, width):
+    # gray values (0...255) of the first width pixels of the row just read
+        if self._compression:
+            indices = self._indices
+            palette = self._palettevalues
+            for col in range(width):
+                values[col] = palette[indices[col]]
+            return
+        rowdata = self._rowdata
+        if self.depth == 24:
+            gray = _GRAYVALUE
+            i = 0
+            for col in range(width):
+                values[col] = gray[rowdata[i] + rowdata[i + 1] + rowdata[i + 2]]
+                i += 3
+        else:
+            palette = self._palettevalues
+            depth = self.depth
+            mask = (1 << depth) - 1
+            bit = 0
+            for col in range(width):
+                values[col] = palette[(rowdata[bit >> 3] >> (8 - depth - (bit & 0x07))) & mask]
+                bit += depth
+
+    def _restart(self):
+    # starts decoding of a compressed image at its first (bottom) row
+        self._file.seek(self._offset)
+        self._start = self._offset  # file-position of the read-buffer
+        self._fill = 0          # bytes in the read-buffer
+        self._pos = 0           # position in the read-buffer
+        self._next = self.height - 1
+        self._skiprows = 0      # rows left to skip (delta-escape)
+        self._skipcols = 0      # columns to skip in the row after the skipped ones
+        self._end = False       # end of bitmap reached
+
+    def _byte(self):
+    # next byte of the compressed data
+        if self._pos >= self._fill:
+            self._start += self._fill
+            self._fill = self._file.readinto(self._chunk)
+            self._pos = 0
+            if not self._fill:
+                raise BMPError("Unexpected end of compressed data")
+        self._pos += 1
+        return self._chunk[self._pos - 1]
+
+    def _read_rle_row(self, row):
+    # decodes the compressed data up to ``row`` into the palette-indices of the row, a row
+    # already passed is decoded again from its start (see _rowstates)
+        states = self._rowstates
+        if row > self._next:
+            index = 3 * row
+            self._file.seek(states[index])
+            self._start = states[index]
+            self._fill = 0
+            self._pos = 0
+            self._next = row
+            self._skiprows = states[index + 1]
+            self._skipcols = states[index + 2]
+            self._end = False
+        while True:
+            index = 3 * self._next
+            states[index] = self._start + self._pos
+            if self._end:
+                # the rows after the end of the bitmap are skipped
+                states[index + 1] = self._next + 1
+                states[index + 2] = 0
+            else:
+                states[index + 1] = self._skiprows
+                states[index + 2] = self._skipcols
+            self._decode_rle_row()
+            self._next -= 1
+            if self._next < row:
+                return
+
+    def _decode_rle_row(self):
+    # decodes the next row (from the bottom), skipped pixels get palette-index 0
+        indices = self._indices
+        width = self.width
+        for col in range(width):
+            indices[col] = 0
+        if self._end:
+            return
+        if self._skiprows:
+            self._skiprows -= 1
+            return
+        col = self._skipcols
+        self._skipcols = 0
+        rle4 = self._compression == 2
+        while True:
+            count = self._byte()
+            value = self._byte()
+            if count:
+                # encoded mode: count pixels of value (RLE4: alternating both nibbles)
+                if rle4:
+                    colors = (value >> 4, value & 0x0f)
+                    for i in range(col, min(col + count, width)):
+                        indices[i] = colors[(i - col) & 0x01]
+                else:
+                    for i in range(col, min(col + count, width)):
+                        indices[i] = value
+                col += count
+            elif value == 0:    # end of line
+                return
+            elif value == 1:    # end of bitmap
+                self._end = True
+                return
+            elif value == 2:    # delta: move right and up
+                col += self._byte()
+                rows = self._byte()
+                if rows:
+                    self._skiprows = rows - 1
+                    self._skipcols = col
+                    return
+            else:
+                # absolute mode: value pixels follow, padded to a 16-bit boundary
+                if rle4:
+                    size = (value + 1) // 2
+                else:
+                    size = value
+                for i in range(size):
+                    data = self._byte()
+                    if rle4:
+                        if col < width:
+                            indices[col] = data >> 4
+                        if col + 1 < width and 2 * i + 1 < value:
+                            indices[col + 1] = data & 0x0f
+                        col += 2
+                    else:
+                        if col < width:
+                            indices[col] = data
+                        col += 1
+                if rle4:
+                    col -= size * 2 - value
+                if size & 0x01:
+                    self._byte()
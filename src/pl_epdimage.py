@@ -0,0 +1,202 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_epdimage'
+# ====================================================
+# CircuitPython module for the native *.epd image-format
+# * Author(s): pl-micro-epd contributors
+#
+# An *.epd-file holds an image ready to be written to the RAM of the display:
+# 2 bit per pixel, already scrambled and in the byte-order of the display-RAM.
+#
+# header (18 bytes, little endian):
+#   4 bytes  magic b'PLEI'
+#   1 byte   format-version (1)
+#   1 byte   panel-id, the epdsize of the display (11, 14, 21, 31)
+#   2 bytes  width (source lines)
+#   2 bytes  height (gate lines)
+#   2 bytes  scramble mode the data is scrambled with (see pl_scrambler)
+#   1 byte   flags, bit 0: data is compressed with PackBits
+#   1 byte   reserved
+#   4 bytes  length of the image-data following the header
+# image-data:
+#   width * height // 4 bytes, optionally PackBits-compressed: a header byte n is followed by
+#   n + 1 literal bytes (0...127) or one byte repeated 257 - n times (129...255), 128 is skipped
+
+import struct
+
+
+MAGIC = b'PLEI'
+VERSION = 1
+FLAG_PACKBITS = 0x01
+_HEADER_FORMAT = '<4sBBHHHBBI'
+HEADER_SIZE = 18
+
+# geometry and scramble mode of the supported displays: epdsize -> (width, height, scramble mode)
+PANELS = {
+    11: (72, 148, 0x00),
+    14: (180, 100, 0x00),
+    21: (240, 146, 0x200),
+    31: (74, 312, 0x50),
+}
+
+
+class EPDImageError(Exception):
+    pass
+
+
+class EPDImageHeader:
+    # header of an *.epd-file
+
+    def __init__(self, panel, width, height, scramblemode, compressed=False, length=0):   # pylint: disable=too-many-arguments
+        self.panel = panel
+        self.width = width
+        self.height = height
+        self.scramblemode = scramblemode
+        self.compressed = compressed
+        self.length = length        # bytes of image-data in the file
+
+    @property
+    def size(self):
+    # bytes of the image-data after decompression
+        return self.width * self.height // 4
+
+    def matches(self, panel, width, height, scramblemode):
+    # True if the data can be written to the RAM of the given display as it is
+        return (self.panel, self.width, self.height, self.scramblemode) == (panel, width, height, scramblemode)
+
+    def pack(self):
+        flags = FLAG_PACKBITS if self.compressed else 0
+        return struct.pack(_HEADER_FORMAT, MAGIC, VERSION, self.panel, self.width, self.height,
+                           self.scramblemode, flags, 0, self.length)
+
+    @classmethod
+    def read(cls, f):
+    # reads and checks the header at the current position of an opened file
+        data = f.read(HEADER_SIZE)
+        if len(data) < HEADER_SIZE:
+            raise EPDImageError("File too short")
+        (magic, version, panel, width, height, scramblemode, flags, _,
+         length) = struct.unpack(_HEADER_FORMAT, data)
+        if magic != MAGIC:
+            raise EPDImageError("Not an EPD image")
+        if version != VERSION:
+            raise EPDImageError("Unsupported version %d" % version)
+        if width & 0x01 or height & 0x01:
+            raise EPDImageError("Odd image size")
+        return cls(panel, width, height, scramblemode, bool(flags & FLAG_PACKBITS), length)
+
+
+def packbits(data):
+# compresses data with PackBits, runs of 3 or more equal bytes are encoded as repetitions
+    out = bytearray()
+    count = len(data)
+    i = 0
+    while i < count:
+        # length of the run starting at i
+        j = i + 1
+        while j < count and j - i < 128 and data[j] == data[i]:
+            j += 1
+        if j - i >= 3:
+            out.append(257 - (j - i))
+            out.append(data[i])
+            i = j
+            continue
+        # literal bytes up to the next run of 3
+        j = i
+        while j < count and j - i < 128:
+            if j + 2 < count and data[j] == data[j + 1] == data[j + 2]:
+                break
+            j += 1
+        out.append(j - i - 1)
+        out += data[i:j]
+        i = j
+    return out
+
+
+def write(f, header, data):
+# writes an image (display-RAM order, see module description) as *.epd-file,
+# compressed if header.compressed is set
+    if header.compressed:
+        data = packbits(data)
+    header.length = len(data)
+    f.write(header.pack())
+    f.write(data)
+
+
+def stream(f, header, write_chunk, chunksize=512):
+# reads the image-data following the header from an opened file and hands it to
+# write_chunk in chunks of up to chunksize bytes (the chunk-buffer is reused)
+    chunk = bytearray(chunksize)
+    view = memoryview(chunk)
+    remaining = header.size
+    if not header.compressed:
+        while remaining:
+            count = f.readinto(view[0:min(chunksize, remaining)])
+            if not count:
+                raise EPDImageError("Unexpected end of image-data")
+            write_chunk(view[0:count])
+            remaining -= count
+        return
+
+    source = bytearray(chunksize)
+    available = 0       # bytes in source
+    pos = 0             # read-position in source
+    filled = 0          # bytes in chunk
+    header_byte = None  # PackBits header of the current packet
+    left = 0            # bytes left of the current packet
+    value = 0           # value of a repeated run
+    while remaining:
+        # a run only needs its value from the file, everything else is read
+        if pos >= available and (not left or header_byte < 128 or value is None):
+            available = f.readinto(source)
+            pos = 0
+            if not available:
+                raise EPDImageError("Unexpected end of image-data")
+        if not left:
+            header_byte = source[pos]
+            pos += 1
+            if header_byte < 128:
+                left = header_byte + 1
+            elif header_byte > 128:
+                left = 257 - header_byte
+                value = None
+            continue
+        if header_byte < 128:
+            # literal bytes, as many as available
+            count = min(left, available - pos, chunksize - filled, remaining)
+            view[filled:filled + count] = source[pos:pos + count]
+            pos += count
+        else:
+            if value is None:
+                value = source[pos]
+                pos += 1
+                continue
+            count = min(left, chunksize - filled, remaining)
+            for i in range(filled, filled + count):
+                chunk[i] = value
+        left -= count
+        filled += count
+        remaining -= count
+        if filled == chunksize or not remaining:
+            write_chunk(view[0:filled])
+            filled = 0
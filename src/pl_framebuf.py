@@ -32,6 +32,10 @@
 
 import os
 import struct
+try:
+    import numpy
+except ImportError:
+    numpy = None    # CircuitPython: image-rows are packed by set_row
 
 # Framebuf format constants:
 MVLSB = 0  # Single bit displays (like SSD1306 OLED)
@@ -39,20 +43,152 @@ RGB565 = 1  # 16-bit color displays
 GS4_HMSB = 2  # 2-bit gray-scale displays
 MHMSB = 3  # Single bit displays like the Sharp Memory
 
+# GS4_HMSB: mask clearing and shift placing a pixel in its byte, indexed by pixel_pos & 3
+_GS4_MASK = (0x3f, 0xcf, 0xf3, 0xfc)
+_GS4_SHIFT = (6, 4, 2, 0)
+
+# opened fonts by file name, shared by all FrameBuffers so each font-file is opened only once
+_fonts = {}
+
+# PIL convert-matrix giving (r + g + b) // 3 (the offset turns rounding into rounding down)
+_GRAY_MATRIX = (1 / 3, 1 / 3, 1 / 3, -1 / 3)
+
+def gray_image(img):
+    # A Python Imaging Library image of any mode as 8 bit gray image ('L'), gray values of
+    # colors are (r + g + b) // 3 like those of the bitmap-import of PL_EPD.
+    if img.mode == 'L':
+        return img
+    return img.convert('RGB').convert('L', _GRAY_MATRIX)
+
+def load_font(font_name):
+    # The BitmapFont of ``font_name``, opened on first use and kept open afterwards
+    font = _fonts.get(font_name)
+    if font is None:
+        font = _fonts[font_name] = BitmapFont(font_name)
+    return font
+
+def image_levels(img):
+    # The graylevels (0...3, thresholds at 0x40, 0x80 and 0xc0) of all pixels of a Python
+    # Imaging Library image as bytes, row by row. Done by PIL with a lookup-table.
+    return gray_image(img).point(lambda value: value >> 6).tobytes()
+
+def _copy_bits(dst, dst_bit, src, src_bit, nbits):
+    # Copies a run of ``nbits`` bits (MSB first) from ``src`` to ``dst``. The bits of the first
+    # and last destination byte outside of the run are left untouched.
+    # Runs with the same alignment inside a byte are moved as one slice, all others are
+    # shifted byte by byte. ``src`` and ``dst`` must not overlap.
+    if nbits <= 0:
+        return
+    end_bit = dst_bit + nbits
+    first = dst_bit >> 3
+    last = (end_bit - 1) >> 3
+    if not (dst_bit - src_bit) & 0x07:
+        # same alignment, source byte-index = destination byte-index + delta
+        delta = (src_bit >> 3) - first
+        i = first
+        j = last
+        if dst_bit & 0x07:
+            mask = 0xff >> (dst_bit & 0x07)
+            if first == last:
+                mask &= ~(0xff >> (end_bit - (first << 3)))
+            dst[first] = (dst[first] & ~mask) | (src[first + delta] & mask)
+            i += 1
+        if i <= last and end_bit & 0x07:
+            mask = ~(0xff >> (end_bit & 0x07)) & 0xff
+            dst[last] = (dst[last] & ~mask) | (src[last + delta] & mask)
+            j -= 1
+        if i <= j:
+            dst[i:j + 1] = src[i + delta:j + 1 + delta]
+        return
+    # different alignment, every destination byte is assembled from two source bytes
+    offset = src_bit - dst_bit
+    size = len(src)
+    for i in range(first, last + 1):
+        pos = (i << 3) + offset
+        index = pos >> 3
+        shift = pos & 0x07
+        value = (src[index] << shift) & 0xff if index >= 0 else 0
+        if index + 1 < size:
+            value |= src[index + 1] >> (8 - shift)
+        if i == first or i == last:
+            mask = (0xff >> max(dst_bit - (i << 3), 0)) & ~(0xff >> min(end_bit - (i << 3), 8))
+            dst[i] = (dst[i] & ~mask) | (value & mask)
+        else:
+            dst[i] = value
+
+def _move_bytes(buf, dst, src, count):
+    # Moves ``count`` bytes within ``buf`` from index ``src`` to ``dst`` (like memmove).
+    # The move is split into chunks that never overlap, so it neither needs a temporary copy
+    # nor depends on the copy-direction of slice-assignments.
+    mem = memoryview(buf)
+    step = abs(dst - src)
+    if step == 0:
+        return
+    if dst < src:
+        pos = 0
+        while pos < count:
+            n = min(step, count - pos)
+            mem[dst + pos:dst + pos + n] = mem[src + pos:src + pos + n]
+            pos += n
+    else:
+        pos = count
+        while pos > 0:
+            n = min(step, pos)
+            pos -= n
+            mem[dst + pos:dst + pos + n] = mem[src + pos:src + pos + n]
+
+def _fill_bytes(buf, start, end, value):
+    # Sets buf[start:end] to ``value`` (memset). Longer runs double an already filled block
+    # with every slice-move, so no temporary buffer is needed.
+    count = end - start
+    if count < 8:
+        for i in range(start, end):
+            buf[i] = value
+        return
+    buf[start] = value
+    mem = memoryview(buf)
+    size = 1
+    while size < count:
+        n = min(size, count - size)
+        mem[start + size:start + size + n] = mem[start:start + n]
+        size += n
+
+def _fill_bits(buf, start_bit, nbits, pattern):
+    # Sets a run of ``nbits`` bits (MSB first) to the corresponding bits of the byte ``pattern``,
+    # the bits of the first and last byte outside of the run are left untouched.
+    if nbits <= 0:
+        return
+    end_bit = start_bit + nbits
+    first = start_bit >> 3
+    last = (end_bit - 1) >> 3
+    mask = 0xff >> (start_bit & 0x07)
+    if first == last:
+        mask &= ~(0xff >> (end_bit - (first << 3)))
+        buf[first] = (buf[first] & ~mask) | (pattern & mask)
+        return
+    buf[first] = (buf[first] & ~mask) | (pattern & mask)
+    mask = ~(0xff >> (((end_bit - 1) & 0x07) + 1)) & 0xff
+    buf[last] = (buf[last] & ~mask) | (pattern & mask)
+    _fill_bytes(buf, first + 1, last, pattern)
+
 class MHMSBFormat:
     # MHMSBFormat
+    ppb = 8     # pixel per byte
+
     @staticmethod
     def set_pixel(framebuf, x, y, color):
         # Set a given pixel to a color.
-        index = (y * framebuf.stride + x) // 8
-        offset = 7 - x & 0x07
+        pixel_pos = y * framebuf.stride + x
+        index = pixel_pos // 8
+        offset = 7 - (pixel_pos & 0x07)
         framebuf.buf[index] = (framebuf.buf[index] & ~(0x01 << offset)) | ((color != 0) << offset)
 
     @staticmethod
     def get_pixel(framebuf, x, y):
         # Get the color of a given pixel
-        index = (y * framebuf.stride + x) // 8
-        offset = 7 - x & 0x07
+        pixel_pos = y * framebuf.stride + x
+        index = pixel_pos // 8
+        offset = 7 - (pixel_pos & 0x07)
         return (framebuf.buf[index] >> offset) & 0x01
 
     @staticmethod
@@ -62,81 +198,116 @@ class MHMSBFormat:
             fill = 0xFF
         else:
             fill = 0x00
-        for i in range(len(framebuf.buf)):
-            framebuf.buf[i] = fill
+        _fill_bytes(framebuf.buf, 0, len(framebuf.buf), fill)
 
     @staticmethod
     def fill_rect(framebuf, x, y, width, height, color):
         # Draw a rectangle at the given location, size and color. The ``fill_rect`` method draws
-        # both the outline and interior.
+        # both the outline and interior. Each row is filled as one span of bits.
         # pylint: disable=too-many-arguments
-        for _x in range(x, x+width):
-            offset = 7 - _x & 0x07
-            for _y in range(y, y+height):
-                index = (_y * framebuf.stride + _x) // 8
-                framebuf.buf[index] = (framebuf.buf[index] & ~(0x01 << offset)) \
-                                      | ((color != 0) << offset)
+        pattern = 0xFF if color else 0x00
+        pixel_pos = y * framebuf.stride + x
+        for _ in range(height):
+            _fill_bits(framebuf.buf, pixel_pos, width, pattern)
+            pixel_pos += framebuf.stride
+
+    @classmethod
+    def set_pixels(cls, framebuf, xs, ys, color):
+        # Set the pixels (xs[i], ys[i]) to a color, all of them inside of the buffer.
+        set_pixel = cls.set_pixel
+        for i in range(len(xs)):
+            set_pixel(framebuf, xs[i], ys[i], color)
+
+    @classmethod
+    def set_row(cls, framebuf, y, x, values):
+        # Set consecutive pixels of row y starting at x to the colors in ``values``, all of
+        # them inside of the buffer.
+        set_pixel = cls.set_pixel
+        for i in range(len(values)):
+            set_pixel(framebuf, x + i, y, values[i])
 
 class GS4_HMSBFormat:
     # 4-Graylevel HMSB Format
+    ppb = 4     # pixel per byte
+
     @staticmethod
     def set_pixel(framebuf, x, y, color):
         # Set a given pixel to a color.
-        # calculates the current number of the pixel-position
         pixel_pos = y * framebuf.stride + x
-        # calculates the corresponding byte-position (4 pixel per byte)
-        index = (y * framebuf.stride + x) // 4
-        
-        if ((pixel_pos%4) == 0):
-            framebuf.buf[index] = ((framebuf.buf[index] & 0x3f) | (color << 6))
-        elif ((pixel_pos%4) == 1):
-            framebuf.buf[index] = ((framebuf.buf[index] & 0xcf) | (color << 4))
-        elif ((pixel_pos%4) == 2):
-            framebuf.buf[index] = ((framebuf.buf[index] & 0xf3) | (color << 2))
-        elif ((pixel_pos%4) == 3):
-            framebuf.buf[index] = ((framebuf.buf[index] & 0xfc) | color)
-            
-    @staticmethod    
+        index = pixel_pos >> 2
+        buf = framebuf.buf
+        buf[index] = (buf[index] & _GS4_MASK[pixel_pos & 0x03]) | \
+                     (color << _GS4_SHIFT[pixel_pos & 0x03])
+
+    @staticmethod
     def get_pixel(framebuf, x, y):
-     # Get the color of a given pixel
-     # calculates the current number of the pixel-position
+        # Get the color of a given pixel
         pixel_pos = y * framebuf.stride + x
-        # calculates the corresponding byte-position (4 pixel per byte)
-        index = (y * framebuf.stride + x) // 4
-        offset = 3 - (pixel_pos & 0x03)
-        return (framebuf.buf[index] >> (offset*2)) & 0x03
-        
+        return (framebuf.buf[pixel_pos >> 2] >> _GS4_SHIFT[pixel_pos & 0x03]) & 0x03
+
+    @staticmethod
+    def set_pixels(framebuf, xs, ys, color):
+        # Set the pixels (xs[i], ys[i]) to a color, all of them inside of the buffer.
+        buf = framebuf.buf
+        stride = framebuf.stride
+        mask = _GS4_MASK
+        bits = tuple(color << shift for shift in _GS4_SHIFT)
+        for i in range(len(xs)):
+            pixel_pos = ys[i] * stride + xs[i]
+            index = pixel_pos >> 2
+            buf[index] = (buf[index] & mask[pixel_pos & 0x03]) | bits[pixel_pos & 0x03]
+
+    @staticmethod
+    def set_row(framebuf, y, x, values):
+        # Set consecutive pixels of row y starting at x to the colors in ``values``, all of
+        # them inside of the buffer. Whole bytes are packed from 4 values at once.
+        buf = framebuf.buf
+        count = len(values)
+        pixel_pos = y * framebuf.stride + x
+        i = 0
+        # single pixels up to the next byte-boundary
+        while i < count and pixel_pos & 0x03:
+            index = pixel_pos >> 2
+            buf[index] = (buf[index] & _GS4_MASK[pixel_pos & 0x03]) | \
+                         (values[i] << _GS4_SHIFT[pixel_pos & 0x03])
+            pixel_pos += 1
+            i += 1
+        index = pixel_pos >> 2
+        while i + 4 <= count:
+            buf[index] = (values[i] << 6) | (values[i + 1] << 4) | (values[i + 2] << 2) | \
+                         values[i + 3]
+            index += 1
+            i += 4
+        # single pixels of the last, partial byte
+        shift = 6
+        while i < count:
+            buf[index] = (buf[index] & ~(0x03 << shift)) | (values[i] << shift)
+            shift -= 2
+            i += 1
+
     @staticmethod
     def fill(framebuf, color):
     # completely fill/clear the buffer with a color
         fillcolor = (color | (color << 2) | (color << 4) | (color << 6))
-        for i in range(len(framebuf.buf)):
-            framebuf.buf[i] = fillcolor
+        _fill_bytes(framebuf.buf, 0, len(framebuf.buf), fillcolor)
             
     @staticmethod
     def fill_rect(framebuf, x, y, width, height, color):
         # Draw a rectangle at the given location, size and color. The ``fill_rect`` method draws
-        # both the outline and interior.
+        # both the outline and interior. Each row is filled as one span of bits
+        # (2 bit per pixel), whole bytes in between are set at once.
         # pylint: disable=too-many-arguments
-        for _x in range(x, x+width):
-            for _y in range(y, y+height):
-                # calculates the current number of the pixel-position
-                pixel_pos = _y * framebuf.stride + _x
-                # calculates the corresponding byte-position (4 pixel per byte)
-                index = (_y * framebuf.stride + _x) // 4
-                
-                if ((pixel_pos%4) == 0):
-                    framebuf.buf[index] = ((framebuf.buf[index] & 0x3f) | (color << 6))
-                elif ((pixel_pos%4) == 1):
-                    framebuf.buf[index] = ((framebuf.buf[index] & 0xcf) | (color << 4))
-                elif ((pixel_pos%4) == 2):
-                    framebuf.buf[index] = ((framebuf.buf[index] & 0xf3) | (color << 2))
-                elif ((pixel_pos%4) == 3):
-                    framebuf.buf[index] = ((framebuf.buf[index] & 0xfc) | color)
+        pattern = (color | (color << 2) | (color << 4) | (color << 6))
+        bit_pos = (y * framebuf.stride + x) * 2
+        for _ in range(height):
+            _fill_bits(framebuf.buf, bit_pos, width * 2, pattern)
+            bit_pos += framebuf.stride * 2
         
 
 class MVLSBFormat:
     # MVLSBFormat
+    ppb = 0     # vertical byte-layout, rows can't be copied as a whole
+
     @staticmethod
     def set_pixel(framebuf, x, y, color):
         # Set a given pixel to a color.
@@ -175,6 +346,21 @@ class MVLSBFormat:
             y += 1
             height -= 1
 
+    @classmethod
+    def set_pixels(cls, framebuf, xs, ys, color):
+        # Set the pixels (xs[i], ys[i]) to a color, all of them inside of the buffer.
+        set_pixel = cls.set_pixel
+        for i in range(len(xs)):
+            set_pixel(framebuf, xs[i], ys[i], color)
+
+    @classmethod
+    def set_row(cls, framebuf, y, x, values):
+        # Set consecutive pixels of row y starting at x to the colors in ``values``, all of
+        # them inside of the buffer.
+        set_pixel = cls.set_pixel
+        for i in range(len(values)):
+            set_pixel(framebuf, x + i, y, values[i])
+
 class FrameBuffer:
 #    FrameBuffer object.
 #
@@ -199,6 +385,7 @@ class FrameBuffer:
         self.width = width
         self.height = height
         self.stride = stride
+        self.buf_format = buf_format
         self._font = None
         if self.stride is None:
             self.stride = width
@@ -212,6 +399,18 @@ class FrameBuffer:
             raise ValueError('invalid format')
         
         self._rotation = 0
+        # bounding box (inclusive, unrotated coordinates) of all pixels drawn since the last
+        # call of clear_dirty(), a new buffer counts as completely dirty
+        self._dirty_x0 = 0
+        self._dirty_y0 = 0
+        self._dirty_x1 = width - 1
+        self._dirty_y1 = height - 1
+        # a view (see ``view``) passes its dirty-area on to the FrameBuffer it was taken from,
+        # _memory is the object owning the memory shared by a FrameBuffer and its views
+        self._parent = None
+        self._origin_x = 0
+        self._origin_y = 0
+        self._memory = buf
 
     @property
     def rotation(self):
@@ -224,9 +423,84 @@ class FrameBuffer:
             raise RuntimeError("Bad rotation setting")
         self._rotation = val
 
+    @property
+    def dirty(self):
+    # The area changed since the last clear_dirty() as (x, y, width, height) in unrotated
+    # coordinates, None if nothing was drawn.
+        if self._dirty_x0 > self._dirty_x1:
+            return None
+        return (self._dirty_x0, self._dirty_y0,
+                self._dirty_x1 - self._dirty_x0 + 1, self._dirty_y1 - self._dirty_y0 + 1)
+
+    def clear_dirty(self):
+    # Reset the dirty-area, e.g. by the display driver after the buffer was uploaded.
+        self._dirty_x0 = self.width
+        self._dirty_y0 = self.height
+        self._dirty_x1 = -1
+        self._dirty_y1 = -1
+
+    def _mark(self, x_0, y_0, x_1, y_1):
+    # grows the dirty-area by the rectangle x_0..x_1/ y_0..y_1 (inclusive, unrotated coordinates)
+        x_0 = max(x_0, 0)
+        y_0 = max(y_0, 0)
+        x_1 = min(x_1, self.width - 1)
+        y_1 = min(y_1, self.height - 1)
+        if x_0 > x_1 or y_0 > y_1:
+            return
+        if x_0 < self._dirty_x0:
+            self._dirty_x0 = x_0
+        if y_0 < self._dirty_y0:
+            self._dirty_y0 = y_0
+        if x_1 > self._dirty_x1:
+            self._dirty_x1 = x_1
+        if y_1 > self._dirty_y1:
+            self._dirty_y1 = y_1
+        if self._parent is not None:
+            self._parent._mark(x_0 + self._origin_x, y_0 + self._origin_y,
+                               x_1 + self._origin_x, y_1 + self._origin_y)
+
+    def view(self, x, y, width, height):
+    # Returns a FrameBuffer for the area (x, y, width, height) of this FrameBuffer which shares
+    # its memory (a memoryview with the same stride, nothing is copied). The area is given in
+    # rotated coordinates and clipped to the buffer, the view inherits the rotation so that
+    # widgets can draw in their own local coordinates. Everything drawn into the view also
+    # counts as dirty in this FrameBuffer.
+    # Packed rows must start at a full byte: the unrotated left edge has to be a multiple of
+    # 4 pixel for GS4_HMSB (8 for MHMSB) and so has the stride. For MVLSB the unrotated top edge
+    # has to be a multiple of 8.
+        x, y, width, height = self._physical_rect(x, y, width, height)
+        x_end = min(x + width, self.width)
+        y_end = min(y + height, self.height)
+        x = max(x, 0)
+        y = max(y, 0)
+        if x >= x_end or y >= y_end:
+            raise ValueError('View outside of the FrameBuffer')
+        ppb = self.format.ppb
+        if ppb:
+            if x % ppb or self.stride % ppb:
+                raise ValueError('View must start at a full byte ({0} pixel)'.format(ppb))
+            start = (y * self.stride + x) // ppb
+        else:
+            if y & 0x07:
+                raise ValueError('View must start at a full byte (8 pixel)')
+            start = (y >> 3) * self.stride + x
+        child = FrameBuffer(memoryview(self.buf)[start:], x_end - x, y_end - y,
+                            self.buf_format, self.stride)
+        child._rotation = self._rotation
+        child._parent = self
+        child._origin_x = x
+        child._origin_y = y
+        child._memory = self._memory
+        return child
+
     def fill(self, color):
     # Fill the entire FrameBuffer with the specified color.
-        self.format.fill(self, color)
+        if self._parent is None:
+            self.format.fill(self, color)
+        else:
+            # a view only covers a part of its memory
+            self.format.fill_rect(self, 0, 0, self.width, self.height, color)
+        self._mark(0, 0, self.width - 1, self.height - 1)
 
     def fill_rect(self, x, y, width, height, color):
     # Draw a rectangle at the given location, size and color. The ``fill_rect`` method draws
@@ -252,8 +526,65 @@ class FrameBuffer:
         if color is None:
             return self.format.get_pixel(self, x, y)
         self.format.set_pixel(self, x, y, color)
+        # dirty-tracking inlined, this is the hot path of most drawing-functions
+        if x < self._dirty_x0:
+            self._dirty_x0 = x
+        if x > self._dirty_x1:
+            self._dirty_x1 = x
+        if y < self._dirty_y0:
+            self._dirty_y0 = y
+        if y > self._dirty_y1:
+            self._dirty_y1 = y
+        if self._parent is not None:
+            self._parent._mark(x + self._origin_x, y + self._origin_y,
+                               x + self._origin_x, y + self._origin_y)
         return None
 
+    def set_pixels(self, xs, ys, color):
+    # Set the pixels (xs[i], ys[i]) to the given color with one call, e.g. for the points
+    # calculated by a bulk-producer. Pixels outside of the buffer are skipped.
+        if self._rotation:
+            physical = self._physical
+            points = [physical(xs[i], ys[i]) for i in range(len(xs))]
+            xs = [point[0] for point in points]
+            ys = [point[1] for point in points]
+        if not xs:
+            return
+        x_0, x_1, y_0, y_1 = min(xs), max(xs), min(ys), max(ys)
+        if x_0 < 0 or y_0 < 0 or x_1 >= self.width or y_1 >= self.height:
+            inside = [i for i in range(len(xs))
+                      if 0 <= xs[i] < self.width and 0 <= ys[i] < self.height]
+            if not inside:
+                return
+            xs = [xs[i] for i in inside]
+            ys = [ys[i] for i in inside]
+            x_0, x_1, y_0, y_1 = min(xs), max(xs), min(ys), max(ys)
+        self.format.set_pixels(self, xs, ys, color)
+        self._mark(x_0, y_0, x_1, y_1)
+
+    def set_row(self, y, x, values):
+    # Set consecutive pixels of row y starting at x to the colors in ``values`` (a list, bytes
+    # or bytearray holding one color per pixel). Pixels outside of the buffer are skipped.
+        if self._rotation & 1:
+            # the row is a column of the buffer
+            for i in range(len(values)):
+                self.pixel(x + i, y, values[i])
+            return
+        if self._rotation == 2:
+            x = self.width - x - len(values)
+            y = self.height - y - 1
+            values = values[::-1]
+        if y < 0 or y >= self.height:
+            return
+        start = max(0, -x)
+        end = min(len(values), self.width - x)
+        if start >= end:
+            return
+        if start or end < len(values):
+            values = values[start:end]
+        self.format.set_row(self, y, x + start, values)
+        self._mark(x + start, y, x + end - 1, y)
+
     def hline(self, x, y, width, color):
     # Draw a horizontal line up to a given length.
         self.rect(x, y, width, 1, color, fill=True)
@@ -262,23 +593,29 @@ class FrameBuffer:
     # Draw a vertical line up to a given length.
         self.rect(x, y, 1, height, color, fill=True)
 
-    def circle(self, center_x, center_y, radius, color):
+    def circle(self, center_x, center_y, radius, color, *, fill=False):
     # Draw a circle at the given midpoint location, radius and color.
-    # The ```circle``` method draws only a 1 pixel outline.
+    # The ```circle``` method draws only a 1 pixel outline unless ``fill`` is set.
+    # The points of the octants are merged into horizontal spans: a run of points with the
+    # same y gives a span on the rows center_y +/- y, a run with the same x a span on the rows
+    # center_y +/- x. The circle is symmetric, so rotation only moves its midpoint.
+    # pylint: disable=too-many-arguments, too-many-locals, too-many-branches
+        c_x, c_y = self._physical(center_x, center_y)
+        if (c_x + radius < 0 or c_x - radius >= self.width or
+                c_y + radius < 0 or c_y - radius >= self.height):
+            return
+        self._mark(c_x - radius, c_y - radius, c_x + radius, c_y + radius)
+        hspan = self._hspan
         x = radius - 1
         y = 0
         d_x = 1
         d_y = 1
         err = d_x - (radius << 1)
+        run_x = x   # first x of the points sharing the current y
+        run_y = y   # first y of the points sharing the current x
         while x >= y:
-            self.pixel(center_x + x, center_y + y, color)
-            self.pixel(center_x + y, center_y + x, color)
-            self.pixel(center_x - y, center_y + x, color)
-            self.pixel(center_x - x, center_y + y, color)
-            self.pixel(center_x - x, center_y - y, color)
-            self.pixel(center_x - y, center_y - x, color)
-            self.pixel(center_x + y, center_y - x, color)
-            self.pixel(center_x + x, center_y - y, color)
+            cur_x = x
+            cur_y = y
             if err <= 0:
                 y += 1
                 err += d_y
@@ -287,22 +624,37 @@ class FrameBuffer:
                 x -= 1
                 d_x += 2
                 err += d_x - (radius << 1)
+            done = x < y
+            if y != cur_y or done:
+                if fill:
+                    hspan(c_x - run_x, c_x + run_x, c_y + cur_y, color)
+                    hspan(c_x - run_x, c_x + run_x, c_y - cur_y, color)
+                else:
+                    hspan(c_x + cur_x, c_x + run_x, c_y + cur_y, color)
+                    hspan(c_x - run_x, c_x - cur_x, c_y + cur_y, color)
+                    hspan(c_x + cur_x, c_x + run_x, c_y - cur_y, color)
+                    hspan(c_x - run_x, c_x - cur_x, c_y - cur_y, color)
+                run_x = x
+            if x != cur_x or done:
+                if fill:
+                    hspan(c_x - cur_y, c_x + cur_y, c_y + cur_x, color)
+                    hspan(c_x - cur_y, c_x + cur_y, c_y - cur_x, color)
+                else:
+                    hspan(c_x + run_y, c_x + cur_y, c_y + cur_x, color)
+                    hspan(c_x - cur_y, c_x - run_y, c_y + cur_x, color)
+                    hspan(c_x + run_y, c_x + cur_y, c_y - cur_x, color)
+                    hspan(c_x - cur_y, c_x - run_y, c_y - cur_x, color)
+                run_y = y
+
+    def fill_circle(self, center_x, center_y, radius, color):
+    # Draw a filled circle at the given midpoint location, radius and color.
+        self.circle(center_x, center_y, radius, color, fill=True)
 
     def rect(self, x, y, width, height, color, *, fill=False):
     # Draw a rectangle at the given location, size and color. 
     # The ```rect``` method draws only a 1 pixel outline.
         # pylint: disable=too-many-arguments
-        if self.rotation == 1:
-            x, y = y, x
-            width, height = height, width
-            x = self.width - x - width
-        if self.rotation == 2:
-            x = self.width - x - width
-            y = self.height - y - height
-        if self.rotation == 3:
-            x, y = y, x
-            width, height = height, width
-            y = self.height - y - height
+        x, y, width, height = self._physical_rect(x, y, width, height)
 
         # pylint: disable=too-many-boolean-expressions
         if width < 1 or height < 1 or (x + width) <= 0 or (y + height) <= 0 or \
@@ -312,6 +664,7 @@ class FrameBuffer:
         y_end = min(self.height-1, y + height-1)
         x = max(x, 0)
         y = max(y, 0)
+        self._mark(x, y, x_end, y_end)
         if fill:
             self.format.fill_rect(self, x, y, x_end-x+1, y_end-y+1, color)
         else:
@@ -323,38 +676,298 @@ class FrameBuffer:
     def line(self, x_0, y_0, x_1, y_1, color):
     # Bresenham's line algorithm
     # pylint: disable=too-many-arguments
+        x_0, y_0 = self._physical(x_0, y_0)
+        x_1, y_1 = self._physical(x_1, y_1)
+        self._line(x_0, y_0, x_1, y_1, color)
+
+    def _line(self, x_0, y_0, x_1, y_1, color):
+    # Bresenham's line algorithm in unrotated coordinates, integer-only and clipped against the
+    # buffer. Horizontal and vertical lines are filled as spans.
+    # The error-term starts at d_major and changes by 2*d_minor/ 2*d_major per step, so the
+    # minor offset after i steps is k(i) = max(0, ceil((2*i*d_minor - d_major) / (2*d_major))).
+    # This gives the visible part of a clipped line in closed form, the pixels are the same
+    # as those of the unclipped line.
+    # pylint: disable=too-many-arguments, too-many-locals, too-many-branches
+        width = self.width
+        height = self.height
+        if y_0 == y_1:
+            left = max(min(x_0, x_1), 0)
+            right = min(max(x_0, x_1), width - 1)
+            if 0 <= y_0 < height and left <= right:
+                self._hspan(left, right, y_0, color)
+                self._mark(left, y_0, right, y_0)
+            return
+        if x_0 == x_1:
+            top = max(min(y_0, y_1), 0)
+            bottom = min(max(y_0, y_1), height - 1)
+            if 0 <= x_0 < width and top <= bottom:
+                self.format.fill_rect(self, x_0, top, 1, bottom - top + 1, color)
+                self._mark(x_0, top, x_0, bottom)
+            return
+
+        # Cohen-Sutherland outcodes: lines completely on one side of the buffer are skipped
+        code_0 = (x_0 < 0) | ((x_0 >= width) << 1) | ((y_0 < 0) << 2) | ((y_0 >= height) << 3)
+        code_1 = (x_1 < 0) | ((x_1 >= width) << 1) | ((y_1 < 0) << 2) | ((y_1 >= height) << 3)
+        if code_0 & code_1:
+            return
 
         d_x = abs(x_1 - x_0)
         d_y = abs(y_1 - y_0)
-        x, y = x_0, y_0
         s_x = -1 if x_0 > x_1 else 1
         s_y = -1 if y_0 > y_1 else 1
+        # continue with the major axis as "a" and the minor axis as "b"
         if d_x > d_y:
-            err = d_x / 2.0
-            while x != x_1:
-                self.pixel(x, y, color)
-                err -= d_y
+            a_0, b_0, d_a, d_b, s_a, s_b, size_a, size_b = x_0, y_0, d_x, d_y, s_x, s_y, width, height
+        else:
+            a_0, b_0, d_a, d_b, s_a, s_b, size_a, size_b = y_0, x_0, d_y, d_x, s_y, s_x, height, width
+        first = 0
+        last = d_a
+        if code_0 | code_1:
+            # clip the steps against the major axis ...
+            if s_a > 0:
+                first = max(first, -a_0)
+                last = min(last, size_a - 1 - a_0)
+            else:
+                first = max(first, a_0 - size_a + 1)
+                last = min(last, a_0)
+            # ... and the minor axis, k(i) is monotonic
+            if s_b > 0:
+                k_min, k_max = -b_0, size_b - 1 - b_0
+            else:
+                k_min, k_max = b_0 - size_b + 1, b_0
+            if k_max < 0:
+                return
+            if k_min > 0:
+                first = max(first, (2 * d_a * (k_min - 1) + d_a) // (2 * d_b) + 1)
+            last = min(last, (2 * d_a * k_max + d_a) // (2 * d_b))
+            if first > last:
+                return
+        self._mark(min(x_0, x_1), min(y_0, y_1), max(x_0, x_1), max(y_0, y_1))
+        k = max(0, -((d_a - 2 * first * d_b) // (2 * d_a)))
+        err = d_a - 2 * first * d_b + 2 * k * d_a
+        a = a_0 + s_a * first
+        b = b_0 + s_b * k
+        d_a *= 2
+        d_b *= 2
+        set_pixel = self.format.set_pixel
+        if d_x > d_y:
+            for _ in range(last - first + 1):
+                set_pixel(self, a, b, color)
+                err -= d_b
                 if err < 0:
-                    y += s_y
-                    err += d_x
-                x += s_x
+                    b += s_b
+                    err += d_a
+                a += s_a
         else:
-            err = d_y / 2.0
-            while y != y_1:
-                self.pixel(x, y, color)
-                err -= d_x
+            for _ in range(last - first + 1):
+                set_pixel(self, b, a, color)
+                err -= d_b
                 if err < 0:
-                    x += s_x
-                    err += d_y
-                y += s_y
-        self.pixel(x, y, color)
+                    b += s_b
+                    err += d_a
+                a += s_a
+
+    def triangle(self, x_0, y_0, x_1, y_1, x_2, y_2, color, *, fill=False):
+    # Draw a triangle with the given corners, only the outline unless ``fill`` is set.
+    # pylint: disable=too-many-arguments
+        self.polygon(((x_0, y_0), (x_1, y_1), (x_2, y_2)), color, fill=fill)
+
+    def fill_triangle(self, x_0, y_0, x_1, y_1, x_2, y_2, color):
+    # Draw a filled triangle with the given corners.
+    # pylint: disable=too-many-arguments
+        self.polygon(((x_0, y_0), (x_1, y_1), (x_2, y_2)), color, fill=True)
+
+    def polygon(self, points, color, *, fill=False):
+    # Draw a closed polygon through the sequence of (x, y) ``points``, only the outline unless
+    # ``fill`` is set. The interior is filled with horizontal spans (even-odd rule) between the
+    # edge-crossings of each scanline.
+    # pylint: disable=too-many-locals
+        points = [self._physical(x, y) for x, y in points]
+        count = len(points)
+        if count == 0:
+            return
+        top = min(p[1] for p in points)
+        bottom = max(p[1] for p in points)
+        if fill and count > 2:
+            self._mark(min(p[0] for p in points), top, max(p[0] for p in points), bottom)
+            top = max(top, 0)
+            bottom = min(bottom, self.height - 1)
+            crossings = []
+            for y in range(top, bottom + 1):
+                x_j, y_j = points[-1]
+                for x_i, y_i in points:
+                    if (y_i <= y < y_j) or (y_j <= y < y_i):
+                        crossings.append(x_i + (y - y_i) * (x_j - x_i) // (y_j - y_i))
+                    x_j, y_j = x_i, y_i
+                crossings.sort()
+                for i in range(0, len(crossings) - 1, 2):
+                    self._hspan(crossings[i], crossings[i + 1], y, color)
+                del crossings[:]
+        x_j, y_j = points[-1]
+        for x_i, y_i in points:
+            self._line(x_j, y_j, x_i, y_i, color)
+            x_j, y_j = x_i, y_i
+
+    def fill_polygon(self, points, color):
+    # Draw a filled polygon through the sequence of (x, y) ``points``.
+        self.polygon(points, color, fill=True)
+
+    def _physical(self, x, y):
+    # converts a position of the rotated into the unrotated coordinate-system (see ``pixel``)
+        if self._rotation == 0:
+            return x, y
+        if self._rotation == 1:
+            return self.width - y - 1, x
+        if self._rotation == 2:
+            return self.width - x - 1, self.height - y - 1
+        return y, self.height - x - 1
+
+    def _physical_rect(self, x, y, width, height):
+    # converts a rectangle of the rotated into the unrotated coordinate-system
+        if self._rotation == 1:
+            return self.width - y - height, x, height, width
+        if self._rotation == 2:
+            return self.width - x - width, self.height - y - height, width, height
+        if self._rotation == 3:
+            return y, self.height - x - width, height, width
+        return x, y, width, height
+
+    def _hspan(self, x_0, x_1, y, color):
+    # fills the pixels x_0..x_1 (inclusive, unrotated coordinates) of row y, clipped to the buffer
+        if y < 0 or y >= self.height:
+            return
+        x_0 = max(x_0, 0)
+        x_1 = min(x_1, self.width - 1)
+        if x_0 < x_1:
+            self.format.fill_rect(self, x_0, y, x_1 - x_0 + 1, 1, color)
+        elif x_0 == x_1:
+            self.format.set_pixel(self, x_0, y, color)
+
+    def blit(self, source, x, y, key=None, palette=None):
+    # Draw another FrameBuffer ``source`` with its top-left corner at (x, y).
+    # Source pixels of color ``key`` are transparent (the key is compared before the palette).
+    # ``palette`` translates source colors into colors of this FrameBuffer, e.g. 0/1 of a MHMSB
+    # icon into two of the four graylevels of GS4_HMSB. It is either a sequence or a FrameBuffer
+    # of height 1 holding the color for source color c at pixel (c, 0).
+    # The source is read without its own rotation, the position honours the rotation of this
+    # FrameBuffer. Rows are copied as whole bit-runs if the formats match and neither key nor
+    # palette is given (byte-slices if x is aligned to full bytes, e.g. 4 pixel for GS4_HMSB).
+    # pylint: disable=too-many-arguments, too-many-locals, too-many-branches
+        if self._rotation & 1:
+            width, height = self.height, self.width
+        else:
+            width, height = self.width, self.height
+        # clip the source-area against this FrameBuffer
+        src_x = max(0, -x)
+        src_y = max(0, -y)
+        x_0 = x + src_x
+        y_0 = y + src_y
+        w = min(source.width - src_x, width - x_0)
+        h = min(source.height - src_y, height - y_0)
+        if w < 1 or h < 1:
+            return
+        p_x0, p_y0 = self._physical(x_0, y_0)
+        p_x1, p_y1 = self._physical(x_0 + w - 1, y_0 + h - 1)
+        self._mark(min(p_x0, p_x1), min(p_y0, p_y1), max(p_x0, p_x1), max(p_y0, p_y1))
+        if palette is not None and hasattr(palette, 'format'):
+            palette = [palette.format.get_pixel(palette, c, 0) for c in range(palette.width)]
+        if source._memory is self._memory and source.buf is not self.buf:
+            # source and destination are different views of the same memory
+            source = FrameBuffer(bytearray(source.buf), source.width, source.height,
+                                 source.buf_format, source.stride)
+
+        ppb = self.format.ppb
+        if (self._rotation == 0 and key is None and palette is None and ppb
+                and type(source.format) is type(self.format)):
+            # fast path: copy each row as one run of bits
+            bpp = 8 // ppb
+            stride = self.stride
+            src_stride = source.stride
+            rows = range(h)
+            if source.buf is self.buf:
+                # same memory, copy rows in an order that never overwrites unread source-rows
+                if y_0 * stride + x_0 > src_y * src_stride + src_x:
+                    rows = range(h - 1, -1, -1)
+            for row in rows:
+                src_bit = ((src_y + row) * src_stride + src_x) * bpp
+                src = source.buf
+                if src is self.buf:
+                    start = src_bit >> 3
+                    src = bytes(src[start:((src_bit + w * bpp + 7) >> 3)])
+                    src_bit -= start << 3
+                _copy_bits(self.buf, ((y_0 + row) * stride + x_0) * bpp, src, src_bit, w * bpp)
+            return
 
-    def blit(self):
-    # blit is not yet implemented
-        raise NotImplementedError()
+        if source.buf is self.buf:
+            # pixel-wise copies within the same memory work on a snapshot of the source
+            source = FrameBuffer(bytearray(source.buf), source.width, source.height,
+                                 source.buf_format, source.stride)
+        get_pixel = source.format.get_pixel
+        if self._rotation == 0:
+            set_pixel = self.format.set_pixel
+            for row in range(h):
+                for col in range(w):
+                    color = get_pixel(source, src_x + col, src_y + row)
+                    if color != key:
+                        if palette is not None:
+                            color = palette[color]
+                        set_pixel(self, x_0 + col, y_0 + row, color)
+        else:
+            for row in range(h):
+                for col in range(w):
+                    color = get_pixel(source, src_x + col, src_y + row)
+                    if color != key:
+                        if palette is not None:
+                            color = palette[color]
+                        self.pixel(x_0 + col, y_0 + row, color)
 
     def scroll(self, delta_x, delta_y):
-    # shifts framebuf in x and y direction
+    # shifts framebuf in x and y direction, the area scrolled in keeps its previous content
+    # Packed formats move whole rows with one memmove-style slice move (vertical scrolls) or
+    # shift each row as a run of bytes/ bits (horizontal scrolls) instead of single pixels.
+        # pylint: disable=too-many-locals
+        width = self.width
+        height = self.height
+        if abs(delta_x) >= width or abs(delta_y) >= height:
+            return
+        self._mark(max(delta_x, 0), max(delta_y, 0),
+                   width - 1 + min(delta_x, 0), height - 1 + min(delta_y, 0))
+        ppb = self.format.ppb
+        if ppb:
+            bpp = 8 // ppb
+            stride = self.stride
+            buf = self.buf
+            if delta_x == 0 and stride == width:
+                shift = abs(delta_y) * stride * bpp
+                size = height * stride * bpp
+                if not (shift & 0x07 or size & 0x07):
+                    # all rows form one contiguous block of full bytes
+                    shift >>= 3
+                    size >>= 3
+                    if delta_y > 0:
+                        _move_bytes(buf, shift, 0, size - shift)
+                    else:
+                        _move_bytes(buf, 0, shift, size - shift)
+                    return
+            run = (width - abs(delta_x)) * bpp
+            src_x = max(-delta_x, 0)
+            dst_x = max(delta_x, 0)
+            # rows are processed in an order where every source-row is read before it's overwritten
+            if delta_y > 0:
+                rows = range(height - 1, delta_y - 1, -1)
+            else:
+                rows = range(0, height + delta_y)
+            for y in rows:
+                src_bit = ((y - delta_y) * stride + src_x) * bpp
+                src = buf
+                if delta_y == 0:
+                    # shift within the same row, work on a copy of the row
+                    start = src_bit >> 3
+                    src = bytes(buf[start:(src_bit + run + 7) >> 3])
+                    src_bit -= start << 3
+                _copy_bits(buf, (y * stride + dst_x) * bpp, src, src_bit, run)
+            return
+
         if delta_x < 0:
             shift_x = 0
             xend = self.width + delta_x
@@ -386,7 +999,7 @@ class FrameBuffer:
         for chunk in string.split('\n'):
             if not self._font or self._font.font_name != font_name:
                 # load the font!
-                self._font = BitmapFont()
+                self._font = load_font(font_name)
             w = self._font.font_width
             for i, char in enumerate(chunk):
                 self._font.draw_char(char, x + (i * (w + 1))*size, y, self, color, size=size)                                 
@@ -396,24 +1009,49 @@ class FrameBuffer:
 
 
     def image(self, img):
-    # Set buffer to value of Python Imaging Library image.  The image should
-    # be in 1 bit mode and a size equal to the display size.
-        if img.mode != '1':
-            raise ValueError('Image must be in mode 1.')
+    # Set buffer to value of Python Imaging Library image. The image can be of any mode and must
+    # have the size of the (rotated) FrameBuffer. Its pixels are converted to graylevels (see
+    # image_levels), single bit formats set all pixels except black (level 0, gray values below
+    # 0x40; mode '1': the white ones).
+        width, height = self.width, self.height
+        if self._rotation & 1:
+            width, height = height, width
         imwidth, imheight = img.size
-        if imwidth != self.width or imheight != self.height:
+        if imwidth != width or imheight != height:
             raise ValueError('Image must be same dimensions as display ({0}x{1}).' \
-                .format(self.width, self.height))
-        # Grab all the pixels from the image, faster than getpixel.
-        pixels = img.load()
-        # Clear buffer
-        for i in range(len(self.buf)):
-            self.buf[i] = 0
-        # Iterate through the pixels
-        for x in range(self.width):       # yes this double loop is slow,
-            for y in range(self.height):  #  but these displays are small!
-                if pixels[(x, y)]:
-                    self.pixel(x, y, 1)   # only write if pixel is true
+                .format(width, height))
+        self.load_colors(image_levels(img))
+
+    def load_colors(self, colors):
+    # Set all pixels of the (rotated) FrameBuffer to ``colors`` (bytes or bytearray with one
+    # color per pixel, row by row), e.g. the converted pixels of an image. GS4_HMSB-buffers are
+    # packed with NumPy if it is available (on the host), otherwise row by row with set_row.
+        width, height = self.width, self.height
+        if self._rotation & 1:
+            width, height = height, width
+        if len(colors) != width * height:
+            raise ValueError('{0} colors needed ({1}x{2})'.format(width * height, width, height))
+        if numpy is not None and self.format.ppb == 4 and not (self.width | self.stride) & 0x03:
+            self._load_gs4(colors, width, height)
+            self._mark(0, 0, self.width - 1, self.height - 1)
+            return
+        for y in range(height):
+            self.set_row(y, 0, colors[y * width:(y + 1) * width])
+
+    def _load_gs4(self, colors, width, height):
+    # load_colors with NumPy: the colors are turned into the unrotated orientation and
+    # 4 pixel are packed into each byte at once, then copied row by row (views share
+    # their rows with other pixels)
+        levels = numpy.frombuffer(colors, dtype=numpy.uint8).reshape(height, width)
+        if self._rotation:
+            levels = numpy.rot90(levels, -self._rotation)
+        packed = ((levels[:, 0::4] << 6) | (levels[:, 1::4] << 4) |
+                  (levels[:, 2::4] << 2) | levels[:, 3::4]).astype(numpy.uint8)
+        rowsize = self.width >> 2
+        stride = self.stride >> 2
+        buf = self.buf
+        for y in range(self.height):
+            buf[y * stride:y * stride + rowsize] = packed[y].tobytes()
 
 # MicroPython basic bitmap font renderer.
 # Author: Tony DiCola
@@ -440,6 +1078,8 @@ class BitmapFont:
         try:
             self._font = open(self.font_name, 'rb')
             self.font_width, self.font_height = struct.unpack('BB', self._font.read(2))
+            # the columns of one character, read at once by draw_char
+            self._glyph = bytearray(self.font_width)
             # simple font file validation check based on expected file size
             if 2 + 256 * self.font_width != os.stat(font_name)[6]:
                 raise RuntimeError("Invalid font file: " + font_name)
@@ -471,14 +1111,12 @@ class BitmapFont:
         #if x < -self.font_width or x >= framebuffer.width or \
         #   y < -self.font_height or y >= framebuffer.height:
         #    return
+        # Grab the bytes of all columns of the character, maybe the character isn't there
+        self._font.seek(2 + (ord(char) * self.font_width))
+        count = self._font.readinto(self._glyph) or 0
         # Go through each column of the character.
-        for char_x in range(self.font_width):
-            # Grab the byte for the current column of font data.
-            self._font.seek(2 + (ord(char) * self.font_width) + char_x)
-            try:
-                line = struct.unpack('B', self._font.read(1))[0]
-            except RuntimeError:
-                continue # maybe character isnt there? go to next
+        for char_x in range(count):
+            line = self._glyph[char_x]
             # Go through each row in the column byte.
             for char_y in range(self.font_height):
                 # Draw a pixel for each bit that's flipped on.
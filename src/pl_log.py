@@ -0,0 +1,153 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_log'
+# ====================================================
+# CircuitPython event-log of the display-drivers
+# * Author(s): pl-micro-epd contributors
+#
+# Messages with a level of at least getlevel() (INFO by default) are kept in a ring-buffer of
+# the last getsize() messages, those of at least getecho() (WARNING by default) are printed as
+# well. Printing goes out over USB/ UART and takes milliseconds, keeping a message only stores
+# references: the text is formatted (message % arg) when the log is read with entries() or
+# dump(), so messages should be constant strings with their values in ``arg``.
+
+from array import array
+import pl_timing
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+_level = INFO
+_echo = WARNING
+_size = 0
+_times = None       # ms, see pl_timing.ticks_ms
+_levels = None
+_messages = None
+_args = None
+_next = 0           # index of the next entry
+_count = 0          # entries in the ring-buffer
+
+
+def setsize(size):
+# allocates the ring-buffer for ``size`` messages, the log is cleared
+    global _size, _times, _levels, _messages, _args, _next, _count     # pylint: disable=global-statement
+    _size = size
+    _times = array('L', [0] * size)
+    _levels = bytearray(size)
+    _messages = [None] * size
+    _args = [None] * size
+    _next = 0
+    _count = 0
+
+
+def getsize():
+    return _size
+
+
+def setlevel(level):
+# messages below ``level`` are dropped
+    global _level   # pylint: disable=global-statement
+    _level = level
+
+
+def getlevel():
+    return _level
+
+
+def setecho(level):
+# messages of at least ``level`` are printed as well, OFF: nothing is printed
+    global _echo    # pylint: disable=global-statement
+    _echo = level
+
+
+def getecho():
+    return _echo
+
+
+def log(level, message, arg=None):
+    global _next, _count    # pylint: disable=global-statement
+    if level >= _echo:
+        print(message % arg if arg is not None else message)
+    if level < _level or not _size:
+        return
+    index = _next
+    _times[index] = pl_timing.ticks_ms()
+    _levels[index] = level
+    _messages[index] = message
+    _args[index] = arg
+    _next = (index + 1) % _size
+    if _count < _size:
+        _count += 1
+
+
+def debug(message, arg=None):
+    log(DEBUG, message, arg)
+
+
+def info(message, arg=None):
+    log(INFO, message, arg)
+
+
+def warning(message, arg=None):
+    log(WARNING, message, arg)
+
+
+def error(message, arg=None):
+    log(ERROR, message, arg)
+
+
+def entries(level=DEBUG):
+# the kept messages of at least ``level``, oldest first, as list of (time in ms, level, text)
+    result = []
+    start = (_next - _count) % _size if _size else 0
+    for i in range(_count):
+        index = (start + i) % _size
+        if _levels[index] >= level:
+            message = _messages[index]
+            if _args[index] is not None:
+                message = message % _args[index]
+            result.append((_times[index], _levels[index], message))
+    return result
+
+
+def dump(write=print, level=DEBUG):
+# hands the kept messages line by line to ``write`` (print by default)
+    for timestamp, msg_level, message in entries(level):
+        write('%10d %-7s %s' % (timestamp, _NAMES.get(msg_level, msg_level), message))
+
+
+def clear():
+    global _next, _count    # pylint: disable=global-statement
+    for i in range(_size):
+        _messages[i] = None
+        _args[i] = None
+    _next = 0
+    _count = 0
+
+
+setsize(32)
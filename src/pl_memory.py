@@ -0,0 +1,181 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_memory'
+# ====================================================
+# CircuitPython module measuring the memory allocated by the calls of a display
+# * Author(s): pl-micro-epd contributors
+#
+# attach(display) wraps the public methods of a display (PUBLIC) so that every call from
+# outside is measured, calls the driver makes to itself count for the outer call.
+# On the boards the garbage-collector is disabled during the call and the growth of
+# gc.mem_alloc() is what the call allocated, temporary objects included. Under CPython (e.g.
+# with tools/pl_sim) tracemalloc-snapshots before and after the call give the bytes allocated
+# by the modules next to this one which are still held after the call, ``peak`` is the
+# highest growth of all traced memory during the call (simulator included).
+# ``temporary`` are all bytes allocated during the call, the ones freed again included, i.e.
+# the garbage left for the gc: the growth of gc.mem_alloc() on the boards, under CPython it's
+# only measured by a ``tracer`` set on the profile (see tools/pl_memtrace.py).
+#
+# usage:
+#   profile = pl_memory.attach(display)
+#   display.update(0)
+#   display.update(0)
+#   assert profile.allocated('update') == 0     # the first call may fill caches
+#   print(profile.report())
+
+import gc
+
+try:
+    import os
+    import tracemalloc
+except ImportError:
+    tracemalloc = None  # CircuitPython, gc.mem_alloc is used
+
+PUBLIC = ('begin', 'update', 'refresh', 'write_ram', 'whiteerase', 'power_up', 'power_down',
+          'image', 'image_bmp', 'image_bmp_stream', 'image_epd', 'set_vborder_color', 'render')
+
+if tracemalloc is not None:
+    # allocations of the driver-modules, not of the profiling itself
+    _FILTERS = (tracemalloc.Filter(True, os.path.join(os.path.dirname(__file__), '*')),
+                tracemalloc.Filter(False, __file__))
+
+
+def _traced():
+# bytes held by the driver-modules (CPython)
+    snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    return sum(stat.size for stat in snapshot.statistics('filename'))
+
+
+class MemoryProfile:
+    # memory allocated per call, by the name of the method
+
+    def __init__(self):
+        # name -> [calls, bytes of the last call, maximum, peak and temporary bytes of the last call]
+        self.calls = {}
+        # CPython: function(func, args, kwargs) calling func(*args, **kwargs) and returning
+        # (result, temporary bytes), None: temporary allocations aren't measured
+        self.tracer = None
+        self._depth = 0
+
+    def measure(self, name, func, *args, **kwargs):
+    # calls func(*args, **kwargs) and records the bytes allocated under ``name``, nested
+    # calls are not measured on their own
+        if self._depth:
+            return func(*args, **kwargs)
+        self._depth += 1
+        try:
+            if tracemalloc is None:
+                return self._measure_gc(name, func, args, kwargs)
+            return self._measure_tracemalloc(name, func, args, kwargs)
+        finally:
+            self._depth -= 1
+
+    def _measure_gc(self, name, func, args, kwargs):
+        gc.collect()
+        gc.disable()
+        start = gc.mem_alloc()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            allocated = gc.mem_alloc() - start
+            gc.enable()
+            self._record(name, allocated, allocated, allocated)
+
+    def _measure_tracemalloc(self, name, func, args, kwargs):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        gc.collect()
+        start = _traced()
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        if self.tracer is None:
+            result, temporary = func(*args, **kwargs), None
+        else:
+            result, temporary = self.tracer(func, args, kwargs)
+        peak = tracemalloc.get_traced_memory()[1] - current
+        gc.collect()    # empties the free-lists of the interpreter as well
+        self._record(name, _traced() - start, peak, temporary)
+        return result
+
+    def _record(self, name, allocated, peak, temporary):
+        entry = self.calls.get(name)
+        if entry is None:
+            self.calls[name] = [1, allocated, allocated, peak, temporary]
+        else:
+            entry[0] += 1
+            entry[1] = allocated
+            entry[2] = max(entry[2], allocated)
+            entry[3] = peak
+            entry[4] = temporary
+
+    def allocated(self, name):
+    # bytes allocated by the last call of ``name``, None if it wasn't called
+        entry = self.calls.get(name)
+        return entry[1] if entry is not None else None
+
+    def temporary(self, name):
+    # bytes allocated during the last call of ``name`` including the ones freed again, None if
+    # it wasn't called or not measured (see tracer)
+        entry = self.calls.get(name)
+        return entry[4] if entry is not None else None
+
+    def reset(self):
+        self.calls = {}
+
+    def report(self):
+    # one line per method as text
+        lines = []
+        for name in sorted(self.calls):
+            calls, last, maximum, peak, temporary = self.calls[name]
+            lines.append('%-18s %5d calls  last %7d  max %7d  peak %7d  temporary %7s bytes' %
+                         (name, calls, last, maximum, peak,
+                          '-' if temporary is None else temporary))
+        return '\n'.join(lines)
+
+
+def _wrap(profile, name, method):
+# the measured method, a function of its own so every wrapper keeps its name and method
+    def wrapper(*args, **kwargs):
+        return profile.measure(name, method, *args, **kwargs)
+    return wrapper
+
+
+def attach(display, names=PUBLIC, profile=None):
+# measures every call of the methods ``names`` of display with ``profile`` (a new MemoryProfile
+# by default), which is returned
+    if profile is None:
+        profile = MemoryProfile()
+    for name in names:
+        method = getattr(display, name, None)
+        if method is not None:
+            setattr(display, name, _wrap(profile, name, method))
+    return profile
+
+
+def detach(display, names=PUBLIC):
+# removes the measurement of attach, the methods of the class are used again
+    for name in names:
+        try:
+            delattr(display, name)
+        except AttributeError:
+            pass
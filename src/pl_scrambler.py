@@ -25,7 +25,12 @@
 # CircuitPython scrambling module
 # * Author(s): Andreas Boenicke
 
-from micropython import const
+try:
+    from micropython import const
+except ImportError:
+    # CPython, e.g. for the host-tools in tools/
+    def const(x):
+        return x
 
 
 # defines a structure representing a array scrambling configuration
@@ -76,6 +81,9 @@ SCRAMBLING_SOURCE_MIRROR_LH_MASK = const(1 << SCRAMBLING_SOURCE_MIRROR_LH_BIT)
 scramblingmode = 0x00
 slcount = 72
 glcount = 148
+# 2: the image is turned by 180 degrees while it is scrambled (folded into the permutation,
+# see _streammap), 0: as it is
+rotation = 0
 
   
 def getscramblemode():
@@ -101,49 +109,233 @@ def getslcount():
 def setslcount(x):
     global slcount
     slcount = x
+
+def getrotation():
+    global rotation
+    return rotation
+
+def setrotation(x):
+    global rotation
+    if not x in (0, 2):
+        raise ValueError("Scrambling can only turn the image by 0 or 2 (180 degrees)")
+    rotation = x
     
-def scramble_array(sourcebuffer):
+def scramble_array(sourcebuffer, targetbuffer=None):
 # copies data from source to target array while applying a scrambling algorithm
 # Expects data in source array as sourceline fast addressed and starting with gate=0 and source=0
-    global scramblingmode
-    global slcount
-    global glcount
-    _sourcebuffer = sourcebuffer
-    _slcount = slcount
-    _glcount = glcount
-    if (scramblingmode == 0):
+# The scrambled image is written to targetbuffer (same size as sourcebuffer) if one is given,
+# otherwise to a new bytearray
+    if (scramblingmode == 0 and rotation == 0):
         # no need to scramble image data, just return the source-buffer
-        return _sourcebuffer
-    else:
-        # need to scramble image data based on scrambling mode
-        targetbuffer = bytearray(len(_sourcebuffer))
-        for gl in range(0, _glcount, 1):
-            for sl in range(0, _slcount, 1):
-            
-                          
-                # calculates the consecutive pixel-position in source- and target-framebuffer
-                target_pix = calc_scrambled_index(gl, sl, _glcount, _slcount)
-                source_pix = calc_pixel_index(gl, sl, slcount) 
-            
-                # buffer-index assuming 4 pixel per byte
-                source_idx = (source_pix // 4)
-                target_idx = (target_pix // 4)
-            
-                # get pixel-color information from source-framebuffer
-                source_offset = 3 - (source_pix & 0x03)
-                pixel = (_sourcebuffer[source_idx] >> (source_offset * 2)) & 0x03
-            
-                # write the just gained pixel-color information in the right position in the target-framebuffer
-                if ((target_pix % 4) == 0):
-                    targetbuffer[target_idx] = ((targetbuffer[target_idx] & 0x3f) | (pixel << 6))
-                elif ((target_pix % 4) == 1):
-                    targetbuffer[target_idx] = ((targetbuffer[target_idx] & 0xcf) | (pixel << 4))
-                elif ((target_pix % 4) == 2):
-                    targetbuffer[target_idx] = ((targetbuffer[target_idx] & 0xf3) | (pixel << 2))
-                elif ((target_pix % 4) == 3):
-                    targetbuffer[target_idx] = ((targetbuffer[target_idx] & 0xfc) | pixel)
-                          
+        return sourcebuffer
+    # need to scramble image data based on scrambling mode
+    target = targetbuffer if targetbuffer is not None else bytearray(len(sourcebuffer))
+    _streammap()
+    pairs = glcount // 2
+    size = slcount // 2     # bytes per pair of gate lines
+    for block in range(pairs):
+        _scramble_pair(sourcebuffer, (pairs - 1 - block if _map_reverse else block) * size,
+                       target, block * size)
+    return target
+
+
+# 2 bit pixel values of all 256 byte-values (4 per byte, first pixel in the MSBs)
+_UNPACK = bytearray(1024)
+for _value in range(256):
+    for _pixel in range(4):
+        _UNPACK[_value * 4 + _pixel] = (_value >> (6 - 2 * _pixel)) & 0x03
+
+# all 256 byte-values with the order of their four 2 bit pixels reversed
+_REVERSE = bytearray(256)
+for _value in range(256):
+    _REVERSE[_value] = ((_value & 0x03) << 6) | ((_value & 0x0c) << 2) | \
+                       ((_value & 0x30) >> 2) | (_value >> 6)
+
+# permutation of the current scrambling configuration, see _streammap
+_map_mode = None
+_map_rotation = 0
+_map_slcount = 0
+_map_glcount = 0
+_map = None
+_map_bytewise = False
+_map_reverse = False
+# scratch-buffers of the current configuration: one scrambled pair of gate lines and its pixels
+_target = None
+_pixels = None
+# all of the above for every configuration used so far, by
+# ((rotation >> 1) << 29) | (glcount << 20) | (slcount << 10) | mode (see _streammap), so that
+# displays with different panels (see PL_EPD._use_scrambling) can take turns
+_maps = {}
+
+
+def _streammap():
+# Scrambling moves the pixels of the gate lines 2k and 2k+1 into one block of the target which
+# has the same size (2 * slcount pixel) and is the same for every k apart from its position.
+# Computes the permutation inside of such a block (source pixel for each target pixel) derived
+# from calc_scrambled_index and whether the block order is reversed (gate direction).
+# Turning the image by 180 degrees (rotation 2) reverses the order of the pairs and of the
+# pixels inside of each pair, it is folded into both and costs nothing extra.
+# If every target byte is a whole source byte, possibly with its pixel order reversed, the
+# permutation is given per byte instead: the source byte s or ~s for a reversed one.
+# The results are kept in _map, _map_bytewise and _map_reverse, they are only computed once
+# per configuration (nothing is allocated when the configuration is used again).
+    global _map_mode
+    global _map_rotation
+    global _map_slcount
+    global _map_glcount
+    global _map
+    global _map_bytewise
+    global _map_reverse
+    global _target
+    global _pixels
+    if _map_mode == scramblingmode and _map_slcount == slcount and _map_glcount == glcount \
+            and _map_rotation == rotation:
+        return
+    # a small int on the boards (below 2**30): glcount < 512, slcount and mode < 1024
+    if glcount >= 0x200 or slcount >= 0x400 or scramblingmode >= 0x400:
+        raise ValueError("Unsupported scrambling configuration")
+    key = ((rotation >> 1) << 29) | (glcount << 20) | (slcount << 10) | scramblingmode
+    entry = _maps.get(key)
+    if entry is None:
+        if (slcount & 0x01) or (glcount & 0x01):
+            raise ValueError("Scrambling needs an even number of source and gate lines")
+        targets = [calc_scrambled_index(gl, sl, glcount, slcount)
+                   for gl in range(2) for sl in range(slcount)]
+        base = min(targets)
+        pixelmap = [0] * (2 * slcount)
+        for source_pix in range(2 * slcount):
+            pixelmap[targets[source_pix] - base] = source_pix
+        reverse = base != 0
+        if rotation:
+            # the pair k comes from the pair pairs-1-k, its pixel p from 2*slcount-1-p
+            pixelmap = [2 * slcount - 1 - source_pix for source_pix in pixelmap]
+            reverse = not reverse
+        bytemap = []
+        for target_idx in range(0, 2 * slcount, 4):
+            first = pixelmap[target_idx]
+            if (first & 0x03) == 0 and pixelmap[target_idx:target_idx + 4] == \
+                    [first, first + 1, first + 2, first + 3]:
+                bytemap.append(first >> 2)
+            elif (first & 0x03) == 3 and pixelmap[target_idx:target_idx + 4] == \
+                    [first, first - 1, first - 2, first - 3]:
+                bytemap.append(~(first >> 2))
+            else:
+                bytemap = None
+                break
+        entry = _maps[key] = (bytemap if bytemap is not None else pixelmap, bytemap is not None,
+                              reverse, bytearray(slcount // 2), bytearray(2 * slcount))
+    _map, _map_bytewise, _map_reverse, _target, _pixels = entry
+    _map_mode = scramblingmode
+    _map_rotation = rotation
+    _map_slcount = slcount
+    _map_glcount = glcount
+
+
+def _scramble_pair(source, base, target, target_base):
+# scrambles the pair of gate lines at source[base:] (slcount // 2 bytes, source order) into
+# target[target_base:], _streammap() must be up to date
+    permutation = _map
+    if _map_bytewise:
+        target_idx = target_base
+        for source_idx in permutation:
+            if source_idx >= 0:
+                target[target_idx] = source[base + source_idx]
+            else:
+                target[target_idx] = _REVERSE[source[base + ~source_idx]]
+            target_idx += 1
+        return
+    # the pixels of the pair are unpacked to one byte each, then picked in target order
+    size = slcount // 2
+    pixels = _pixels
+    pix = 0
+    for source_idx in range(base, base + size):
+        value = source[source_idx] << 2
+        pixels[pix] = _UNPACK[value]
+        pixels[pix + 1] = _UNPACK[value + 1]
+        pixels[pix + 2] = _UNPACK[value + 2]
+        pixels[pix + 3] = _UNPACK[value + 3]
+        pix += 4
+    pix = 0
+    for target_idx in range(target_base, target_base + size):
+        target[target_idx] = (pixels[permutation[pix]] << 6) | \
+                             (pixels[permutation[pix + 1]] << 4) | \
+                             (pixels[permutation[pix + 2]] << 2) | \
+                             pixels[permutation[pix + 3]]
+        pix += 4
+
+
+def scramble_stream(read_pair, write):
+# Scrambles the image while it is streamed, without a second full-size buffer.
+# read_pair(k) returns the 2 bit pixel data of the gate lines 2k and 2k+1 (slcount // 2 bytes),
+# write(data) receives the scrambled image in chunks of the same size in target order.
+# The chunks share one preallocated buffer, write has to consume them before it returns.
+    pairs = glcount // 2
+    if (scramblingmode == 0 and rotation == 0):
+        for pair in range(pairs):
+            write(read_pair(pair))
+        return
+    _streammap()
+    target = _target
+    for block in range(pairs):
+        _scramble_pair(read_pair(pairs - 1 - block if _map_reverse else block), 0, target, 0)
+        write(target)
+
+
+def scramble_buffer(sourcebuffer, write):
+# scramble_stream of an image in one buffer (source order like scramble_array), nothing is
+# allocated: the image is handed to write in one piece if it needs no scrambling, otherwise
+# pair by pair in the preallocated chunk-buffer
+    if (scramblingmode == 0 and rotation == 0):
+        write(sourcebuffer)
+        return
+    _streammap()
+    pairs = glcount // 2
+    size = slcount // 2
+    target = _target
+    for block in range(pairs):
+        _scramble_pair(sourcebuffer, (pairs - 1 - block if _map_reverse else block) * size,
+                       target, 0)
+        write(target)
+
+
+def descramble_array(targetbuffer):
+# reverses scramble_array: returns the image in source order (sourceline fast addressed and
+# starting with gate=0 and source=0) for data in the order of the display-RAM
+    if (scramblingmode == 0 and rotation == 0):
         return targetbuffer
+    _streammap()
+    permutation = _map
+    bytewise = _map_bytewise
+    reverse = _map_reverse
+    pairs = glcount // 2
+    size = slcount // 2
+    sourcebuffer = bytearray(len(targetbuffer))
+    pixels = bytearray(2 * slcount)
+    for block in range(pairs):
+        source_base = (pairs - 1 - block if reverse else block) * size
+        target_base = block * size
+        if bytewise:
+            for target_idx in range(size):
+                source_idx = permutation[target_idx]
+                if source_idx >= 0:
+                    sourcebuffer[source_base + source_idx] = targetbuffer[target_base + target_idx]
+                else:
+                    sourcebuffer[source_base + ~source_idx] = _REVERSE[targetbuffer[target_base + target_idx]]
+        else:
+            pix = 0
+            for target_idx in range(size):
+                value = targetbuffer[target_base + target_idx]
+                pixels[permutation[pix]] = value >> 6
+                pixels[permutation[pix + 1]] = (value >> 4) & 0x03
+                pixels[permutation[pix + 2]] = (value >> 2) & 0x03
+                pixels[permutation[pix + 3]] = value & 0x03
+                pix += 4
+            pix = 0
+            for source_idx in range(source_base, source_base + size):
+                sourcebuffer[source_idx] = (pixels[pix] << 6) | (pixels[pix + 1] << 4) | \
+                                           (pixels[pix + 2] << 2) | pixels[pix + 3]
+                pix += 4
+    return sourcebuffer
 
 
 def calc_pixel_index(gl, sl, slcount):
@@ -0,0 +1,101 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_spistats'
+# ====================================================
+# CircuitPython module counting the SPI-traffic of a display
+# * Author(s): pl-micro-epd contributors
+#
+# Counts the SPI-transactions (one per chip-select), the bytes written and read, the spins
+# waiting for the SPI-lock and the transactions per register. Optionally the last ``trace``
+# transactions are kept in a ring-buffer of preallocated arrays as
+# (time in us, command, data-length), command with bit 7 set for reads.
+# Enabled with PL_EPD.setspistats(True), the driver does no counting while disabled.
+
+from array import array
+import pl_timing
+
+
+class SPIStats:
+
+    def __init__(self, trace=0):
+        self.transactions = 0
+        self.written = 0        # bytes, including the command-bytes
+        self.read = 0
+        self.lock_spins = 0     # failed try_lock() calls
+        self.commands = {}      # register -> transactions
+        self._size = trace
+        self._times = array('L', [0] * trace)
+        self._commands = bytearray(trace)
+        self._lengths = array('L', [0] * trace)
+        self._next = 0          # index of the next trace-entry
+        self._count = 0         # entries in the trace
+
+    def transaction(self, command, written, read=0, spins=0):
+    # counts one transaction: ``written`` bytes (command-byte included) and ``read`` bytes
+        self.transactions += 1
+        self.written += written
+        self.read += read
+        self.lock_spins += spins
+        register = command & 0x7f
+        self.commands[register] = self.commands.get(register, 0) + 1
+        if self._size:
+            index = self._next
+            self._times[index] = pl_timing.ticks_us()
+            self._commands[index] = command
+            self._lengths[index] = written - 1 + read
+            self._next = (index + 1) % self._size
+            if self._count < self._size:
+                self._count += 1
+
+    def reset(self):
+    # clears the counters and the trace
+        self.transactions = 0
+        self.written = 0
+        self.read = 0
+        self.lock_spins = 0
+        self.commands = {}
+        self._next = 0
+        self._count = 0
+
+    def trace(self):
+    # the traced transactions, oldest first, as list of (time in us, command, data-length)
+        start = (self._next - self._count) % self._size if self._size else 0
+        entries = []
+        for i in range(self._count):
+            index = (start + i) % self._size
+            entries.append((self._times[index], self._commands[index], self._lengths[index]))
+        return entries
+
+    def summary(self):
+    # the counters as one line of text
+        registers = ' '.join('%02x:%d' % (register, self.commands[register])
+                             for register in sorted(self.commands))
+        return 'SPI: %d transactions, %d bytes written, %d read, %d lock-spins, registers %s' % (
+            self.transactions, self.written, self.read, self.lock_spins, registers)
+
+    def dump(self, write=print):
+    # hands the summary and one line per traced transaction to ``write`` (print by default,
+    # e.g. a function sending the lines over the BLE-UART)
+        write(self.summary())
+        for timestamp, command, length in self.trace():
+            write('%10d %02x %d' % (timestamp, command, length))
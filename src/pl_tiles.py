@@ -0,0 +1,233 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_tiles'
+# ====================================================
+# CircuitPython module combining several displays into one drawing surface
+# * Author(s): pl-micro-epd contributors
+#
+# PL_Tiles is a canvas with the drawing-methods of pl_framebuf.FrameBuffer, made of tiles: each
+# tile is a display (PL_UC8156) placed with its top-left corner at an offset of the canvas, in
+# its own rotation. Gaps between the tiles (e.g. for the bezels of the panels) belong to the
+# canvas but aren't shown, so lines and shapes continue across the gaps at the right position.
+# A drawing-call is handed to the framebuffers of the tiles intersecting its bounding box in
+# their own coordinates, every framebuffer clips it against itself. The framebuffer and size of
+# a tile are taken from its display at every call, a display may replace its framebuffer when
+# it is rotated (see PL_EPD.sethwrotation). The framebuffers keep track of their changes (see
+# FrameBuffer.dirty), update() uploads and refreshes only the tiles changed since their last
+# upload, their update-cycles overlap (see pl_bus).
+# The canvas draws into the framebuffers immediately, the deferred mode of the displays
+# (see PL_EPD.setdeferred) shouldn't be used for tiles.
+#
+# usage:
+#   tiles = pl_tiles.PL_Tiles()
+#   tiles.add(left, 0, 0)
+#   tiles.add(right, left_width + 4, 0)     # 4 pixel of bezel between both panels
+#   tiles.begin()
+#   tiles.line(0, 0, tiles.width - 1, tiles.height - 1, BLACK)
+#   tiles.update(0)
+
+import pl_bus
+import pl_framebuf
+
+
+class PL_Tiles:
+    # the displays of one drawing surface
+
+    def __init__(self, bus=None):
+        # the displays are updated by ``bus`` (a pl_bus.PL_Bus, a new one by default)
+        self.bus = pl_bus.PL_Bus() if bus is None else bus
+        # (display, x, y) of every tile
+        self._tiles = []
+
+    @property
+    def width(self):
+    # width of the canvas, up to the right edge of the rightmost tile
+        return max([x + _area(display)[1] for display, x, _ in self._tiles] or [0])
+
+    @property
+    def height(self):
+    # height of the canvas, up to the bottom edge of the lowest tile
+        return max([y + _area(display)[2] for display, _, y in self._tiles] or [0])
+
+    def add(self, display, x, y, rotation=None):
+    # places ``display`` with the top-left corner of its (rotated) framebuffer at (x, y) of the
+    # canvas, ``rotation`` (see PL_EPD.setrotation) is set first if given
+    # pylint: disable=too-many-arguments
+        if rotation is not None:
+            display.setrotation(rotation)
+        self._tiles.append((display, x, y))
+        if display not in self.bus.displays:
+            self.bus.add(display)
+
+    def displays(self):
+    # the displays of all tiles
+        return [tile[0] for tile in self._tiles]
+
+    def begin(self, reset=False):
+        for display in self.displays():
+            display.begin(reset)
+
+    def changed(self):
+    # the displays whose framebuffer changed since their last upload
+        return [tile[0] for tile in self._tiles if tile[0].getframebuf().dirty is not None]
+
+    def update(self, mode, force=False):
+    # uploads and refreshes the changed tiles (all with ``force``) with ``mode`` (see
+    # PL_UC8156.update), returns the updated displays
+        displays = self.displays() if force else self.changed()
+        if displays:
+            self.bus.update(mode, displays)
+        return displays
+
+    def _covering(self, x_0, y_0, x_1, y_1):
+    # the tiles intersecting the area x_0..x_1/ y_0..y_1 (inclusive, canvas coordinates) as
+    # (framebuffer, x, y) with the offset of the tile
+        for display, x, y in self._tiles:
+            framebuf, width, height = _area(display)
+            if x_0 < x + width and x_1 >= x and y_0 < y + height and y_1 >= y:
+                yield framebuf, x, y
+
+    def fill(self, color):
+    # Fill all tiles with the specified color.
+        for tile in self._tiles:
+            tile[0].getframebuf().fill(color)
+
+    def pixel(self, x, y, color=None):
+    # Set the pixel (x, y) to ``color``, get its color if ``color`` isn't given (None outside of
+    # the tiles).
+        for framebuf, t_x, t_y in self._covering(x, y, x, y):
+            return framebuf.pixel(x - t_x, y - t_y, color)
+        return None
+
+    def set_pixels(self, xs, ys, color):
+    # Set the pixels (xs[i], ys[i]) to the given color, see FrameBuffer.set_pixels.
+        if not xs:
+            return
+        for framebuf, t_x, t_y in self._covering(min(xs), min(ys), max(xs), max(ys)):
+            framebuf.set_pixels([x - t_x for x in xs], [y - t_y for y in ys], color)
+
+    def set_row(self, y, x, values):
+    # Set consecutive pixels of row y starting at x to the colors in ``values``.
+        for framebuf, t_x, t_y in self._covering(x, y, x + len(values) - 1, y):
+            framebuf.set_row(y - t_y, x - t_x, values)
+
+    def fill_rect(self, x, y, width, height, color):
+    # pylint: disable=too-many-arguments
+        self.rect(x, y, width, height, color, fill=True)
+
+    def rect(self, x, y, width, height, color, *, fill=False):
+    # Draw a rectangle, the outline only unless ``fill`` is set. FrameBuffer.rect draws the
+    # outline of the clipped rectangle, so the outline is drawn as four filled edges here
+    # (a tile mustn't show its border as an edge).
+    # pylint: disable=too-many-arguments
+        if width < 1 or height < 1:
+            return
+        if not fill and width > 2 and height > 2:
+            self.rect(x, y, width, 1, color, fill=True)
+            self.rect(x, y + height - 1, width, 1, color, fill=True)
+            self.rect(x, y + 1, 1, height - 2, color, fill=True)
+            self.rect(x + width - 1, y + 1, 1, height - 2, color, fill=True)
+            return
+        for framebuf, t_x, t_y in self._covering(x, y, x + width - 1, y + height - 1):
+            framebuf.rect(x - t_x, y - t_y, width, height, color, fill=True)
+
+    def hline(self, x, y, width, color):
+        self.rect(x, y, width, 1, color, fill=True)
+
+    def vline(self, x, y, height, color):
+        self.rect(x, y, 1, height, color, fill=True)
+
+    def line(self, x_0, y_0, x_1, y_1, color):
+    # Draw a line from (x_0, y_0) to (x_1, y_1), each tile draws its clipped part of the same
+    # line (see FrameBuffer._line)
+    # pylint: disable=too-many-arguments
+        for framebuf, t_x, t_y in self._covering(min(x_0, x_1), min(y_0, y_1),
+                                                 max(x_0, x_1), max(y_0, y_1)):
+            framebuf.line(x_0 - t_x, y_0 - t_y, x_1 - t_x, y_1 - t_y, color)
+
+    def circle(self, center_x, center_y, radius, color, *, fill=False):
+    # Draw a circle at the given midpoint location, radius and color.
+    # pylint: disable=too-many-arguments
+        for framebuf, t_x, t_y in self._covering(center_x - radius, center_y - radius,
+                                                 center_x + radius, center_y + radius):
+            framebuf.circle(center_x - t_x, center_y - t_y, radius, color, fill=fill)
+
+    def fill_circle(self, center_x, center_y, radius, color):
+        self.circle(center_x, center_y, radius, color, fill=True)
+
+    def polygon(self, points, color, *, fill=False):
+    # Draw the outline of a closed polygon through the list of (x, y) points, filled if
+    # ``fill`` is set.
+        if not points:
+            return
+        for framebuf, t_x, t_y in self._covering(min(p[0] for p in points),
+                                                 min(p[1] for p in points),
+                                                 max(p[0] for p in points),
+                                                 max(p[1] for p in points)):
+            framebuf.polygon([(p[0] - t_x, p[1] - t_y) for p in points], color, fill=fill)
+
+    def fill_polygon(self, points, color):
+        self.polygon(points, color, fill=True)
+
+    def triangle(self, x_0, y_0, x_1, y_1, x_2, y_2, color, *, fill=False):
+    # pylint: disable=too-many-arguments
+        self.polygon(((x_0, y_0), (x_1, y_1), (x_2, y_2)), color, fill=fill)
+
+    def fill_triangle(self, x_0, y_0, x_1, y_1, x_2, y_2, color):
+    # pylint: disable=too-many-arguments
+        self.polygon(((x_0, y_0), (x_1, y_1), (x_2, y_2)), color, fill=True)
+
+    def blit(self, source, x, y, key=None, palette=None):
+    # Draw the FrameBuffer ``source`` with its top-left corner at (x, y), see FrameBuffer.blit.
+    # pylint: disable=too-many-arguments
+        for framebuf, t_x, t_y in self._covering(x, y, x + source.width - 1,
+                                                 y + source.height - 1):
+            framebuf.blit(source, x - t_x, y - t_y, key, palette)
+
+    def text(self, string, x, y, color, *, font_name="font5x8.bin", size=1):
+    # Place text on the canvas, see FrameBuffer.text.
+    # pylint: disable=too-many-arguments
+        font = pl_framebuf.load_font(font_name)
+        lines = string.split('\n')
+        width = max(len(chunk) for chunk in lines) * (font.font_width + 1) * size
+        height = len(lines) * font.font_height * size
+        for framebuf, t_x, t_y in self._covering(x, y, x + width - 1, y + height - 1):
+            framebuf.text(string, x - t_x, y - t_y, color, font_name=font_name, size=size)
+
+    def image(self, img, dither=None):
+    # Set the tiles to their part of the PIL image ``img`` of the size of the canvas, see
+    # PL_EPD.image (``dither``)
+        if img.size != (self.width, self.height):
+            raise ValueError('Image must be same dimensions as the tiles ({0}x{1}).' \
+                .format(self.width, self.height))
+        for display, x, y in self._tiles:
+            _, width, height = _area(display)
+            display.image(img.crop((x, y, x + width, y + height)), dither)
+
+
+def _area(display):
+# the current framebuffer of ``display`` and its width and height on the canvas
+    framebuf = display.getframebuf()
+    if framebuf.rotation & 1:
+        return framebuf, framebuf.height, framebuf.width
+    return framebuf, framebuf.width, framebuf.height
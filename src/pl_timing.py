@@ -0,0 +1,190 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_timing'
+# ====================================================
+# CircuitPython module timing the phases of display-updates
+# * Author(s): pl-micro-epd contributors
+#
+# Every update (and whiteerase, refresh or write_ram on its own) gives one record: a dict with
+# the mode of the update, its total time and the time spent in each of PHASES, all in ns:
+#   render      rasterizing the display-list of the deferred mode
+#   write_ram   Python-side of the RAM-upload (reading and scrambling the buffer)
+#   spi         SPI-transfers of the image-data
+#   power_up    register-writes before the update
+#   pump        waiting for the voltage-pumps
+#   engine      display-engine running the waveform (busy-pin)
+#   power_down  switching the voltages off
+#   buffer      buffer-operations of whiteerase
+# Calls made inside of a running record (e.g. the three updates of whiteerase) add to it.
+# Records, their values and the timestamps (long integers on the boards) are allocated on the
+# heap, with ``enabled`` cleared nothing is recorded and nothing is allocated. Boards without
+# long integers have no clock in ns (``now`` is None), their updates can't be timed.
+
+import time
+
+try:
+    from time import monotonic_ns as now
+except ImportError:
+    # boards without long integers: ns would overflow the small integers after one second
+    now = None
+
+try:
+    # CircuitPython: a small integer (no allocation), wraps around after 2**29 ms
+    from supervisor import ticks_ms
+except ImportError:
+    def ticks_ms():
+        if now is None:
+            # wrapped before the conversion, the result stays a small integer
+            return int((time.monotonic() * 1000) % 0x20000000)
+        return (now() // 1000000) & 0x1fffffff
+
+
+def ticks_us():
+# timestamp in us e.g. of traces, wraps around after 2**32 us (boards without long integers:
+# counts in steps of 1 ms and wraps around after 1000 s)
+    if now is None:
+        return (ticks_ms() % 1000000) * 1000
+    return (now() // 1000) & 0xffffffff
+
+
+def ticks_diff(end, start):
+# us from the ticks_us() ``start`` to the ticks_us() ``end``, correct across one wrap-around
+    difference = end - start
+    if difference < 0:
+        difference += 1000000000 if now is None else 0x100000000
+    return difference
+
+
+PHASES = ('render', 'write_ram', 'spi', 'power_up', 'pump', 'engine', 'power_down', 'buffer')
+_FIELDS = PHASES + ('total',)
+
+
+class UpdateStats:
+    # records of the updates of a display, with minimum, maximum and average per mode.
+    # ``callback`` is called with each finished record.
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._enabled = now is not None
+        self.last = None        # the last finished record
+        self._record = None     # the running record
+        self._depth = 0
+        self._mark = 0
+        self._modes = {}
+
+    @property
+    def enabled(self):
+    # True: the updates are recorded, change only between updates. Can't be set without a
+    # clock in ns (see now).
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = bool(value) and now is not None
+
+    def begin(self, mode):
+    # starts a record, or a nested call inside of the running one
+        if not self._enabled:
+            return
+        self._depth += 1
+        if self._depth == 1:
+            self._record = {'mode': mode}
+            self._mark = now()
+
+    def mark(self, phase):
+    # the time since the previous mark is spent in ``phase``
+        if self._record is None:
+            return
+        timestamp = now()
+        self._record[phase] = self._record.get(phase, 0) + timestamp - self._mark
+        self._mark = timestamp
+
+    def add(self, phase, duration):
+    # ``duration`` ns measured separately are spent in ``phase`` (and not in the next mark)
+        if self._record is None:
+            return
+        self._record[phase] = self._record.get(phase, 0) + duration
+        self._mark += duration
+
+    def end(self):
+    # finishes the running record (of the outermost call)
+        if not self._enabled:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        record = self._record
+        self._record = None
+        total = 0
+        for phase in PHASES:
+            total += record.get(phase, 0)
+        record['total'] = total
+        self.last = record
+        summary = self._modes.get(record['mode'])
+        if summary is None:
+            summary = self._modes[record['mode']] = {'count': 0}
+        summary['count'] += 1
+        for phase in _FIELDS:
+            if phase in record:
+                value = record[phase]
+                entry = summary.get(phase)
+                if entry is None:
+                    summary[phase] = [value, value, value]
+                else:
+                    entry[0] = min(entry[0], value)
+                    entry[1] = max(entry[1], value)
+                    entry[2] += value
+        if self.callback is not None:
+            self.callback(record)
+
+    def modes(self):
+        return list(self._modes)
+
+    def summary(self, mode):
+    # {phase: (min, max, avg)} in ns and the number of records of ``mode``, None if there are none
+        summary = self._modes.get(mode)
+        if summary is None:
+            return None
+        count = summary['count']
+        result = {'count': count}
+        for phase, entry in summary.items():
+            if phase != 'count':
+                result[phase] = (entry[0], entry[1], entry[2] // count)
+        return result
+
+    def reset(self):
+        self.last = None
+        self._modes = {}
+
+    def report(self):
+    # the summary of all modes as text, in ms
+        lines = []
+        for mode in self._modes:
+            summary = self.summary(mode)
+            lines.append('mode %s (%d updates)' % (mode, summary['count']))
+            for phase in _FIELDS:
+                if phase in summary:
+                    low, high, avg = summary[phase]
+                    lines.append('  %-10s min %8.1f  max %8.1f  avg %8.1f ms' %
+                                 (phase, low / 1000000, high / 1000000, avg / 1000000))
+        return '\n'.join(lines)
@@ -32,8 +32,11 @@
 import time
 import pl_framebuf
 import pl_scrambler
+import pl_epdimage
+import pl_timing
+import pl_log
 from micropython import const
-from pl_epd import PL_EPD
+from pl_epd import PL_EPD, BMPImage, BMPError
 
 # Register-adress
 _UC8156c_REVISION = const(0x00)   # Revision, read only
@@ -61,12 +64,24 @@ _UC8156c_MTPREAD = const(0x043)
 _UC8156c_LOADMONOWF = const(0x44)
 
 
+def _mono_table():
+# 2 bit pixels (two bytes, 0x0 or 0x3 each) for the 8 pixels of every 1 bit byte-value
+    table = bytearray(512)
+    for value in range(256):
+        word = 0
+        for bit in range(7, -1, -1):
+            word = (word << 2) | (0x03 if (value >> bit) & 0x01 else 0x00)
+        table[2 * value] = word >> 8
+        table[2 * value + 1] = word & 0xff
+    return table
+
+
 class PL_UC8156(PL_EPD):
     # driver class for Plastic Logic ePaper display with UltraChip 8156c driver-chip
     
     
     # pylint: disable=too-many-arguments
-    def __init__(self, spi, *, cs_pin, rst_pin, busy_pin):
+    def __init__(self, spi, *, cs_pin, rst_pin, busy_pin, mono=False):
         super(PL_UC8156, self).__init__(spi, cs_pin, rst_pin, busy_pin)        
         
         # hardware reset & communication-check
@@ -77,9 +92,33 @@ class PL_UC8156(PL_EPD):
         self.getepdsize()   
         
         # Framebuffer-Setup with just retrieved display-geometry-data
-        self._buffersize = self._width * self._height // 4
-        self._buffer = bytearray(self._buffersize)
-        self._framebuf = pl_framebuf.FrameBuffer(self._buffer, self._width, self._height, buf_format=pl_framebuf.GS4_HMSB)
+        # mono = True: 1 bit per pixel (BLACK or WHITE, all other colors are drawn white) at
+        # half the RAM, expanded to the 2 bit pixels of the display while uploading
+        self._mono = mono
+        if mono:
+            stride = (self._width + 7) & ~0x07      # every line starts at a full byte
+            self._buffersize = stride * self._height // 8
+            self._buffer = bytearray(self._buffersize)
+            self._framebuf = pl_framebuf.FrameBuffer(self._buffer, self._width, self._height, buf_format=pl_framebuf.MHMSB, stride=stride)
+            self._monotable = _mono_table()
+            self._monoline = bytearray(stride // 4)
+            self._monopair = bytearray(self._width // 2)
+        else:
+            self._buffersize = self._width * self._height // 4
+            self._buffer = bytearray(self._buffersize)
+            self._framebuf = pl_framebuf.FrameBuffer(self._buffer, self._width, self._height, buf_format=pl_framebuf.GS4_HMSB)
+        
+        # bound methods handed to the scrambler on every upload, created only once
+        self._write_chunk = self._stream_write
+        self._read_mono = self._read_mono_pair
+        self._streamed = 0      # bytes of the running RAM-upload
+        
+        # rotation by the driver (see sethwrotation and _rotate_framebuf): the framebuffer is
+        # transposed, the uploads are turned by _uploadrotation (0 or 2) while scrambling
+        self._transposed = False
+        self._uploadrotation = 0
+        self._read_transposed = self._read_transposed_pair
+        self._transposepair = None  # the pair of gate lines read from the transposed framebuffer
     
     def hardware_reset(self):
         # If we have a reset pin, do a hardware reset by toggling it
@@ -93,7 +132,7 @@ class PL_UC8156(PL_EPD):
             self._rst.value = True
             time.sleep(0.035)
             self.busy_wait(0.001)
-            print("Reset driver-chip")
+            pl_log.info("Reset driver-chip")
             
     def comm_check(self): 
     # checks connection to the display by reading the revision-register
@@ -101,7 +140,7 @@ class PL_UC8156(PL_EPD):
         if (self.read(_UC8156c_REVISION, 1) == b'\x00'):
             raise RuntimeError("Display not responding. Please check wiring/ power-supply!")
         else:
-            print("Connected to display")
+            pl_log.info("Connected to display")
            
     def begin(self, reset=False):
         # Begin communication with the display and set basic settings
@@ -110,35 +149,35 @@ class PL_UC8156(PL_EPD):
         
         # Driver-chip configuration
         if (self.epdsize == 11):
-            self.command(_UC8156c_PANELSETTING, bytearray([0x12]))
-            self.command(_UC8156c_WRITEPXRECTSET, bytearray([0x00, 0x47, 0x00, 0x93]))
-            self.command(_UC8156c_VCOMCONFIG, bytearray([0x00, 0x00, 0x24, 0x07]))
-            self.command(_UC8156c_DATENTRYMODE, bytearray([0x02]))
+            self.command(_UC8156c_PANELSETTING, b'\x12')
+            self.command(_UC8156c_WRITEPXRECTSET, b'\x00\x47\x00\x93')
+            self.command(_UC8156c_VCOMCONFIG, b'\x00\x00\x24\x07')
+            self.command(_UC8156c_DATENTRYMODE, b'\x02')
         elif (self.epdsize == 14):
-            self.command(_UC8156c_PANELSETTING, bytearray([0x12]))
-            self.command(_UC8156c_WRITEPXRECTSET, bytearray([0x00, 0xb3, 0x3c, 0x9f]))
-            self.command(_UC8156c_VCOMCONFIG, bytearray([0x00, 0x00, 0x24, 0x07]))
-            self.command(_UC8156c_DATENTRYMODE, bytearray([0x02]))
+            self.command(_UC8156c_PANELSETTING, b'\x12')
+            self.command(_UC8156c_WRITEPXRECTSET, b'\x00\xb3\x3c\x9f')
+            self.command(_UC8156c_VCOMCONFIG, b'\x00\x00\x24\x07')
+            self.command(_UC8156c_DATENTRYMODE, b'\x02')
         elif (self.epdsize == 21):
-            self.command(_UC8156c_PANELSETTING, bytearray([0x11]))
-            self.command(_UC8156c_WRITEPXRECTSET, bytearray([0x00, 0xef, 0x00, 0x91]))
-            self.command(_UC8156c_VCOMCONFIG, bytearray([0x00, 0x00, 0x24, 0x07]))
-            self.command(_UC8156c_DATENTRYMODE, bytearray([0x00]))
+            self.command(_UC8156c_PANELSETTING, b'\x11')
+            self.command(_UC8156c_WRITEPXRECTSET, b'\x00\xef\x00\x91')
+            self.command(_UC8156c_VCOMCONFIG, b'\x00\x00\x24\x07')
+            self.command(_UC8156c_DATENTRYMODE, b'\x00')
         elif (self.epdsize == 31):
-            self.command(_UC8156c_PANELSETTING, bytearray([0x12]))
-            self.command(_UC8156c_WRITEPXRECTSET, bytearray([0x00, 0x93, 0x00, 0x9b]))
-            self.command(_UC8156c_VCOMCONFIG, bytearray([0x50, 0x01, 0x24, 0x07]))
-            self.command(_UC8156c_DATENTRYMODE, bytearray([0x02]))
+            self.command(_UC8156c_PANELSETTING, b'\x12')
+            self.command(_UC8156c_WRITEPXRECTSET, b'\x00\x93\x00\x9b')
+            self.command(_UC8156c_VCOMCONFIG, b'\x50\x01\x24\x07')
+            self.command(_UC8156c_DATENTRYMODE, b'\x02')
         else:
             raise RuntimeError("Unimplemented display-type!")
         
-        self.command(_UC8156c_DRIVERVOLTAGE, bytearray([0x25, 0xff]))
-        self.command(_UC8156c_BORDERSETTING, bytearray([0x04]))
-        self.command(_UC8156c_LOADMONOWF, bytearray([0x60]))
-        self.command(_UC8156c_INITTEMPERATURE, bytearray([0x0a]))
-        self.command(_UC8156c_BOOSTSETTING, bytearray([0x22, 0x17]))
+        self.command(_UC8156c_DRIVERVOLTAGE, b'\x25\xff')
+        self.command(_UC8156c_BORDERSETTING, b'\x04')
+        self.command(_UC8156c_LOADMONOWF, b'\x60')
+        self.command(_UC8156c_INITTEMPERATURE, b'\x0a')
+        self.command(_UC8156c_BOOSTSETTING, b'\x22\x17')
         
-        print("Init complete!")
+        pl_log.info("Init complete!")
    
     def busy_wait(self, duration):
         # Wait for display to be done with current task, either by polling the
@@ -153,35 +192,38 @@ class PL_UC8156(PL_EPD):
         # Power up the display in preparation for writing RAM and updating
         self.busy_wait(duration = 0.001)
         if (self.epdsize == 11):
-            self.command(_UC8156c_SETRESOLUTION, bytearray([0x00, 0xef, 0x00, 0x93]))
+            self.command(_UC8156c_SETRESOLUTION, b'\x00\xef\x00\x93')
         elif (self.epdsize == 14):
-            self.command(_UC8156c_SETRESOLUTION, bytearray([0x00, 0xef, 0x00, 0x9f]))
+            self.command(_UC8156c_SETRESOLUTION, b'\x00\xef\x00\x9f')
         elif (self.epdsize == 21):
-            self.command(_UC8156c_SETRESOLUTION, bytearray([0x00, 0xef, 0x00, 0x9f]))
+            self.command(_UC8156c_SETRESOLUTION, b'\x00\xef\x00\x9f')
         elif (self.epdsize == 31):
-            self.command(_UC8156c_SETRESOLUTION, bytearray([0x00, 0xef, 0x00, 0x9f]))
-        self.command(_UC8156c_TCOMTIMING, bytearray([0x67, 0x55]))
-        self.command(_UC8156c_POWERSEQUENCE, bytearray([0x00, 0x00, 0x00]))
-        self.command(_UC8156c_POWERCONTROL, bytearray([0xd1]))
+            self.command(_UC8156c_SETRESOLUTION, b'\x00\xef\x00\x9f')
+        self.command(_UC8156c_TCOMTIMING, b'\x67\x55')
+        self.command(_UC8156c_POWERSEQUENCE, b'\x00\x00\x00')
+        self.command(_UC8156c_POWERCONTROL, b'\xd1')
+        self.stats.mark('power_up')
         
-        while(self.read(_UC8156c_STATUS, 1) == b'\x00'):   # wait until internal voltage-pump is ready
+        while(self.read_byte(_UC8156c_STATUS) == 0x00):   # wait until internal voltage-pump is ready
             pass
         self.busy_wait(duration = 0.001)   
+        self.stats.mark('pump')
         
         
     def power_down(self):
         # Power down the display - required when not actively displaying!
-        self.command(_UC8156c_POWERCONTROL, bytearray([0xd0]))
+        self.command(_UC8156c_POWERCONTROL, b'\xd0')
         self.busy_wait(duration = 0.07)
-        self.command(_UC8156c_POWERCONTROL, bytearray([0xc0]))
+        self.command(_UC8156c_POWERCONTROL, b'\xc0')
         self.busy_wait(duration = 0.001)
+        self.stats.mark('power_down')
         
 
     def deep_sleep(self):
     # Putting the UC8156 in deep sleep mode with less than 1µA current @3.3V.
     # Reset pin toggling needed to wakeup the driver IC again.
-        self.command(_UC8156c_SLEEPMODE, bytearray([0xff, 0xff, 0xff, 0xff]))
-        print("Sleepmode activated. Reset required before further display-updates are possible again!")
+        self.command(_UC8156c_SLEEPMODE, b'\xff\xff\xff\xff')
+        pl_log.info("Sleepmode activated. Reset required before further display-updates are possible again!")
     
     
 # UPDATE
@@ -203,52 +245,342 @@ class PL_UC8156(PL_EPD):
     
     def update(self, mode):    # mode: 0 = full update, 1 = only changed pixels are updated, 2 = monochrome
         # Update the display from internal memory
-        self.write_ram()
-        self.power_up()
-        if (mode == 0):
-            self.command(_UC8156c_PROGRAMMTP, bytearray([0x00]))
-            self.command(_UC8156c_DISPLAYENGINE, bytearray([0x03]))
-            self.busy_wait(duration = 0.88)
-        elif (mode == 1):
-            self.command(_UC8156c_PROGRAMMTP, bytearray([0x00]))
-            self.command(_UC8156c_DISPLAYENGINE, bytearray([0x07]))
-            self.busy_wait(duration = 0.88)
-        elif (mode == 2):
-            self.command(_UC8156c_PROGRAMMTP, bytearray([0x02]))
-            self.command(_UC8156c_DISPLAYENGINE, bytearray([0x07]))
-            self.busy_wait(duration = 0.34)
-        else:
-            print('Error while configuring update-mode!')
-        self.power_down()
-        print("Update complete!")
+        self.stats.begin(mode)
+        try:
+            self.write_ram()
+            self.refresh(mode)
+        finally:
+            self.stats.end()
+
+    def refresh(self, mode):
+        # Runs the update-cycle with the image already in the RAM of the driver-chip
+        self.start_refresh(mode)
+        self.finish_refresh()
+
+    def start_refresh(self, mode):
+        # Powers up and starts the display engine with ``mode`` (see update) without waiting
+        # for its end. The SPI-bus is free while the engine runs (e.g. for uploads to other
+        # displays, see pl_bus), finish_refresh has to follow before the next command.
+        self.stats.begin(mode)
+        started = False
+        try:
+            self.power_up()
+            if (mode == 0):
+                self.command(_UC8156c_PROGRAMMTP, b'\x00')
+                self.command(_UC8156c_DISPLAYENGINE, b'\x03', wait=False)
+            elif (mode == 1):
+                self.command(_UC8156c_PROGRAMMTP, b'\x00')
+                self.command(_UC8156c_DISPLAYENGINE, b'\x07', wait=False)
+            elif (mode == 2):
+                self.command(_UC8156c_PROGRAMMTP, b'\x02')
+                self.command(_UC8156c_DISPLAYENGINE, b'\x07', wait=False)
+            else:
+                pl_log.error('Error while configuring update-mode!')
+            started = True
+        finally:
+            if not started:     # the record is finished by finish_refresh otherwise
+                self.stats.end()
+
+    def finish_refresh(self):
+        # Waits for the display engine started by start_refresh (busy pin) and powers down
+        try:
+            self.busy_wait(duration = 0.001)
+            self.stats.mark('engine')
+            self.power_down()
+        finally:
+            self.stats.end()
+        pl_log.info("Update complete!")
         
     def write_ram(self):
-        if (self.epdsize == 11):
-            self.command(_UC8156c_PIXELACESSPOS, bytearray([0x00, 0x93]))
-        elif (self.epdsize == 14):
-            self.command(_UC8156c_PIXELACESSPOS, bytearray([0x00, 0x9f]))
-        elif (self.epdsize == 21):
-            self.command(_UC8156c_PIXELACESSPOS, bytearray([0x00, 0x00]))
-        elif (self.epdsize == 31):
-            self.command(_UC8156c_PIXELACESSPOS, bytearray([0x00, 0x9b]))
+        # rasterizes pending drawing-commands (deferred mode) before the buffer is sent
+        self.stats.begin('write_ram')
+        try:
+            self.render()
+            self.stats.mark('render')
+            # streams the buffer to the RAM in chunks of two gate lines, scrambled on the way
+            # (and expanded to 2 bit per pixel in mono mode), no second full-size buffer is needed
+            if self._mono:
+                self._stream_chunks(pl_scrambler.scramble_stream, self._read_mono,
+                                    self._uploadrotation)
+            elif self._transposed:
+                self._stream_chunks(pl_scrambler.scramble_stream, self._read_transposed,
+                                    self._uploadrotation)
+            else:
+                self._stream_chunks(pl_scrambler.scramble_buffer, self._framebuf.buf,
+                                    self._uploadrotation)
+        finally:
+            self.stats.end()
+        self._framebuf.clear_dirty()    # the display now holds the current buffer
+
+    def _stream_chunks(self, produce, source, rotation=0):
+        # writes an image in the order of the display-RAM, produce(source, write) calls write
+        # for each of its chunks (e.g. pl_scrambler.scramble_stream with a read_pair function),
+        # turned by 180 degrees while scrambling with ``rotation`` 2.
+        # The time of the SPI-transfers is recorded on its own (phase spi), everything else as
+        # phase write_ram.
+        stats = self.stats
+        stats.begin('write_ram')
+        try:
+            self._use_scrambling(rotation)
+            if (self.epdsize == 11):
+                self.command(_UC8156c_PIXELACESSPOS, b'\x00\x93')
+            elif (self.epdsize == 14):
+                self.command(_UC8156c_PIXELACESSPOS, b'\x00\x9f')
+            elif (self.epdsize == 21):
+                self.command(_UC8156c_PIXELACESSPOS, b'\x00\x00')
+            elif (self.epdsize == 31):
+                self.command(_UC8156c_PIXELACESSPOS, b'\x00\x9b')
+            else:
+                raise RuntimeError("Unimplemented display-type!")
+
+            spins = 0
+            while not self._spi.try_lock():
+                spins += 1
+            self._spi.configure(baudrate = self._spi_baudrate, phase = self._spi_phase, polarity = self._spi_polarity)
+            try:
+                self._cs.value = False
+                self._cmdbuf[0] = _UC8156c_WRITERAM
+                self._spi.write(self._cmdbuf)
+                self._streamed = 1
+                produce(source, self._write_chunk)
+            finally:
+                # a failing source (e.g. a truncated file) mustn't leave the bus locked
+                self._cs.value = True
+                self._spi.unlock()
+            if self._spistats is not None:
+                self._spistats.transaction(_UC8156c_WRITERAM, self._streamed, 0, spins)
+            self.busy_wait(0.001)
+            stats.mark('write_ram')
+        finally:
+            pl_scrambler.setrotation(0)     # other users of pl_scrambler expect no rotation
+            stats.end()
+
+    def _stream_write(self, chunk):
+    # write-function of _stream_chunks: sends one chunk of the running RAM-upload, the clock is
+    # only read with the stats enabled (its values are long ints on the boards)
+        if self.stats.enabled:
+            start = pl_timing.now()
+            self._spi.write(chunk)
+            self.stats.add('spi', pl_timing.now() - start)
         else:
-            raise RuntimeError("Unimplemented display-type!")
-            
-        self._buffer = self._framebuf.buf
-        # scrambles the buffer        
-        self._buffer = pl_scrambler.scramble_array(self._buffer)   # comment this line if you don't need to scramble at all
-        # writes the buffer byte-wise to the RAM
-        while not self._spi.try_lock():
-            pass
-        self._spi.configure(baudrate = self._spi_baudrate, phase = self._spi_phase, polarity = self._spi_polarity)
-        self._cs.value = False
-        self._spi.write(_UC8156c_WRITERAM.to_bytes(1, 1))
-        for i in range(0, self._buffersize, 1):
-            self._spi.write(self._buffer[i].to_bytes(1, 1)) 
-        self._cs.value = True
-        self._spi.unlock()
-        self.busy_wait(0.001)
+            self._spi.write(chunk)
+        self._streamed += len(chunk)
+
+    def _read_transposed_pair(self, pair):
+    # the gate lines 2*pair and 2*pair+1 of the transposed framebuffer: its columns 2*pair and
+    # 2*pair+1 from the bottom up (the image at a rotation of 90 degrees). Both columns lie in
+    # the same byte of every row, each byte is read once for both lines: blocks of 4x2 pixel
+    # are transposed with the pixel-table of pl_scrambler.
+        buf = self._framebuf.buf
+        unpack = pl_scrambler._UNPACK       # pylint: disable=protected-access
+        pairbuf = self._transposepair
+        rowbytes = self._framebuf.stride >> 2
+        height = self._framebuf.height      # the length of a gate line
+        first = (pair << 1) & 0x03          # pixel of the first column in its byte
+        bottom = (height - 1) * rowbytes + (pair >> 1)
+        if not height & 0x03:
+            half = height >> 2
+            index = bottom
+            for out in range(half):
+                p_0 = (buf[index] << 2) + first
+                p_1 = (buf[index - rowbytes] << 2) + first
+                p_2 = (buf[index - 2 * rowbytes] << 2) + first
+                p_3 = (buf[index - 3 * rowbytes] << 2) + first
+                pairbuf[out] = (unpack[p_0] << 6) | (unpack[p_1] << 4) | \
+                               (unpack[p_2] << 2) | unpack[p_3]
+                pairbuf[out + half] = (unpack[p_0 + 1] << 6) | (unpack[p_1 + 1] << 4) | \
+                                      (unpack[p_2 + 1] << 2) | unpack[p_3 + 1]
+                index -= 4 * rowbytes
+            return pairbuf
+        # the second line starts inside of a byte (3.1"), pixel by pixel
+        value = 0
+        out = 0
+        for line in (0, 1):
+            index = bottom
+            for _ in range(height):
+                value = ((value << 2) | unpack[(buf[index] << 2) + first + line]) & 0xff
+                index -= rowbytes
+                out += 1
+                if not out & 0x03:
+                    pairbuf[(out >> 2) - 1] = value
+        return pairbuf
+
+    def _read_mono_pair(self, pair):
+    # expands the gate lines 2*pair and 2*pair+1 of the 1 bit buffer to 2 bit pixel data,
+    # byte-aligned lines straight into the pair, the others through the line-buffer
+        buf = self._framebuf.buf
+        table = self._monotable
+        pairbuf = self._monopair
+        linebytes = self._framebuf.stride // 8
+        bits = self._framebuf.width * 2
+        for gl in (0, 1):
+            index = (2 * pair + gl) * linebytes
+            start = gl * bits
+            if start & 0x07:
+                line = self._monoline
+                for i in range(linebytes):
+                    value = buf[index + i] << 1
+                    line[2 * i] = table[value]
+                    line[2 * i + 1] = table[value + 1]
+                pl_framebuf._copy_bits(pairbuf, start, line, 0, bits)    # pylint: disable=protected-access
+            else:
+                # a partial last byte gets its remaining bits from the second line
+                out = start >> 3
+                count = (bits + 7) >> 3
+                for i in range(index, index + (count >> 1)):
+                    value = buf[i] << 1
+                    pairbuf[out] = table[value]
+                    pairbuf[out + 1] = table[value + 1]
+                    out += 2
+                if count & 0x01:
+                    pairbuf[out] = table[buf[index + (count >> 1)] << 1]
+        return pairbuf
+
+    def image_bmp_stream(self, filename, mode=0):
+    # Streams a bitmap-image (see image_bmp) straight into the RAM of the driver-chip and updates
+    # the display with ``mode``. The file is read two gate lines at a time and each pair is
+    # converted and scrambled on its own, so neither the framebuffer nor a scrambled copy of it
+    # is needed, the framebuffer stays unchanged. Meant for full-screen images without any
+    # further drawing on top, at a rotation of 0 or 180 degrees. Areas not covered by the image
+    # are white.
+        if self.rotation & 0x01:
+            raise RuntimeError("Streaming images is only supported at a rotation of 0 or 2")
+        try:
+            f = open("/" + filename, "rb")
+        except OSError:
+            pl_log.error("Couldn't open file")
+            return
+
+        pl_log.debug("File opened")
+        try:
+            bmp = BMPImage(f)
+
+            pl_log.debug("Image OK! Streaming...")
+            width = self._framebuf.width
+            height = self._framebuf.height
+            # both gate lines of a pair as 2 bit pixels, drawn with the display's rotation
+            pairbuffer = bytearray(width // 2)
+            pair = pl_framebuf.FrameBuffer(pairbuffer, width, 2, buf_format=pl_framebuf.GS4_HMSB)
+            pair.rotation = self.rotation
+            graylevels = bytearray(width)
+
+            def read_pair(index):
+                # rows of the image in the gate lines 2*index and 2*index+1
+                if self.rotation == 2:
+                    first = height - 2 - 2 * index
+                else:
+                    first = 2 * index
+                for line in (0, 1):
+                    if first + line < bmp.height:
+                        bmp.read_row(first + line, graylevels)
+                        pair.set_row(line, 0, graylevels)
+                    else:
+                        pair.fill_rect(0, line, width, 1, self.WHITE)
+                return pairbuffer
 
+            self._stream_chunks(pl_scrambler.scramble_stream, read_pair)
+        except OSError:
+            pl_log.error("Couldn't read file")
+            return
+        except BMPError as e:
+            pl_log.error("Failed to parse BMP: %s", e.args[0])
+            return
+        finally:
+            f.close()
+        self.refresh(mode)
+
+    def image_epd(self, filename, mode=0):
+    # Shows an image in the native *.epd-format (see pl_epdimage) and updates the display with
+    # ``mode``. If the file was made for this display the data is streamed to the RAM as it is,
+    # in chunks and without touching the framebuffer. Otherwise it is descrambled and drawn
+    # into the framebuffer at the top-left corner before the update.
+        try:
+            f = open("/" + filename, "rb")
+        except OSError:
+            pl_log.error("Couldn't open file")
+            return
+
+        pl_log.debug("File opened")
+        try:
+            header = pl_epdimage.EPDImageHeader.read(f)
+            self._use_scrambling()
+            if header.matches(self.epdsize, self._slcount, self._glcount,
+                              pl_scrambler.getscramblemode()):
+                pl_log.debug("Image OK! Streaming...")
+                self._stream_chunks(lambda source, write: pl_epdimage.stream(source, header, write), f)
+                update = self.refresh
+            else:
+                pl_log.info("Image made for another display, drawing...")
+                data = bytearray(header.size)
+                pl_epdimage.stream(f, header, self._collect(data))
+                self.render()
+                self._framebuf.blit(self._descramble(header, data), 0, 0)
+                update = self.update
+        except OSError:
+            pl_log.error("Couldn't read file")
+            return
+        except pl_epdimage.EPDImageError as e:
+            pl_log.error("Failed to parse EPD image: %s", e.args[0])
+            return
+        finally:
+            f.close()
+        update(mode)
+
+    def _collect(self, data):  # pylint: disable=no-self-use
+    # returns a function appending the chunks it receives to data
+        position = [0]
+
+        def write(chunk):
+            data[position[0]:position[0] + len(chunk)] = chunk
+            position[0] += len(chunk)
+        return write
+
+    def _descramble(self, header, data):  # pylint: disable=no-self-use
+    # returns a FrameBuffer with the image of data, which is scrambled for the display in header
+        mode = pl_scrambler.getscramblemode()
+        slcount = pl_scrambler.getslcount()
+        glcount = pl_scrambler.getglcount()
+        pl_scrambler.setscramblemode(header.scramblemode)
+        pl_scrambler.setslcount(header.width)
+        pl_scrambler.setglcount(header.height)
+        try:
+            data = pl_scrambler.descramble_array(data)
+        finally:
+            pl_scrambler.setscramblemode(mode)
+            pl_scrambler.setslcount(slcount)
+            pl_scrambler.setglcount(glcount)
+        return pl_framebuf.FrameBuffer(data, header.width, header.height, buf_format=pl_framebuf.GS4_HMSB)
+
+    def _rotate_framebuf(self, rotation):
+    # Rotated by the driver (see sethwrotation) the framebuffer holds the image the way it is
+    # drawn: unrotated at 180 degrees and transposed at 90/ 270 degrees (its columns are the
+    # gate lines, the stride is rounded up to full bytes). The uploads read the transposed
+    # framebuffer column by column (_read_transposed_pair) and fold 180 degrees into the
+    # scrambling (pl_scrambler.setrotation), drawing runs at the speed of rotation 0.
+    # The 1 bit framebuffer isn't transposed, at 90/ 270 degrees it rotates while drawing.
+    # The chip's data-entry mode stays as set up by begin.
+        transposed = bool(self._hwrotation and rotation & 0x01 and not self._mono)
+        if transposed != self._transposed:
+            self._transposed = transposed
+            if transposed:
+                width, height = self._glcount, self._slcount
+                stride = (width + 3) & ~0x03
+            else:
+                width, height = self._slcount, self._glcount
+                stride = width
+            self._buffersize = stride * height // 4
+            if self._buffersize > len(self._buffer):
+                self._buffer = bytearray(self._buffersize)
+            self._framebuf = pl_framebuf.FrameBuffer(self._buffer, width, height, buf_format=pl_framebuf.GS4_HMSB, stride=stride)
+            if transposed and self._transposepair is None:
+                self._transposepair = bytearray(self._slcount // 2)
+        if self._hwrotation and (transposed or not rotation & 0x01):
+            self._framebuf._rotation = 0
+            self._uploadrotation = rotation & 0x02
+        else:
+            self._framebuf._rotation = rotation
+            self._uploadrotation = 0
+        
     def set_ram_address(self, x, y): # pylint: disable=unused-argument, no-self-use
         # Set the RAM address location, not used on this chipset but required by
         # the superclass
@@ -257,8 +589,8 @@ class PL_UC8156(PL_EPD):
         
     def getepdsize(self):
     # retrieves display-parameters stored on the driver-chip
-        self.command(_UC8156c_PROGRAMMTP, bytearray([0x02]))
-        self.command(_UC8156c_MTPADDRESSSETTING, bytearray([0xf2, 0x04]))
+        self.command(_UC8156c_PROGRAMMTP, b'\x02')
+        self.command(_UC8156c_MTPADDRESSSETTING, b'\xf2\x04')
         data = self.read(_UC8156c_MTPREAD, 1)   # first byte read is a dummy byte
         data = self.read(_UC8156c_MTPREAD, 1)
         if (data == b'\x31'):
@@ -270,7 +602,7 @@ class PL_UC8156(PL_EPD):
                 pl_scrambler.setglcount(148)
                 pl_scrambler.setslcount(72)
                 pl_scrambler.setscramblemode(0x00)
-                print("72x148 pixel / 1.1 inch display detected")
+                pl_log.info("72x148 pixel / 1.1 inch display detected")
             else: 
                 self.epdsize = 14
                 self._width = 180
@@ -278,7 +610,7 @@ class PL_UC8156(PL_EPD):
                 pl_scrambler.setglcount(100)
                 pl_scrambler.setslcount(180)
                 pl_scrambler.setscramblemode(0x00)
-                print("180x100 pixel / 1.4 inch display detected")
+                pl_log.info("180x100 pixel / 1.4 inch display detected")
         elif (data == b'\x30'):     # very old 1.4"-displays encoded with 0x30
             self.epdsize = 14
             self._width = 180
@@ -286,7 +618,7 @@ class PL_UC8156(PL_EPD):
             pl_scrambler.setglcount(100)
             pl_scrambler.setslcount(180)
             pl_scrambler.setscramblemode(0x00)
-            print("180x100 pixel / 1.4 inch display detected")     
+            pl_log.info("180x100 pixel / 1.4 inch display detected")     
         elif (data == b'\x32'):
             self.epdsize = 21
             self._width = 240
@@ -294,7 +626,7 @@ class PL_UC8156(PL_EPD):
             pl_scrambler.setglcount(146)
             pl_scrambler.setslcount(240)
             pl_scrambler.setscramblemode(0x200)
-            print("240x146 pixel / 2.1 inch display detected")
+            pl_log.info("240x146 pixel / 2.1 inch display detected")
         elif (data == b'\x33'):
             self.epdsize = 31
             self._width = 74
@@ -302,20 +634,24 @@ class PL_UC8156(PL_EPD):
             pl_scrambler.setglcount(312)  # 312 gatelines shorted in pairs to serve 2 sourcelines, physically just 156 gatelines
             pl_scrambler.setslcount(74)
             pl_scrambler.setscramblemode(0x50)
-            print("74x312 pixel / 3.1 inch display detected")
+            pl_log.info("74x312 pixel / 3.1 inch display detected")
         else:
             self.epdsize = 99   # unknown display
             pl_scrambler.setglcount(148)  # parameters taken from smallest available display (as of this writing 1.1")
             pl_scrambler.setslcount(72)   
             pl_scrambler.setscramblemode(0x00)
-            print("Unknown display detected!", data)
+            pl_log.warning("Unknown display detected! %r", bytes(data))
+        # kept for the uploads of this display, another one may configure pl_scrambler later
+        self._scramblemode = pl_scrambler.getscramblemode()
+        self._slcount = pl_scrambler.getslcount()
+        self._glcount = pl_scrambler.getglcount()
             
     def set_vborder_color(self, color):
     # border-electrode (= "frame" around the display) can be driven independendly to either black or white 
         if (color == 0x00):     # black border
-            self.command(_UC8156c_BORDERSETTING, bytearray([0x07]))
+            self.command(_UC8156c_BORDERSETTING, b'\x07')
         elif (color == 0x03):   # white border
-            self.command(_UC8156c_BORDERSETTING, bytearray([0xf7]))
+            self.command(_UC8156c_BORDERSETTING, b'\xf7')
         else:        
             raise RuntimeError("Border-color can only be BLACK or WHITE")
         
@@ -323,8 +659,8 @@ class PL_UC8156(PL_EPD):
         self.update(mode=1)
         
         # restore original register-value to keep border-color locked during further updates
-        self.command(_UC8156c_BORDERSETTING, bytearray([0x04]))
-        print("Border-update complete!")
+        self.command(_UC8156c_BORDERSETTING, b'\x04')
+        pl_log.info("Border-update complete!")
         
         
         
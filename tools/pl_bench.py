@@ -0,0 +1,326 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_bench' - benchmark suite
+# ====================================================
+# Times the drawing-functions, scrambling, the RAM-upload and complete update-cycles and
+# reports ops/s, bytes/s, the memory allocated by one call and the peak memory.
+# - host (CPython): runs every panel of pl_epdimage.PANELS against the simulated display of
+#   pl_sim (VirtualClock, the busy-times of the display are reported as display_s) and
+#   writes the results as JSON, --compare prints the change against an earlier run
+# - board (CircuitPython): copy this file with the drivers and the test-pictures to the
+#   board (wired like examples/simpletest.py) and import it, the results are written to
+#   /bench.json if the filesystem is writable and printed otherwise
+#
+# usage: python3 tools/pl_bench.py -o bench.json [--quick] [--panel 21] [--compare old.json]
+# * Author(s): pl-micro-epd contributors
+
+import gc
+import json
+import os
+import sys
+
+HOST = sys.implementation.name != 'circuitpython'
+
+if HOST:
+    import argparse
+    import contextlib
+    import io
+    import tracemalloc
+    _TOOLS = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, _TOOLS)
+    import pl_sim       # pylint: disable=wrong-import-position
+    _EXAMPLES = os.path.join(_TOOLS, '..', 'examples')
+
+import board            # pylint: disable=wrong-import-position,wrong-import-order
+import busio            # pylint: disable=wrong-import-position,wrong-import-order
+import digitalio        # pylint: disable=wrong-import-position,wrong-import-order
+import pl_epdimage      # pylint: disable=wrong-import-position
+import pl_scrambler     # pylint: disable=wrong-import-position
+import pl_timing        # pylint: disable=wrong-import-position
+from pl_uc8156 import PL_UC8156     # pylint: disable=wrong-import-position
+
+# calls of each benchmark (divided by 10 for --quick)
+ITERATIONS = {
+    'fill': 50,
+    'fill_rect': 500,
+    'line': 500,
+    'circle': 200,
+    'text': 50,
+    'scroll': 50,
+    'image_bmp': 5,
+    'scramble_array': 10,
+    'write_ram': 10,
+    'update': 5,
+    'whiteerase': 2,
+}
+
+
+def _path(name):
+# file-name for PL_EPD.image_bmp (which opens "/" + name) of a file in examples/ (host) or
+# in the root-directory of the board
+    if HOST:
+        return os.path.abspath(os.path.join(_EXAMPLES, name))[1:]
+    return name
+
+
+def _font():
+    if HOST:
+        return os.path.join(_EXAMPLES, 'font5x8.bin')
+    return 'font5x8.bin'
+
+
+class _Random:
+    # small LCG, the same sequence of shapes on host and board
+    def __init__(self, seed=1):
+        self._state = seed
+
+    def next(self, limit):
+        self._state = (self._state * 1103515245 + 12345) & 0x7fffffff
+        return (self._state >> 8) % limit
+
+
+def _measure(func):
+# bytes allocated while func() runs and bytes still allocated afterwards. On the board
+# nothing is freed while the collector is disabled, so these are all allocations of the call,
+# tracemalloc gives the peak of the memory in use instead (temporary objects freed on the
+# way count once).
+    if HOST:
+        tracemalloc.start()
+        func()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, retained
+    gc.collect()
+    gc.disable()
+    try:
+        start = gc.mem_alloc()      # pylint: disable=no-member
+        func()
+        end = gc.mem_alloc()        # pylint: disable=no-member
+    finally:
+        gc.enable()
+    gc.collect()
+    return end - start, gc.mem_alloc() - start      # pylint: disable=no-member
+
+
+def _run(name, panel, func, size=None, footprint=0, clock=None):     # pylint: disable=too-many-arguments
+# times ITERATIONS[name] calls of func(i), size: bytes processed by one call, footprint: bytes
+# allocated before (display-object and buffers), counted in the peak memory
+    count = ITERATIONS[name]
+    alloc = _measure(lambda: func(0))[0]
+    gc.collect()
+    display_start = clock.now() if clock else 0
+    # ticks_us stays a small integer on boards without long integers (in steps of 1 ms there)
+    start = pl_timing.ticks_us()
+    for i in range(count):
+        func(i)
+    seconds = pl_timing.ticks_diff(pl_timing.ticks_us(), start) / 1000000
+    result = {
+        'name': name,
+        'panel': panel,
+        'ops': count,
+        'seconds': seconds,
+        'ops_per_s': count / seconds if seconds else None,
+        'bytes_per_s': size * count / seconds if size and seconds else None,
+        'alloc_bytes': alloc,
+        'peak_bytes': footprint + alloc,
+    }
+    if clock:
+        # time the real display would have been busy (see pl_sim.VirtualClock)
+        result['display_s'] = (clock.now() - display_start) / count
+    return result
+
+
+def bench_display(display, footprint=0, clock=None):
+# benchmarks of a connected display, returns a list of results, footprint: memory allocated
+# by the display-object
+    panel = display.epdsize
+    width = display._width      # pylint: disable=protected-access
+    height = display._height    # pylint: disable=protected-access
+    buffersize = display._buffersize    # pylint: disable=protected-access
+    framebuf = display.getframebuf()
+    rnd = _Random()
+    font = _font()
+    picture = _path('TestPic_%din.bmp' % panel)
+    results = []
+
+    def fill(i):
+        display.fill(i & 0x03)
+
+    def fill_rect(i):
+        display.fill_rect(rnd.next(width), rnd.next(height), rnd.next(width) + 1,
+                          rnd.next(height) + 1, i & 0x03)
+
+    def line(i):
+        display.line(rnd.next(width), rnd.next(height), rnd.next(width), rnd.next(height), i & 0x03)
+
+    def circle(i):
+        display.circle(rnd.next(width), rnd.next(height), rnd.next(width // 2) + 1, i & 0x03)
+
+    def text(i):
+        display.text('Hello world! 0123456789', 0, (i * 8) % height, i & 0x03, font_name=font)
+
+    def scroll(i):
+        framebuf.scroll(1 if i & 0x01 else 0, -1 if i & 0x02 else 3)
+
+    def image_bmp(_):
+        display.image_bmp(picture)
+
+    def write_ram(_):
+        display.write_ram()
+
+    def update(_):
+        display.update(0)
+
+    def whiteerase(_):
+        display.whiteerase()
+
+    for name, func, size in (('fill', fill, buffersize), ('fill_rect', fill_rect, None),
+                             ('line', line, None), ('circle', circle, None), ('text', text, None),
+                             ('scroll', scroll, buffersize), ('image_bmp', image_bmp, None),
+                             ('write_ram', write_ram, buffersize), ('update', update, buffersize),
+                             ('whiteerase', whiteerase, None)):
+        if name == 'image_bmp':
+            try:
+                size = _filesize(picture)
+            except OSError:
+                print('skipping image_bmp, %s not found' % picture)
+                continue
+        results.append(_run(name, panel, func, size, footprint,
+                            clock if name in ('update', 'whiteerase') else None))
+    return results
+
+
+def _filesize(name):
+    return os.stat('/' + name)[6]
+
+
+def bench_scrambling():
+# scramble_array for every panel-profile, the configuration of pl_scrambler is restored
+    results = []
+    config = (pl_scrambler.getscramblemode(), pl_scrambler.getslcount(), pl_scrambler.getglcount())
+    try:
+        for panel in sorted(pl_epdimage.PANELS):
+            width, height, mode = pl_epdimage.PANELS[panel]
+            pl_scrambler.setscramblemode(mode)
+            pl_scrambler.setslcount(width)
+            pl_scrambler.setglcount(height)
+            buffer = bytearray(width * height // 4)
+            for i in range(len(buffer)):
+                buffer[i] = (i * 7) & 0xff
+            results.append(_run('scramble_array', panel,
+                                lambda _, buffer=buffer: pl_scrambler.scramble_array(buffer),
+                                len(buffer), len(buffer)))
+    finally:
+        pl_scrambler.setscramblemode(config[0])
+        pl_scrambler.setslcount(config[1])
+        pl_scrambler.setglcount(config[2])
+    return results
+
+
+def _display():
+# display wired like examples/simpletest.py
+    spi = busio.SPI(clock=board.SCK, MOSI=board.MOSI, MISO=board.MISO)
+    display = PL_UC8156(spi=spi, cs_pin=digitalio.DigitalInOut(board.D5),
+                        rst_pin=digitalio.DigitalInOut(board.D12),
+                        busy_pin=digitalio.DigitalInOut(board.D9))
+    display.begin(reset=False)
+    return display
+
+
+def run(panels=None, quick=False):
+# the whole suite, returns the report as dict
+    if quick:
+        for name in ITERATIONS:
+            ITERATIONS[name] = max(1, ITERATIONS[name] // 10)
+    report = {
+        'platform': sys.platform,
+        'implementation': sys.implementation.name,
+        'version': '.'.join(str(part) for part in sys.implementation.version[:3]),
+        'results': [],
+    }
+    displays = []
+    if HOST:
+        for panel in panels or sorted(pl_epdimage.PANELS):
+            pl_sim.reset()
+            chip = pl_sim.install(panel)
+            with contextlib.redirect_stdout(io.StringIO()):
+                footprint = _measure(lambda: displays.append(_display()))[1]
+                report['results'] += bench_display(displays.pop(), footprint, chip.clock)
+    else:
+        footprint = _measure(lambda: displays.append(_display()))[1]
+        report['results'] += bench_display(displays.pop(), footprint)
+    report['results'] += bench_scrambling()
+    return report
+
+
+def print_report(report, previous=None):
+# table of the results, with the change of ops/s against the previous report
+    before = {}
+    if previous:
+        for result in previous['results']:
+            before[(result['name'], result['panel'])] = result
+    print('%-15s %5s %12s %12s %10s %10s %10s' %
+          ('benchmark', 'panel', 'ops/s', 'bytes/s', 'alloc', 'peak', 'change'))
+    for result in report['results']:
+        change = ''
+        old = before.get((result['name'], result['panel']))
+        if old and old['ops_per_s'] and result['ops_per_s']:
+            change = '%+.1f%%' % ((result['ops_per_s'] / old['ops_per_s'] - 1) * 100)
+        print('%-15s %5d %12.1f %12s %10d %10d %10s' %
+              (result['name'], result['panel'], result['ops_per_s'] or 0,
+               '%.0f' % result['bytes_per_s'] if result['bytes_per_s'] else '-',
+               result['alloc_bytes'], result['peak_bytes'], change))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of the display-drivers.')
+    parser.add_argument('-o', '--output', default='bench.json', help='JSON-file of the results')
+    parser.add_argument('--panel', type=int, nargs='+', choices=sorted(pl_epdimage.PANELS))
+    parser.add_argument('--quick', action='store_true', help='a tenth of the iterations')
+    parser.add_argument('--compare', help='JSON-file of an earlier run')
+    options = parser.parse_args(argv)
+
+    report = run(options.panel, options.quick)
+    previous = None
+    if options.compare:
+        with open(options.compare) as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    with open(options.output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print('results written to', options.output)
+
+
+if HOST:
+    if __name__ == '__main__':
+        main()
+else:
+    _REPORT = run()
+    print_report(_REPORT)
+    try:
+        with open('/bench.json', 'w') as _f:
+            json.dump(_REPORT, _f)
+        print('results written to /bench.json')
+    except OSError:
+        # filesystem is read-only for code (see boot.py of CircuitPython)
+        print(json.dumps(_REPORT))
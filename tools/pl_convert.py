@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_convert' - image converter
+# ====================================================
+# Desktop tool (CPython 3 with Pillow and NumPy) converting PNG/JPEG/BMP images into
+# assets for the displays:
+# - *.epd: pre-scrambled 2 bit data for PL_UC8156.image_epd (see src/pl_epdimage.py)
+# - *.bmp: 4 bit palettized bitmaps with the four graylevels for PL_EPD.image_bmp
+# Images are resized to the display, converted to the four graylevels (optionally dithered)
+# and rotated like PL_EPD.setrotation would draw them. Scrambling uses the permutation of
+# src/pl_scrambler.py, all files are converted in parallel.
+#
+# usage: python3 tools/pl_convert.py images/ logo.png -o assets/ --panel 21 31 --rle
+#        python3 tools/pl_convert.py --help
+# * Author(s): pl-micro-epd contributors
+
+import argparse
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import pl_dither        # pylint: disable=wrong-import-position
+import pl_epdimage      # pylint: disable=wrong-import-position
+import pl_scrambler     # pylint: disable=wrong-import-position
+
+
+EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+DITHER = ('none',) + pl_dither.METHODS
+
+# palette of the *.bmp-output, PL_EPD.image_bmp maps its entries back to graylevel 0...3
+GRAY_PALETTE = (0x00, 0x55, 0xaa, 0xff)
+
+# permutations already calculated in this process, see permutation()
+_permutations = {}
+
+
+def permutation(panel):
+# target index of every pixel (gate line by gate line) for the scramble mode of the panel,
+# calculated once per process with pl_scrambler.calc_scrambled_index
+    if panel not in _permutations:
+        width, height, mode = pl_epdimage.PANELS[panel]
+        pl_scrambler.setscramblemode(mode)
+        pl_scrambler.setslcount(width)
+        pl_scrambler.setglcount(height)
+        _permutations[panel] = np.array(
+            [pl_scrambler.calc_scrambled_index(gl, sl, height, width)
+             for gl in range(height) for sl in range(width)], dtype=np.int32)
+    return _permutations[panel]
+
+
+def fit(image, size, mode):
+# resizes an image to size (width, height): 'fit' keeps the aspect ratio and fills the rest
+# with white, 'fill' keeps the aspect ratio and crops, 'stretch' ignores it
+    image = image.convert('RGB')
+    if mode == 'stretch':
+        return image.resize(size, Image.LANCZOS)
+    scale_x = size[0] / image.width
+    scale_y = size[1] / image.height
+    scale = min(scale_x, scale_y) if mode == 'fit' else max(scale_x, scale_y)
+    resized = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                           Image.LANCZOS)
+    canvas = Image.new('RGB', size, (255, 255, 255))
+    canvas.paste(resized, ((size[0] - resized.width) // 2, (size[1] - resized.height) // 2))
+    return canvas
+
+
+def graylevels(image, dither='none'):
+# graylevel 0...3 of every pixel as array (height, width), without dithering the same
+# thresholds as PL_EPD.image_bmp: (r + g + b) // 3 at 0x40, 0x80 and 0xc0.
+# Dithering gives the same result as pl_dither.Ditherer on the display (top to bottom).
+    rgb = np.asarray(image.convert('RGB'), dtype=np.int32)
+    gray = rgb.sum(axis=2) // 3
+    if dither == 'none':
+        return (gray >> 6).astype(np.uint8)
+    if dither == pl_dither.BAYER:
+        return bayer(gray)
+    if dither in pl_dither.KERNELS:
+        return diffuse(gray, *pl_dither.KERNELS[dither])
+    raise ValueError('Unknown dithering ' + dither)
+
+
+def bayer(gray):
+# ordered dithering with the 4x4 Bayer-matrix, see pl_dither.bayer_level
+    height, width = gray.shape
+    matrix = np.frombuffer(pl_dither.BAYER_MATRIX, dtype=np.uint8).reshape(4, 4).astype(np.int32)
+    threshold = np.tile(matrix, ((height + 3) // 4, (width + 3) // 4))[:height, :width]
+    return np.minimum((96 * gray + 255 * (2 * threshold + 1)) // 8160, 3).astype(np.uint8)
+
+
+def diffuse(gray, kernel, divisor):
+# error diffusion with the kernel of pl_dither.KERNELS. A pixel only receives errors from
+# pixels with a smaller x + 2 * y (left, above and right-above), so all pixels on such a
+# diagonal are processed at once.
+    height, width = gray.shape
+    levels = np.zeros((height, width), dtype=np.uint8)
+    margin = 2
+    errors = np.zeros((height + margin, width + 2 * margin), dtype=np.int32)
+    for diagonal in range(width + 2 * (height - 1)):
+        first = max(0, (diagonal - width + 2) // 2)
+        rows = np.arange(first, min(height - 1, diagonal // 2) + 1)
+        cols = diagonal - 2 * rows
+        value = gray[rows, cols] + errors[rows, cols + margin]
+        level = np.clip((value * 3 + 127) // 255, 0, 3)
+        levels[rows, cols] = level
+        error = value - level * 85
+        for d_x, d_y, weight in kernel:
+            errors[rows + d_y, cols + d_x + margin] += error * weight // divisor
+    return levels
+
+
+def rotate(levels, rotation):
+# turns the graylevels drawn at a display-rotation (see PL_EPD.setrotation) into the
+# unrotated orientation of the display
+    return np.rot90(levels, -rotation)
+
+
+def pack(levels):
+# 2 bit per pixel, 4 pixel per byte with the first one in the MSBs (GS4_HMSB)
+    pixels = levels.reshape(-1, 4)
+    return ((pixels[:, 0] << 6) | (pixels[:, 1] << 4) | (pixels[:, 2] << 2) | pixels[:, 3]).astype(np.uint8)
+
+
+def scramble(levels, panel):
+# graylevels of the unrotated display in the order of the display-RAM
+    mode = pl_epdimage.PANELS[panel][2]
+    flat = levels.reshape(-1)
+    if mode == 0:
+        return flat
+    target = np.empty_like(flat)
+    target[permutation(panel)] = flat
+    return target
+
+
+def epd_data(levels, panel):
+# image-data of an *.epd-file for the graylevels of the unrotated display
+    return pack(scramble(levels, panel)).tobytes()
+
+
+def bmp_data(levels):
+# 4 bit palettized *.bmp-file (bottom-to-top) with the graylevels
+    height, width = levels.shape
+    rowsize = ((width * 4 + 31) // 32) * 4
+    padded = np.zeros((height, rowsize * 2), dtype=np.uint8)
+    padded[:, :width] = levels
+    rows = (padded[:, 0::2] << 4) | padded[:, 1::2]
+    data = rows[::-1].astype(np.uint8).tobytes()
+    palette = b''.join(bytes((value, value, value, 0)) for value in GRAY_PALETTE)
+    offset = 14 + 40 + len(palette)
+    return (b'BM' + struct.pack('<I4xI', offset + len(data), offset) +
+            struct.pack('<IiiHHIIiiII', 40, width, height, 1, 4, 0, len(data), 2835, 2835,
+                        len(GRAY_PALETTE), 0) +
+            palette + data)
+
+
+def convert(task):
+# converts one image for one panel, returns the name of the written file
+    path, panel, options = task
+    width, height, mode = pl_epdimage.PANELS[panel]
+    if options.rotation & 0x01:
+        size = (height, width)
+    else:
+        size = (width, height)
+    with Image.open(path) as image:
+        levels = graylevels(fit(image, size, options.fit), options.dither)
+
+    directory = os.path.join(options.output, str(panel))
+    os.makedirs(directory, exist_ok=True)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if options.format == 'bmp':
+        # drawn with the rotation set on the display, not rotated here
+        target = os.path.join(directory, name + '.bmp')
+        with open(target, 'wb') as f:
+            f.write(bmp_data(levels))
+    else:
+        target = os.path.join(directory, name + '.epd')
+        header = pl_epdimage.EPDImageHeader(panel, width, height, mode, compressed=options.rle)
+        with open(target, 'wb') as f:
+            pl_epdimage.write(f, header, epd_data(rotate(levels, options.rotation), panel))
+    return target
+
+
+def find_images(paths):
+# image-files given directly or found in the given directories (recursively)
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                images.extend(os.path.join(root, name) for name in sorted(files)
+                              if name.lower().endswith(EXTENSIONS))
+        else:
+            images.append(path)
+    return images
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Converts images into assets for Plastic Logic displays.')
+    parser.add_argument('inputs', nargs='+', help='image-files or directories')
+    parser.add_argument('-o', '--output', required=True, help='output-directory, one sub-directory per panel')
+    parser.add_argument('--panel', type=int, nargs='+', choices=sorted(pl_epdimage.PANELS),
+                        default=sorted(pl_epdimage.PANELS), help='display(s) to convert for (epdsize)')
+    parser.add_argument('--format', choices=('epd', 'bmp'), default='epd')
+    parser.add_argument('--rle', action='store_true', help='PackBits-compress *.epd-files')
+    parser.add_argument('--fit', choices=('fit', 'fill', 'stretch'), default='fit')
+    parser.add_argument('--rotation', type=int, choices=(0, 1, 2, 3), default=0,
+                        help='display-rotation the image is drawn at (*.epd only)')
+    parser.add_argument('--dither', choices=DITHER, default='none')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker-processes (default: all cores)')
+    options = parser.parse_args(argv)
+
+    images = find_images(options.inputs)
+    tasks = [(path, panel, options) for path in images for panel in options.panel]
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=options.jobs) as pool:
+        for target in pool.map(convert, tasks, chunksize=max(1, len(tasks) // 64)):
+            print(target)
+    print('%d files written in %.2f s' % (len(tasks), time.time() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_memcheck' - allocation check
+# ====================================================
+# Checks the allocation-free steady state of the drivers (PL_EPD.setstatic): after a first
+# call filling the caches every further update, refresh, write_ram and whiteerase has to get
+# along without allocating memory, measured with pl_memory. Temporary objects count as well,
+# they are the garbage the gc has to collect during the next update.
+# - host (CPython): every panel of pl_epdimage.PANELS with a 2 bit and a mono framebuffer
+#   against the simulated display of pl_sim, the exit-code is 1 if anything allocates. The
+#   last measured call of each method is traced opcode by opcode (see pl_memtrace), a failure
+#   lists the allocating lines.
+# - board (CircuitPython): copy this file with the drivers to the board (wired like
+#   examples/simpletest.py) and import it, the result is printed.
+#
+# usage: python3 tools/pl_memcheck.py [--panel 21] [--repeat 3] [-v]
+# * Author(s): pl-micro-epd contributors
+
+import sys
+
+HOST = sys.implementation.name != 'circuitpython'
+
+if HOST:
+    import argparse
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import pl_sim       # pylint: disable=wrong-import-position
+    import pl_memtrace  # pylint: disable=wrong-import-position
+
+import board            # pylint: disable=wrong-import-position,wrong-import-order
+import busio            # pylint: disable=wrong-import-position,wrong-import-order
+import digitalio        # pylint: disable=wrong-import-position,wrong-import-order
+import pl_epdimage      # pylint: disable=wrong-import-position
+import pl_memory        # pylint: disable=wrong-import-position
+from pl_uc8156 import PL_UC8156     # pylint: disable=wrong-import-position
+
+# the checked calls as (method, arguments)
+CALLS = (
+    ('update', (0,)),
+    ('update', (1,)),
+    ('update', (2,)),
+    ('write_ram', ()),
+    ('refresh', (0,)),
+    ('whiteerase', ()),
+)
+
+
+def _display(mono):
+# display wired like examples/simpletest.py
+    spi = busio.SPI(clock=board.SCK, MOSI=board.MOSI, MISO=board.MISO)
+    display = PL_UC8156(spi=spi, cs_pin=digitalio.DigitalInOut(board.D5),
+                        rst_pin=digitalio.DigitalInOut(board.D12),
+                        busy_pin=digitalio.DigitalInOut(board.D9), mono=mono)
+    display.begin(reset=False)
+    return display
+
+
+def check(display, repeat=3):
+# runs CALLS in the static mode of display, the first call of each warms up and the next
+# ``repeat`` are measured. Returns the MemoryProfile and the failures as list of
+# (method, arguments, bytes still allocated, bytes allocated temporarily, allocating lines).
+    display.setstatic(True)
+    profile = pl_memory.attach(display)
+    tracer = pl_memtrace.OpcodeTracer() if HOST else None
+    failures = []
+    try:
+        framebuf = display.getframebuf()
+        framebuf.fill(display.WHITE)
+        framebuf.fill_rect(4, 4, framebuf.width // 2, framebuf.height // 2, display.BLACK)
+        for name, args in CALLS:
+            method = getattr(display, name)
+            profile.tracer = tracer     # the warm-up creates the tables of the tracing as well
+            method(*args)
+            for count in range(repeat):
+                # tracing is slow, the last call only
+                profile.tracer = tracer if count == repeat - 1 else None
+                method(*args)
+                allocated = profile.allocated(name)
+                temporary = profile.temporary(name)
+                if allocated or temporary:
+                    sites = tracer.sites if profile.tracer is not None else {}
+                    failures.append((name, args, allocated, temporary, sites))
+                    break
+    finally:
+        pl_memory.detach(display)
+        display.setstatic(False)
+    return profile, failures
+
+
+def run(panels=None, repeat=3, verbose=False):
+# checks every panel (host) or the connected display (board), returns the number of failures
+    count = 0
+    if HOST:
+        setups = [(panel, mono) for panel in panels or sorted(pl_epdimage.PANELS)
+                  for mono in (False, True)]
+    else:
+        # the pins can't be claimed twice, only the 2 bit framebuffer is checked
+        setups = [(None, False)]
+    for panel, mono in setups:
+        if HOST:
+            pl_sim.reset()
+            pl_sim.install(panel)
+        display = _display(mono)
+        profile, failures = check(display, repeat)
+        label = '%s %s' % (display.epdsize, 'mono' if mono else 'gs4')
+        print('%-8s %s' % (label, 'FAILED' if failures else 'ok'))
+        if verbose or failures:
+            print(profile.report())
+        for name, args, allocated, temporary, sites in failures:
+            print('  %s%r allocated %d bytes, %s bytes temporarily' %
+                  (name, args, allocated, '-' if temporary is None else temporary))
+            for site, size in sorted(sites.items()):
+                print('    %-24s %7d bytes' % (site, size))
+        count += len(failures)
+        del display
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Checks that repeated updates allocate no memory.')
+    parser.add_argument('--panel', type=int, nargs='+', choices=sorted(pl_epdimage.PANELS))
+    parser.add_argument('--repeat', type=int, default=3, help='measured calls of each method')
+    parser.add_argument('-v', '--verbose', action='store_true', help='report of every display')
+    options = parser.parse_args(argv)
+    return 1 if run(options.panel, options.repeat, options.verbose) else 0
+
+
+if HOST:
+    if __name__ == '__main__':
+        sys.exit(main())
+else:
+    run()
@@ -0,0 +1,147 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_memtrace' - temporary allocations under CPython
+# ====================================================
+# Tracer for pl_memory.MemoryProfile.tracer: counts every allocation of the driver-modules
+# during a call, the ones freed again included, i.e. what gc.mem_alloc() counts on the
+# boards. The driver-frames are traced opcode by opcode and the growth of the traced memory
+# from one opcode to the next is what the opcode allocated. Growth while other code runs
+# (e.g. the simulator) isn't counted, neither is what only CPython allocates: ints of one
+# digit (small ints on the boards), the iterators of for-loops and the range of
+# ``for i in range(...)`` (kept on the stack by MicroPython) and the frame-objects of the
+# tracing. Arithmetic may replace an int by one of a bigger block, so up to one int of growth
+# of an arithmetic opcode is CPython's, long ints or floats computed by arithmetic are only
+# found on the boards.
+# This is a heuristic on the bytecode of CPython (opcode names, line starts, the shape of
+# range-loops, the sizes of ints and frames) checked with CPython 3.11, other versions may
+# count differently. It's a host tool, the boards measure with gc.mem_alloc() in pl_memory.
+# The first traced call of a method creates tables of the tracing, it should be a warm-up.
+#
+# usage:
+#   profile = pl_memory.attach(display)
+#   tracer = pl_memtrace.OpcodeTracer()
+#   profile.tracer = tracer
+#   display.update(0)
+#   display.update(0)
+#   print(profile.temporary('update'), tracer.sites)
+# * Author(s): pl-micro-epd contributors
+
+import dis
+import os
+import sys
+import tracemalloc
+
+import pl_memory
+
+# the directory of the driver-modules
+_DRIVERS = os.path.dirname(os.path.abspath(pl_memory.__file__))
+# block of an int of one digit (CPython), a small int on the boards
+_SMALL_INT = sys.getsizeof(1 << 29)
+# growth by the result of arithmetic up to which it's an int of CPython (room for 2 digits)
+_ARITHMETIC = sys.getsizeof(1 << 30)
+
+
+def _driver(filename, _cache={}):    # pylint: disable=dangerous-default-value
+# True for the files of the driver-modules, pl_memory excluded
+    driver = _cache.get(filename)
+    if driver is None:
+        path = os.path.abspath(filename)
+        driver = _cache[filename] = (os.path.dirname(path) == _DRIVERS
+                                     and path != os.path.abspath(pl_memory.__file__))
+    return driver
+
+
+def _cpython_only(code, _cache={}):    # pylint: disable=dangerous-default-value
+# the growth of the traced memory by the opcodes of ``code`` only CPython has as
+# {offset: kind}: None any growth (for-loops), _ARITHMETIC up to this size, the opcodes not in
+# it allocate _SMALL_INT
+    sizes = _cache.get(code)
+    if sizes is None:
+        sizes = _cache[code] = {}
+        instructions = list(dis.get_instructions(code))
+        first = None
+        for i, instruction in enumerate(instructions):
+            name = instruction.opname
+            if instruction.starts_line is not None:
+                first = instruction
+            if name in ('GET_ITER', 'FOR_ITER'):
+                sizes[instruction.offset] = None
+            elif (name == 'CALL' and i + 1 < len(instructions)
+                  and instructions[i + 1].opname == 'GET_ITER'
+                  and first.opname == 'LOAD_GLOBAL' and first.argval == 'range'):
+                sizes[instruction.offset] = None
+            elif (name.startswith(('BINARY_', 'INPLACE_', 'UNARY_'))
+                  and name not in ('BINARY_SUBSCR', 'BINARY_SLICE')):
+                sizes[instruction.offset] = _ARITHMETIC
+    return sizes
+
+
+class OpcodeTracer:
+    # pl_memory.MemoryProfile.tracer tracing the driver-frames opcode by opcode
+
+    def __init__(self):
+        self.sites = {}     # file:line -> bytes of the temporary allocations of the last call
+
+    def __call__(self, func, args, kwargs):
+    # calls func(*args, **kwargs), returns (result, bytes allocated by the drivers)
+        traced = tracemalloc.get_traced_memory
+        sites = self.sites = {}
+        # traced memory, other code ran, code, offset and line of the last opcode, allocated bytes
+        state = [0, True, None, 0, 0, 0]
+
+        def local(frame, event, arg):     # pylint: disable=unused-argument
+            grown = traced()[0] - state[0]
+            if event == 'call':
+                grown -= sys.getsizeof(frame)     # the frame-object created for the tracing
+            if not state[1] and grown > 0:
+                kind = _cpython_only(state[2]).get(state[3], _SMALL_INT)
+                if kind == _ARITHMETIC:
+                    counted = grown > _ARITHMETIC
+                else:
+                    counted = kind is not None and grown != _SMALL_INT
+                if counted:
+                    state[5] += grown
+                    site = '%s:%s' % (os.path.basename(state[2].co_filename), state[4])
+                    sites[site] = sites.get(site, 0) + grown
+            state[1] = False
+            state[2] = frame.f_code
+            state[3] = frame.f_lasti
+            state[4] = frame.f_lineno
+            state[0] = traced()[0]    # the tracing itself doesn't count
+            return local
+
+        def call(frame, event, arg):
+            if _driver(frame.f_code.co_filename):
+                frame.f_trace_opcodes = True
+                return local(frame, event, arg)
+            state[1] = True
+            return None
+
+        previous = sys.gettrace()
+        state[0] = traced()[0]
+        sys.settrace(call)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            sys.settrace(previous)
+        return result, state[5]
@@ -0,0 +1,1060 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_regress' - regression gate
+# ====================================================
+# Differential test of the optimized drawing-functions against straightforward per-pixel
+# reference implementations (mostly the code they replaced), followed by a timing check.
+# - equivalence: the primitives of pl_framebuf.FrameBuffer are called with random arguments
+#   (partly outside of the buffer) for every panel of pl_epdimage.PANELS, every rotation and
+#   the formats GS4_HMSB, MHMSB and MVLSB. After each call the buffer has to be identical to
+#   the one the Reference wrote pixel by pixel. scramble_array (and scramble_buffer,
+#   descramble_array) are compared with the pixel loop over calc_scrambled_index (of the
+#   image turned by 180 degrees as well), the bitmap-import of PL_EPD (random 1/2/4/8/24 bit
+#   files, RLE-compressed and top-down ones included) with the graylevels the files were
+#   written from, against the simulated display of pl_sim. FrameBuffer.image of random gray
+#   images has to give the graylevels of image_levels (every level but black sets the pixel
+#   of the single bit formats). image_bmp_stream of RLE-bitmaps has to show what image_bmp
+#   shows and decode every row twice at most, streams from truncated files have to fail
+#   without leaving the SPI-bus locked. Every rotation done by the driver
+#   (PL_EPD.sethwrotation) has to give the panel-content of the rotating framebuffer.
+# - timing: every primitive of TIMED is timed on the largest panel (best of --repeat runs)
+#   relative to a calibration loop of plain Python, so the numbers hold on slower or faster
+#   machines. A primitive slower than its baseline in tools/pl_regress.json by more than
+#   --threshold percent fails, --update stores the current timings as the new baseline.
+# The exit-code is 1 if anything differs or regressed.
+#
+# usage: python3 tools/pl_regress.py [--panel 21] [--seed 1] [--rounds 40] [--threshold 50]
+#                                    [--no-timing] [--update]
+# * Author(s): pl-micro-epd contributors
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+_TOOLS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _TOOLS)
+import pl_sim       # pylint: disable=wrong-import-position,unused-import
+
+import board            # pylint: disable=wrong-import-position,wrong-import-order
+import busio            # pylint: disable=wrong-import-position,wrong-import-order
+import digitalio        # pylint: disable=wrong-import-position,wrong-import-order
+import pl_epd           # pylint: disable=wrong-import-position
+import pl_epdimage      # pylint: disable=wrong-import-position
+import pl_framebuf      # pylint: disable=wrong-import-position
+import pl_scrambler     # pylint: disable=wrong-import-position
+from pl_uc8156 import PL_UC8156     # pylint: disable=wrong-import-position
+
+BASELINE = os.path.join(_TOOLS, 'pl_regress.json')
+FONT = os.path.join(_TOOLS, '..', 'examples', 'font5x8.bin')
+
+# the formats checked, with the name used in the reports
+FORMATS = ((pl_framebuf.GS4_HMSB, 'gs4'), (pl_framebuf.MHMSB, 'mhmsb'), (pl_framebuf.MVLSB, 'mvlsb'))
+
+# scrambling-modes checked besides those of the panels, with (slcount, glcount)
+SCRAMBLINGS = ((0x0f, 40, 20), (0x3a, 24, 10), (0x1c5, 32, 8), (0x2a, 16, 12), (0x141, 20, 6))
+
+# calls of each timed primitive per run
+TIMED = {
+    'fill': 500,
+    'fill_rect': 200,
+    'line': 200,
+    'circle': 100,
+    'fill_circle': 50,
+    'fill_polygon': 20,
+    'text': 10,
+    'blit': 100,
+    'scroll': 20,
+    'set_row': 200,
+    'load_colors': 50,
+    'scramble_array': 5,
+    'image_bmp': 2,
+}
+
+
+def _buffer(width, height, buf_format):
+# memory and stride of a FrameBuffer of the format, laid out like the drivers do it
+    if buf_format == pl_framebuf.GS4_HMSB:
+        return bytearray((width * height + 3) // 4), width
+    if buf_format == pl_framebuf.MHMSB:
+        stride = (width + 7) & ~0x07
+        return bytearray(stride * height // 8), stride
+    return bytearray(((height + 7) // 8) * width), width
+
+
+def _randbytes(rnd, size):
+    return bytearray(rnd.getrandbits(8) for _ in range(size))
+
+
+class Reference:
+    # The FrameBuffer-primitives written pixel by pixel into the same memory-layout. The code
+    # follows the first versions of pl_framebuf, which set every pixel on its own.
+
+    def __init__(self, buf, width, height, buf_format, stride, rotation=0):     # pylint: disable=too-many-arguments
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.buf_format = buf_format
+        self.stride = stride
+        self.rotation = rotation
+
+    def set(self, x, y, color):
+    # sets the pixel (x, y) in unrotated coordinates, nothing outside of the buffer
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return
+        buf = self.buf
+        if self.buf_format == pl_framebuf.GS4_HMSB:
+            pixel_pos = y * self.stride + x
+            index = pixel_pos // 4
+            if (pixel_pos % 4) == 0:
+                buf[index] = (buf[index] & 0x3f) | (color << 6)
+            elif (pixel_pos % 4) == 1:
+                buf[index] = (buf[index] & 0xcf) | (color << 4)
+            elif (pixel_pos % 4) == 2:
+                buf[index] = (buf[index] & 0xf3) | (color << 2)
+            else:
+                buf[index] = (buf[index] & 0xfc) | color
+        elif self.buf_format == pl_framebuf.MHMSB:
+            pixel_pos = y * self.stride + x
+            index = pixel_pos // 8
+            offset = 7 - (pixel_pos & 0x07)
+            buf[index] = (buf[index] & ~(0x01 << offset)) | ((color != 0) << offset)
+        else:
+            index = (y >> 3) * self.stride + x
+            offset = y & 0x07
+            buf[index] = (buf[index] & ~(0x01 << offset)) | ((color != 0) << offset)
+
+    def get(self, x, y):
+    # color of the pixel (x, y) in unrotated coordinates
+        if self.buf_format == pl_framebuf.GS4_HMSB:
+            pixel_pos = y * self.stride + x
+            return (self.buf[pixel_pos // 4] >> ((3 - (pixel_pos & 0x03)) * 2)) & 0x03
+        if self.buf_format == pl_framebuf.MHMSB:
+            pixel_pos = y * self.stride + x
+            return (self.buf[pixel_pos // 8] >> (7 - (pixel_pos & 0x07))) & 0x01
+        return (self.buf[(y >> 3) * self.stride + x] >> (y & 0x07)) & 0x01
+
+    def physical(self, x, y):
+    # position of the rotated pixel (x, y) in unrotated coordinates
+        if self.rotation == 1:
+            x, y = y, x
+            x = self.width - x - 1
+        if self.rotation == 2:
+            x = self.width - x - 1
+            y = self.height - y - 1
+        if self.rotation == 3:
+            x, y = y, x
+            y = self.height - y - 1
+        return x, y
+
+    def pixel(self, x, y, color):
+        x, y = self.physical(x, y)
+        self.set(x, y, color)
+
+    def fill(self, color):
+        if self.buf_format == pl_framebuf.GS4_HMSB:
+            value = color | (color << 2) | (color << 4) | (color << 6)
+        else:
+            value = 0xff if color else 0x00
+        for i in range(len(self.buf)):
+            self.buf[i] = value
+
+    def rect(self, x, y, width, height, color, fill=False):     # pylint: disable=too-many-arguments
+    # the rectangle is clipped to the buffer first, an outline is drawn along the clipped edges
+        if self.rotation == 1:
+            x, y = y, x
+            width, height = height, width
+            x = self.width - x - width
+        if self.rotation == 2:
+            x = self.width - x - width
+            y = self.height - y - height
+        if self.rotation == 3:
+            x, y = y, x
+            width, height = height, width
+            y = self.height - y - height
+        if width < 1 or height < 1:
+            return
+        x_end = min(self.width - 1, x + width - 1)
+        y_end = min(self.height - 1, y + height - 1)
+        x = max(x, 0)
+        y = max(y, 0)
+        for p_x in range(x, x_end + 1):
+            for p_y in range(y, y_end + 1):
+                if fill or p_x in (x, x_end) or p_y in (y, y_end):
+                    self.set(p_x, p_y, color)
+
+    def line(self, x_0, y_0, x_1, y_1, color):      # pylint: disable=too-many-arguments
+    # Bresenham with the error-term as float
+        d_x = abs(x_1 - x_0)
+        d_y = abs(y_1 - y_0)
+        x, y = x_0, y_0
+        s_x = -1 if x_0 > x_1 else 1
+        s_y = -1 if y_0 > y_1 else 1
+        if d_x > d_y:
+            err = d_x / 2.0
+            while x != x_1:
+                self.pixel(x, y, color)
+                err -= d_y
+                if err < 0:
+                    y += s_y
+                    err += d_x
+                x += s_x
+        else:
+            err = d_y / 2.0
+            while y != y_1:
+                self.pixel(x, y, color)
+                err -= d_x
+                if err < 0:
+                    x += s_x
+                    err += d_y
+                y += s_y
+        self.pixel(x, y, color)
+
+    def circle(self, center_x, center_y, radius, color, fill=False):    # pylint: disable=too-many-arguments
+    # the 8 octants point by point, filled circles get the unrotated rows between the
+    # mirrored points
+        c_x, c_y = self.physical(center_x, center_y)
+        x = radius - 1
+        y = 0
+        d_x = 1
+        d_y = 1
+        err = d_x - (radius << 1)
+        while x >= y:
+            for p_x, p_y in ((x, y), (y, x)):
+                if fill:
+                    for col in range(-p_x, p_x + 1):
+                        self.set(c_x + col, c_y + p_y, color)
+                        self.set(c_x + col, c_y - p_y, color)
+                else:
+                    self.pixel(center_x + p_x, center_y + p_y, color)
+                    self.pixel(center_x - p_x, center_y + p_y, color)
+                    self.pixel(center_x + p_x, center_y - p_y, color)
+                    self.pixel(center_x - p_x, center_y - p_y, color)
+            if err <= 0:
+                y += 1
+                err += d_y
+                d_y += 2
+            if err > 0:
+                x -= 1
+                d_x += 2
+                err += d_x - (radius << 1)
+
+    def polygon(self, points, color, fill=False):
+    # filled: every pixel of the buffer is tested against the edge-crossings of its row
+    # (even-odd rule, crossings rounded down), the outline is drawn afterwards
+        if fill and len(points) > 2:
+            physical = [self.physical(x, y) for x, y in points]
+            for y in range(self.height):
+                crossings = []
+                x_j, y_j = physical[-1]
+                for x_i, y_i in physical:
+                    if (y_i <= y < y_j) or (y_j <= y < y_i):
+                        crossings.append(x_i + (y - y_i) * (x_j - x_i) // (y_j - y_i))
+                    x_j, y_j = x_i, y_i
+                crossings.sort()
+                for x in range(self.width):
+                    for i in range(0, len(crossings) - 1, 2):
+                        if crossings[i] <= x <= crossings[i + 1]:
+                            self.set(x, y, color)
+                            break
+        if points:
+            x_j, y_j = points[-1]
+            for x_i, y_i in points:
+                self.line(x_j, y_j, x_i, y_i, color)
+                x_j, y_j = x_i, y_i
+
+    def blit(self, source, x, y, key=None, palette=None):      # pylint: disable=too-many-arguments
+    # source is a Reference, read without its rotation
+        for row in range(source.height):
+            for col in range(source.width):
+                color = source.get(col, row)
+                if color != key:
+                    if palette is not None:
+                        color = palette[color]
+                    self.pixel(x + col, y + row, color)
+
+    def scroll(self, delta_x, delta_y):
+        if abs(delta_x) >= self.width or abs(delta_y) >= self.height:
+            return
+        if delta_x < 0:
+            shift_x = 0
+            xend = self.width + delta_x
+            dt_x = 1
+        else:
+            shift_x = self.width - 1
+            xend = delta_x - 1
+            dt_x = -1
+        if delta_y < 0:
+            y = 0
+            yend = self.height + delta_y
+            dt_y = 1
+        else:
+            y = self.height - 1
+            yend = delta_y - 1
+            dt_y = -1
+        while y != yend:
+            x = shift_x
+            while x != xend:
+                self.set(x, y, self.get(x - delta_x, y - delta_y))
+                x += dt_x
+            y += dt_y
+
+    def text(self, string, x, y, color, font, size=1):     # pylint: disable=too-many-arguments
+    # font: the content of the font-file
+        font_width, font_height = font[0], font[1]
+        for chunk in string.split('\n'):
+            for i, char in enumerate(chunk):
+                char_x0 = x + (i * (font_width + 1)) * size
+                for char_x in range(font_width):
+                    line = font[2 + ord(char) * font_width + char_x]
+                    for char_y in range(font_height):
+                        if (line >> char_y) & 0x01:
+                            self.rect(char_x0 + char_x * size, y + char_y * size, size, size,
+                                      color, fill=True)
+            y += font_height * size
+
+    def colors(self, colors):
+    # load_colors: one color per pixel of the rotated buffer, row by row
+        width, height = self.width, self.height
+        if self.rotation & 1:
+            width, height = height, width
+        for y in range(height):
+            for x in range(width):
+                self.pixel(x, y, colors[y * width + x])
+
+
+def _difference(framebuf, reference):
+# first pixel in which the buffers differ as text, None if they are identical
+    if framebuf.buf == reference.buf:
+        return None
+    actual = Reference(framebuf.buf, reference.width, reference.height, reference.buf_format,
+                       reference.stride)
+    for y in range(reference.height):
+        for x in range(reference.width):
+            if actual.get(x, y) != reference.get(x, y):
+                return 'pixel (%d, %d) is %d, expected %d' % (x, y, actual.get(x, y),
+                                                               reference.get(x, y))
+    return 'bytes outside of the pixels differ'
+
+
+def _source(rnd, buf_format):
+# a small random FrameBuffer and its Reference (sharing the memory) to blit from
+    width = rnd.randint(1, 40)
+    height = rnd.randint(1, 24)
+    buf, stride = _buffer(width, height, buf_format)
+    buf[:] = _randbytes(rnd, len(buf))
+    return (pl_framebuf.FrameBuffer(buf, width, height, buf_format, stride),
+            Reference(buf, width, height, buf_format, stride))
+
+
+def _operation(rnd, framebuf, reference, font):     # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+# draws one random primitive into both, returns its description
+    width, height = framebuf.width, framebuf.height
+    if framebuf.rotation & 1:
+        width, height = height, width
+
+    def x_pos():
+        return rnd.randint(-16, width + 16)
+
+    def y_pos():
+        return rnd.randint(-16, height + 16)
+
+    color = rnd.randrange(4)
+    name = rnd.choice(('pixel', 'fill', 'fill_rect', 'rect', 'hline', 'vline', 'line', 'line',
+                       'circle', 'fill_circle', 'triangle', 'fill_triangle', 'polygon',
+                       'fill_polygon', 'set_pixels', 'set_row', 'blit', 'blit', 'scroll',
+                       'text', 'load_colors'))
+    if name == 'pixel':
+        args = (x_pos(), y_pos(), color)
+        framebuf.pixel(*args)
+        reference.pixel(*args)
+    elif name == 'fill':
+        args = (color,)
+        framebuf.fill(color)
+        reference.fill(color)
+    elif name in ('fill_rect', 'rect'):
+        args = (x_pos(), y_pos(), rnd.randint(-2, width // 2), rnd.randint(-2, height // 2), color)
+        getattr(framebuf, name)(*args)
+        reference.rect(*args, fill=name == 'fill_rect')
+    elif name == 'hline':
+        args = (x_pos(), y_pos(), rnd.randint(-2, width + 8), color)
+        framebuf.hline(*args)
+        reference.rect(args[0], args[1], args[2], 1, color, fill=True)
+    elif name == 'vline':
+        args = (x_pos(), y_pos(), rnd.randint(-2, height + 8), color)
+        framebuf.vline(*args)
+        reference.rect(args[0], args[1], 1, args[2], color, fill=True)
+    elif name == 'line':
+        args = (x_pos(), y_pos(), x_pos(), y_pos(), color)
+        if rnd.random() < 0.2:
+            args = (args[0], args[1], args[0], args[3], color)     # vertical
+        elif rnd.random() < 0.2:
+            args = (args[0], args[1], args[2], args[1], color)     # horizontal
+        framebuf.line(*args)
+        reference.line(*args)
+    elif name in ('circle', 'fill_circle'):
+        args = (x_pos(), y_pos(), rnd.randint(0, max(width, height) // 2), color)
+        getattr(framebuf, name)(*args)
+        reference.circle(*args, fill=name == 'fill_circle')
+    elif name in ('triangle', 'fill_triangle', 'polygon', 'fill_polygon'):
+        count = 3 if 'triangle' in name else rnd.randint(0, 7)
+        points = [(x_pos(), y_pos()) for _ in range(count)]
+        args = (points, color)
+        if 'triangle' in name:
+            getattr(framebuf, name)(*[c for point in points for c in point], color)
+        else:
+            getattr(framebuf, name)(points, color)
+        reference.polygon(points, color, fill=name.startswith('fill'))
+    elif name == 'set_pixels':
+        count = rnd.randint(0, 50)
+        xs = [x_pos() for _ in range(count)]
+        ys = [y_pos() for _ in range(count)]
+        args = (xs, ys, color)
+        framebuf.set_pixels(*args)
+        for i in range(count):
+            reference.pixel(xs[i], ys[i], color)
+    elif name == 'set_row':
+        values = bytes(rnd.randrange(4) for _ in range(rnd.randint(0, width + 8)))
+        args = (y_pos(), x_pos(), values)
+        framebuf.set_row(*args)
+        for i in range(len(values)):
+            reference.pixel(args[1] + i, args[0], values[i])
+    elif name == 'blit':
+        key = rnd.choice((None, None, 0, 1, 3))
+        if rnd.random() < 0.5 or framebuf.buf_format == pl_framebuf.GS4_HMSB:
+            # the same format, without key and palette the rows are copied as bit-runs
+            source, source_ref = _source(rnd, framebuf.buf_format)
+            if rnd.random() < 0.3:
+                # from itself, the source has to be read before it's overwritten
+                source = framebuf
+                source_ref = Reference(bytearray(reference.buf), reference.width,
+                                       reference.height, reference.buf_format, reference.stride)
+        else:
+            source, source_ref = _source(rnd, pl_framebuf.MHMSB)
+        palette = palette_arg = None
+        if rnd.random() < 0.3:
+            palette = palette_arg = [rnd.randrange(4) for _ in range(4)]
+            if rnd.random() < 0.5:
+                # given as FrameBuffer of height 1
+                buf, stride = _buffer(4, 1, pl_framebuf.GS4_HMSB)
+                palette_arg = pl_framebuf.FrameBuffer(buf, 4, 1, pl_framebuf.GS4_HMSB, stride)
+                for c in range(4):
+                    palette_arg.pixel(c, 0, palette[c])
+        args = (source.width, source.height, x_pos(), y_pos(), key, palette)
+        framebuf.blit(source, args[2], args[3], key, palette_arg)
+        reference.blit(source_ref, args[2], args[3], key, palette)
+    elif name == 'scroll':
+        args = (rnd.randint(-width, width), rnd.randint(-height, height))
+        if rnd.random() < 0.3:
+            args = (0, args[1])
+        elif rnd.random() < 0.3:
+            args = (args[0], 0)
+        framebuf.scroll(*args)
+        reference.scroll(*args)
+    elif name == 'text':
+        text = ''.join(rnd.choice('Hello world! 0123456789\n') for _ in range(rnd.randint(0, 20)))
+        args = (text, x_pos(), y_pos(), color, rnd.randint(1, 3))
+        framebuf.text(text, args[1], args[2], color, font_name=FONT, size=args[4])
+        reference.text(text, args[1], args[2], color, font, args[4])
+    else:
+        colors = bytes(rnd.randrange(4) for _ in range(width * height))
+        args = ()
+        framebuf.load_colors(colors)
+        reference.colors(colors)
+    return name, args
+
+
+def check_framebuf(panels, rounds, rnd, verbose=False):
+# runs ``rounds`` random primitives for every panel, format and rotation, returns the failures
+    with open(FONT, 'rb') as f:
+        font = f.read()
+    failures = []
+    for panel in panels:
+        width, height = pl_epdimage.PANELS[panel][0:2]
+        for buf_format, format_name in FORMATS:
+            for rotation in range(4):
+                buf, stride = _buffer(width, height, buf_format)
+                buf[:] = _randbytes(rnd, len(buf))
+                framebuf = pl_framebuf.FrameBuffer(buf, width, height, buf_format, stride)
+                framebuf.rotation = rotation
+                reference = Reference(bytearray(buf), width, height, buf_format, stride, rotation)
+                label = '%d %s rotation %d' % (panel, format_name, rotation)
+                for _ in range(rounds):
+                    name, args = _operation(rnd, framebuf, reference, font)
+                    difference = _difference(framebuf, reference)
+                    if difference:
+                        failures.append('%s: %s%r: %s' % (label, name, args, difference))
+                        break
+                if verbose:
+                    print('%-22s %s' % (label, 'FAILED' if difference else 'ok'))
+    return failures
+
+
+def reference_scramble(sourcebuffer):
+# scramble_array pixel by pixel for the current configuration of pl_scrambler
+    slcount = pl_scrambler.getslcount()
+    glcount = pl_scrambler.getglcount()
+    targetbuffer = bytearray(len(sourcebuffer))
+    for gl in range(glcount):
+        for sl in range(slcount):
+            target_pix = pl_scrambler.calc_scrambled_index(gl, sl, glcount, slcount)
+            source_pix = pl_scrambler.calc_pixel_index(gl, sl, slcount)
+            pixel = (sourcebuffer[source_pix // 4] >> ((3 - (source_pix & 0x03)) * 2)) & 0x03
+            shift = (3 - (target_pix & 0x03)) * 2
+            targetbuffer[target_pix // 4] = (targetbuffer[target_pix // 4] & ~(0x03 << shift)) | \
+                                            (pixel << shift)
+    return targetbuffer
+
+
+def _turned(buf):
+# the 2 bit pixels of buf in reverse order (the image turned by 180 degrees)
+    return bytes(((value & 0x03) << 6) | ((value & 0x0c) << 2) | ((value & 0x30) >> 2) | (value >> 6)
+                 for value in reversed(buf))
+
+
+def check_scrambling(panels, rnd, verbose=False):
+# scramble_array, scramble_buffer, scramble_stream and descramble_array against
+# reference_scramble for the panels and SCRAMBLINGS, unturned and turned by 180 degrees
+# (pl_scrambler.setrotation), returns the failures
+    failures = []
+    configs = [(pl_epdimage.PANELS[panel][2],) + tuple(pl_epdimage.PANELS[panel][0:2])
+               for panel in panels] + list(SCRAMBLINGS)
+    saved = (pl_scrambler.getscramblemode(), pl_scrambler.getslcount(), pl_scrambler.getglcount(),
+             pl_scrambler.getrotation())
+    try:
+        for (mode, slcount, glcount), rotation in [(config, rotation) for config in configs
+                                                   for rotation in (0, 2)]:
+            pl_scrambler.setscramblemode(mode)
+            pl_scrambler.setslcount(slcount)
+            pl_scrambler.setglcount(glcount)
+            pl_scrambler.setrotation(0)
+            source = _randbytes(rnd, slcount * glcount // 4)
+            expected = reference_scramble(_turned(source) if rotation else source)
+            pl_scrambler.setrotation(rotation)
+            size = slcount // 2
+            chunks = []
+            pl_scrambler.scramble_buffer(source, lambda chunk: chunks.append(bytes(chunk)))
+            streamed = []
+            pl_scrambler.scramble_stream(lambda pair: source[pair * size:(pair + 1) * size],
+                                         lambda chunk: streamed.append(bytes(chunk)))
+            # the image is returned as it is if it needs no scrambling
+            target = pl_scrambler.scramble_array(source, bytearray(len(source)))
+            label = 'scrambling 0x%03x %dx%d%s' % (mode, slcount, glcount,
+                                                   ' turned' if rotation else '')
+            for name, result in (('scramble_array', pl_scrambler.scramble_array(source)),
+                                 ('scramble_array(target)', target),
+                                 ('scramble_buffer', b''.join(chunks)),
+                                 ('scramble_stream', b''.join(streamed))):
+                if bytes(result) != bytes(expected):
+                    failures.append('%s: %s differs' % (label, name))
+            if bytes(pl_scrambler.descramble_array(expected)) != bytes(source):
+                failures.append('%s: descramble_array differs' % label)
+            if verbose:
+                print('%-22s %s' % (label, 'ok' if not failures or label not in failures[-1]
+                                    else 'FAILED'))
+    finally:
+        pl_scrambler.setscramblemode(saved[0])
+        pl_scrambler.setslcount(saved[1])
+        pl_scrambler.setglcount(saved[2])
+        pl_scrambler.setrotation(saved[3])
+    return failures
+
+
+def check_image(rounds, rnd, verbose=False):
+# FrameBuffer.image of random gray images (all four graylevels and the thresholds between
+# them) for every format and rotation against the graylevels set pixel by pixel: value >> 6
+# for GS4_HMSB, 1 for every level but black (gray values from 0x40 on) for the single bit
+# formats, returns the failures
+    failures = []
+    values = (0x00, 0x3f, 0x40, 0x7f, 0x80, 0xbf, 0xc0, 0xff)
+    for buf_format, name in FORMATS:
+        for rotation in range(4):
+            label = 'image %s rotation %d' % (name, rotation)
+            difference = None
+            for _ in range(rounds):
+                width, height = rnd.randint(1, 40), rnd.randint(1, 24)
+                if buf_format == pl_framebuf.GS4_HMSB:
+                    width = (width + 3) & ~0x03     # rows of the numpy-path start at full bytes
+                buf, stride = _buffer(width, height, buf_format)
+                framebuf = pl_framebuf.FrameBuffer(buf, width, height, buf_format, stride)
+                framebuf.rotation = rotation
+                reference = Reference(bytearray(buf), width, height, buf_format, stride, rotation)
+                image_width, image_height = (height, width) if rotation & 1 else (width, height)
+                gray = bytes(rnd.choice(values) for _ in range(image_width * image_height))
+                framebuf.image(Image.frombytes('L', (image_width, image_height), gray))
+                for y in range(image_height):
+                    for x in range(image_width):
+                        level = gray[y * image_width + x] >> 6
+                        if buf_format != pl_framebuf.GS4_HMSB:
+                            level = 1 if level else 0
+                        reference.pixel(x, y, level)
+                difference = _difference(framebuf, reference)
+                if difference:
+                    failures.append('%s: %s' % (label, difference))
+                    break
+            if verbose:
+                print('%-22s %s' % (label, 'FAILED' if difference else 'ok'))
+    return failures
+
+
+def _rle(indices, depth, rnd):
+# one row of palette-indices RLE8 (depth 8) or RLE4 (depth 4) compressed, runs of equal
+# values (RLE4: of two alternating values) encoded, others in absolute mode
+    data = bytearray()
+    i = 0
+    count = len(indices)
+    while i < count:
+        if depth == 8:
+            j = i
+            while j < count and indices[j] == indices[i] and j - i < 255:
+                j += 1
+            if j - i >= 3 or count - i < 3 or rnd.random() < 0.3:
+                data += bytes((j - i, indices[i]))
+                i = j
+                continue
+        elif count - i < 3 or rnd.random() < 0.5:
+            j = i
+            pattern = (indices[i], indices[i + 1] if i + 1 < count else 0)
+            while j < count and j - i < 255 and indices[j] == pattern[(j - i) & 0x01]:
+                j += 1
+            data += bytes((j - i, (pattern[0] << 4) | pattern[1]))
+            i = j
+            continue
+        # absolute mode: at least 3 pixel, padded to a 16-bit boundary
+        run = min(count - i, rnd.randint(3, 40))
+        if depth == 8:
+            values = bytes(indices[i:i + run])
+        else:
+            values = bytes((indices[k] << 4) | (indices[k + 1] if k + 1 < i + run else 0)
+                           for k in range(i, i + run, 2))
+        data += bytes((0, run)) + values + bytes(len(values) & 0x01)
+        i += run
+    return data
+
+
+def _gray(blue, green, red):
+    return ((blue + green + red) // 3) >> 6
+
+
+def _bmp(rnd, width, height):
+# a random bitmap-file as bytes, the graylevels of its rows (top to bottom) and its description
+    depth, compression = rnd.choice(((1, 0), (2, 0), (4, 0), (8, 0), (24, 0), (8, 1), (4, 2)))
+    topdown = not compression and rnd.random() < 0.5
+    if depth == 24:
+        palette = b''
+        rowsize = (width * 3 + 3) & ~0x03
+        rows = [_randbytes(rnd, width * 3) + bytes(rowsize - width * 3) for _ in range(height)]
+        levels = [[_gray(*row[3 * x:3 * x + 3]) for x in range(width)] for row in rows]
+    else:
+        colors = rnd.randint(1, 1 << depth)
+        palette = _randbytes(rnd, 4 * colors)
+        rows = []
+        levels = []
+        for _ in range(height):
+            # runs of the same index, so that RLE has something to compress
+            indices = []
+            while len(indices) < width:
+                indices += [rnd.randrange(colors)] * rnd.randint(1, 12)
+            del indices[width:]
+            levels.append([_gray(*palette[4 * i:4 * i + 3]) for i in indices])
+            if compression:
+                rows.append(_rle(indices, depth, rnd) + b'\x00\x00')
+            else:
+                bits = 0
+                for index in indices:
+                    bits = (bits << depth) | index
+                bits <<= (-width * depth) % 32
+                rows.append(bits.to_bytes(((width * depth + 31) // 32) * 4, 'big'))
+    if topdown:
+        data = b''.join(rows)
+    else:
+        data = b''.join(reversed(rows))
+    if compression:
+        data += b'\x00\x01'
+    offset = 54 + len(palette)
+    header = b'BM' + (offset + len(data)).to_bytes(4, 'little') + bytes(4) + \
+        offset.to_bytes(4, 'little') + (40).to_bytes(4, 'little') + \
+        width.to_bytes(4, 'little', signed=True) + \
+        (-height if topdown else height).to_bytes(4, 'little', signed=True) + \
+        (1).to_bytes(2, 'little') + depth.to_bytes(2, 'little') + \
+        compression.to_bytes(4, 'little') + len(data).to_bytes(4, 'little') + bytes(8) + \
+        (len(palette) // 4).to_bytes(4, 'little') + bytes(4)
+    description = '%dx%d %d bit%s%s' % (width, height, depth, ' RLE' if compression else '',
+                                         ' top-down' if topdown else '')
+    return header + palette + data, levels, description
+
+
+def _display(mono=False):
+# display wired like examples/simpletest.py
+    spi = busio.SPI(clock=board.SCK, MOSI=board.MOSI, MISO=board.MISO)
+    display = PL_UC8156(spi=spi, cs_pin=digitalio.DigitalInOut(board.D5),
+                        rst_pin=digitalio.DigitalInOut(board.D12),
+                        busy_pin=digitalio.DigitalInOut(board.D9), mono=mono)
+    display.begin(reset=False)
+    return display
+
+
+def check_bmp(panels, rounds, rnd, verbose=False):
+# PL_EPD.image_bmp of random files against the graylevels they were written from, for every
+# panel, rotation and both framebuffers of PL_UC8156, returns the failures
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'regress.bmp')
+        for panel in panels:
+            for mono in (False, True):
+                pl_sim.reset()
+                pl_sim.install(panel)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    display = _display(mono)
+                framebuf = display.getframebuf()
+                for rotation in range(4):
+                    display.setrotation(rotation)
+                    width = display._width      # pylint: disable=protected-access
+                    height = display._height    # pylint: disable=protected-access
+                    label = '%d %s rotation %d' % (panel, 'mono' if mono else 'gs4', rotation)
+                    for _ in range(rounds):
+                        data, levels, description = _bmp(rnd, rnd.randint(1, width + 8),
+                                                 rnd.randint(1, height + 8))
+                        with open(path, 'wb') as f:
+                            f.write(data)
+                        reference = Reference(bytearray(framebuf.buf), framebuf.width,
+                                              framebuf.height, framebuf.buf_format,
+                                              framebuf.stride, rotation)
+                        for y in range(min(len(levels), height)):
+                            for x in range(min(len(levels[y]), width)):
+                                reference.pixel(x, y, levels[y][x])
+                        display.image_bmp(path[1:])
+                        difference = _difference(framebuf, reference)
+                        if difference:
+                            failures.append('%s: image_bmp %s: %s' % (label, description, difference))
+                            break
+                    if verbose:
+                        print('%-22s %s' % (label, 'FAILED' if difference else 'ok'))
+                del display
+    pl_sim.reset()
+    return failures
+
+
+def check_bmp_stream(panels, rnd, verbose=False):
+# PL_UC8156.image_bmp_stream of full-size RLE-bitmaps against image_bmp for every panel at the
+# rotations 0 and 2. The stream needs the rows top-down, the file stores them bottom-up: every
+# row may be decoded twice at most (once on the way up, once from its own start), not from the
+# start of the file again. Returns the failures
+    failures = []
+    decodes = [0]
+    decode = pl_epd.BMPImage._decode_rle_row   # pylint: disable=protected-access
+
+    def counted(self):
+        decodes[0] += 1
+        decode(self)
+
+    pl_epd.BMPImage._decode_rle_row = counted  # pylint: disable=protected-access
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'regress.bmp')
+            for panel in panels:
+                pl_sim.reset()
+                chip = pl_sim.install(panel)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    display = _display()
+                for rotation in (0, 2):
+                    display.setrotation(rotation)
+                    width = display._width      # pylint: disable=protected-access
+                    height = display._height    # pylint: disable=protected-access
+                    label = '%d rotation %d' % (panel, rotation)
+                    description = ''
+                    while 'RLE' not in description:
+                        data, _, description = _bmp(rnd, width, height)
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                    display.getframebuf().fill(PL_UC8156.WHITE)
+                    display.image_bmp(path[1:])
+                    display.update(0)
+                    expected = chip.levels()
+                    decodes[0] = 0
+                    display.image_bmp_stream(path[1:])
+                    if chip.levels() != expected:
+                        failures.append('%s: image_bmp_stream %s differs' % (label, description))
+                    if decodes[0] > 2 * height:
+                        failures.append('%s: image_bmp_stream %s decoded %d rows of %d' %
+                                        (label, description, decodes[0], height))
+                    if verbose:
+                        print('%-22s %s' % (label, 'FAILED' if failures and label in failures[-1]
+                                            else 'ok'))
+                del display
+    finally:
+        pl_epd.BMPImage._decode_rle_row = decode   # pylint: disable=protected-access
+        pl_sim.reset()
+    return failures
+
+
+def check_streams(panels, rnd, verbose=False):
+# streams from broken files (a truncated *.epd-file made for the display, a truncated
+# RLE-bitmap) have to fail without leaving the SPI-bus locked: the next update has to show the
+# framebuffer. For every panel, returns the failures
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        epd = os.path.join(directory, 'regress.epd')
+        bmp = os.path.join(directory, 'regress.bmp')
+        for panel in panels:
+            panel_width, panel_height, mode = pl_epdimage.PANELS[panel]
+            header = pl_epdimage.EPDImageHeader(panel, panel_width, panel_height, mode)
+            with open(epd, 'wb') as f:
+                pl_epdimage.write(f, header, _randbytes(rnd, header.size))
+                f.truncate(pl_epdimage.HEADER_SIZE + header.size // 2)
+            description = ''
+            while 'RLE' not in description:
+                data, _, description = _bmp(rnd, panel_width, panel_height)
+            with open(bmp, 'wb') as f:
+                f.write(data[:len(data) // 2])
+            pl_sim.reset()
+            chip = pl_sim.install(panel)
+            with contextlib.redirect_stdout(io.StringIO()):
+                display = _display()
+            framebuf = display.getframebuf()
+            for name, call in (('image_epd', lambda: display.image_epd(epd[1:])),
+                               ('image_bmp_stream', lambda: display.image_bmp_stream(bmp[1:]))):
+                label = '%d %s' % (panel, name)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    call()
+                if not display._spi.try_lock():     # pylint: disable=protected-access
+                    failures.append('%s: SPI-bus left locked' % label)
+                    break
+                display._spi.unlock()               # pylint: disable=protected-access
+                for _ in range(8):
+                    framebuf.fill_rect(rnd.randrange(panel_width), rnd.randrange(panel_height),
+                                       rnd.randint(1, 40), rnd.randint(1, 40), rnd.randrange(4))
+                display.update(0)
+                if chip.levels() != bytes(framebuf.pixel(x, y) for y in range(panel_height)
+                                          for x in range(panel_width)):
+                    failures.append('%s: panel differs after the failed stream' % label)
+                if verbose:
+                    print('%-22s %s' % (label, 'FAILED' if failures and label in failures[-1]
+                                        else 'ok'))
+            del display
+    pl_sim.reset()
+    return failures
+
+
+def check_rotation(panels, rounds, rnd, verbose=False):
+# the panel-content after random drawing with the rotation done by the driver (sethwrotation)
+# against the content expected from a rotating framebuffer, for every panel, rotation and both
+# framebuffers of PL_UC8156, returns the failures
+    failures = []
+    for panel in panels:
+        panel_width, panel_height, _ = pl_epdimage.PANELS[panel]
+        for mono in (False, True):
+            pl_sim.reset()
+            chip = pl_sim.install(panel)
+            with contextlib.redirect_stdout(io.StringIO()):
+                display = _display(mono)
+            display.sethwrotation(True)
+            for rotation in (0, 1, 2, 3, 1):
+                display.setrotation(rotation)
+                framebuf = display.getframebuf()
+                width = display._width      # pylint: disable=protected-access
+                height = display._height    # pylint: disable=protected-access
+                label = '%d %s hw-rotation %d' % (panel, 'mono' if mono else 'gs4', rotation)
+                for _ in range(rounds):
+                    display.fill_rect(rnd.randrange(width), rnd.randrange(height),
+                                      rnd.randint(1, 40), rnd.randint(1, 40), rnd.randrange(4))
+                display.line(0, 0, width - 1, height // 3, PL_UC8156.BLACK)
+                display.update(2 if mono else 0)
+                expected = pl_framebuf.FrameBuffer(bytearray(panel_width * panel_height // 4),
+                                                   panel_width, panel_height, pl_framebuf.GS4_HMSB)
+                expected.rotation = rotation
+                for y in range(height):
+                    for x in range(width):
+                        color = framebuf.pixel(x, y)
+                        expected.pixel(x, y, (PL_UC8156.WHITE if color else 0) if mono else color)
+                if chip.levels() != bytes(expected.format.get_pixel(expected, x, y)
+                                          for y in range(panel_height) for x in range(panel_width)):
+                    failures.append('%s: panel differs' % label)
+                if verbose:
+                    print('%-22s %s' % (label, 'FAILED' if failures and label in failures[-1]
+                                        else 'ok'))
+            del display
+    pl_sim.reset()
+    return failures
+
+
+def _calibrate():
+# seconds of a fixed loop of plain Python (indexing and arithmetic like the drawing-code)
+    buf = bytearray(1024)
+    start = time.perf_counter()
+    for i in range(100000):
+        buf[i & 0x3ff] = (buf[(i * 7) & 0x3ff] + i) & 0xff
+    return time.perf_counter() - start
+
+
+def _primitives(panel):
+# the timed calls of TIMED as name -> func(rnd), on the 2 bit framebuffer of a simulated
+# display of ``panel``
+    pl_sim.reset()
+    pl_sim.install(panel)
+    with contextlib.redirect_stdout(io.StringIO()):
+        display = _display()
+    framebuf = display.getframebuf()
+    width, height, mode = pl_epdimage.PANELS[panel]
+    source = pl_framebuf.FrameBuffer(bytearray(32 * 32 // 4), 32, 32, pl_framebuf.GS4_HMSB)
+    colors = bytes(i & 0x03 for i in range(width * height))
+    picture = os.path.abspath(os.path.join(_TOOLS, '..', 'examples', 'TestPic_%din.bmp' % panel))
+    scrambled = bytearray(width * height // 4)
+
+    def scramble_array(_):
+        pl_scrambler.setscramblemode(mode)
+        pl_scrambler.setslcount(width)
+        pl_scrambler.setglcount(height)
+        pl_scrambler.scramble_array(framebuf.buf, scrambled)
+
+    return {
+        'fill': lambda rnd: framebuf.fill(rnd.randrange(4)),
+        'fill_rect': lambda rnd: framebuf.fill_rect(rnd.randrange(width), rnd.randrange(height),
+                                                    rnd.randint(1, width), rnd.randint(1, height),
+                                                    rnd.randrange(4)),
+        'line': lambda rnd: framebuf.line(rnd.randrange(width), rnd.randrange(height),
+                                          rnd.randrange(width), rnd.randrange(height),
+                                          rnd.randrange(4)),
+        'circle': lambda rnd: framebuf.circle(rnd.randrange(width), rnd.randrange(height),
+                                              rnd.randint(1, width // 2), rnd.randrange(4)),
+        'fill_circle': lambda rnd: framebuf.fill_circle(rnd.randrange(width), rnd.randrange(height),
+                                                        rnd.randint(1, width // 2), rnd.randrange(4)),
+        'fill_polygon': lambda rnd: framebuf.fill_polygon(
+            [(rnd.randrange(width), rnd.randrange(height)) for _ in range(5)], rnd.randrange(4)),
+        'text': lambda rnd: framebuf.text('Hello world! 0123456789', rnd.randrange(width),
+                                          rnd.randrange(height), rnd.randrange(4), font_name=FONT),
+        'blit': lambda rnd: framebuf.blit(source, rnd.randrange(width), rnd.randrange(height)),
+        'scroll': lambda rnd: framebuf.scroll(rnd.randint(-3, 3), rnd.randint(-3, 3)),
+        'set_row': lambda rnd: framebuf.set_row(rnd.randrange(height), 0, colors[:width]),
+        'load_colors': lambda rnd: framebuf.load_colors(colors),
+        'scramble_array': scramble_array,
+        'image_bmp': lambda rnd: display.image_bmp(picture[1:]),
+    }
+
+
+def timings(panel, repeat=7):
+# the time of the calls of TIMED relative to _calibrate(), which runs before each of the
+# ``repeat`` runs so that both see the same speed of the machine, best of the runs each
+    saved = (pl_scrambler.getscramblemode(), pl_scrambler.getslcount(), pl_scrambler.getglcount())
+    results = {}
+    try:
+        for name, func in _primitives(panel).items():
+            best = None
+            calibration = None
+            for _ in range(repeat):
+                seconds = _calibrate()
+                calibration = seconds if calibration is None else min(calibration, seconds)
+                rnd = random.Random(1)      # the same calls in every run
+                start = time.perf_counter()
+                for _ in range(TIMED[name]):
+                    func(rnd)
+                seconds = time.perf_counter() - start
+                best = seconds if best is None else min(best, seconds)
+            results[name] = round(best / calibration, 4)
+    finally:
+        pl_scrambler.setscramblemode(saved[0])
+        pl_scrambler.setslcount(saved[1])
+        pl_scrambler.setglcount(saved[2])
+        pl_sim.reset()
+    return results
+
+
+def check_timings(results, baseline, threshold):
+# prints the timings against the baseline, returns the primitives slower by more than
+# ``threshold`` percent
+    failures = []
+    print('%-15s %10s %10s %9s' % ('primitive', 'time', 'baseline', 'change'))
+    for name in sorted(results):
+        before = baseline.get(name)
+        change = ''
+        if before:
+            percent = (results[name] / before - 1) * 100
+            change = '%+.1f%%' % percent
+            if percent > threshold:
+                failures.append('%s: %.1f%% slower than the baseline' % (name, percent))
+                change += ' !'
+        print('%-15s %10.3f %10s %9s' % (name, results[name],
+                                         '%.3f' % before if before else '-', change))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compares the drawing-functions with per-pixel references and checks their timings.')
+    parser.add_argument('--panel', type=int, nargs='+', choices=sorted(pl_epdimage.PANELS))
+    parser.add_argument('--seed', type=int, default=1, help='seed of the random inputs')
+    parser.add_argument('--rounds', type=int, default=40,
+                        help='random calls per panel, format and rotation')
+    parser.add_argument('--threshold', type=float, default=50,
+                        help='percent a primitive may be slower than its baseline')
+    parser.add_argument('--repeat', type=int, default=7, help='timed runs of each primitive')
+    parser.add_argument('--baseline', default=BASELINE, help='JSON-file of the timings')
+    parser.add_argument('--no-timing', action='store_true', help='only the equivalence-checks')
+    parser.add_argument('--update', action='store_true', help='store the timings as baseline')
+    parser.add_argument('-v', '--verbose', action='store_true', help='result of every setup')
+    options = parser.parse_args(argv)
+
+    panels = options.panel or sorted(pl_epdimage.PANELS)
+    rnd = random.Random(options.seed)
+    failures = check_framebuf(panels, options.rounds, rnd, options.verbose)
+    failures += check_scrambling(panels, rnd, options.verbose)
+    failures += check_bmp(panels, max(1, options.rounds // 10), rnd, options.verbose)
+    failures += check_image(max(1, options.rounds // 10), rnd, options.verbose)
+    failures += check_bmp_stream(panels, rnd, options.verbose)
+    failures += check_streams(panels, rnd, options.verbose)
+    failures += check_rotation(panels, options.rounds, rnd, options.verbose)
+    print('equivalence: %s' % ('%d FAILED' % len(failures) if failures else 'ok'))
+
+    if not options.no_timing:
+        # the largest panel gives the most stable timings
+        panel = max(panels, key=lambda p: pl_epdimage.PANELS[p][0] * pl_epdimage.PANELS[p][1])
+        results = timings(panel, options.repeat)
+        baseline = {}
+        if os.path.exists(options.baseline):
+            with open(options.baseline) as f:
+                baseline = json.load(f).get(str(panel), {})
+        if options.update:
+            stored = {}
+            if os.path.exists(options.baseline):
+                with open(options.baseline) as f:
+                    stored = json.load(f)
+            stored[str(panel)] = results
+            with open(options.baseline, 'w') as f:
+                json.dump(stored, f, indent=1, sort_keys=True)
+            print('baseline of panel %d written to %s' % (panel, options.baseline))
+        failures += check_timings(results, baseline, options.threshold)
+
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_sim' - display simulator
+# ====================================================
+# Runs the unmodified drivers of src/ under CPython (with Pillow for rendering). The modules
+# in tools/pl_sim/hw stand in for board, busio, digitalio and micropython, SPI-transfers and
+# pin-levels go to a model of the UC8156 driver-chip (see pl_sim.uc8156).
+#
+# usage (tools/ on the path):
+#   import pl_sim
+#   chip = pl_sim.install(panel=21)        # before the drivers are imported
+#   ... set up PL_UC8156 with board.D5/ D12/ D9 like examples/simpletest.py and draw ...
+#   chip.render().save('panel.png')
+# or run a CircuitPython-script and save what it shows on the panel:
+#   python3 tools/pl_sim examples/simpletest.py --panel 21 -o panel.png
+# * Author(s): pl-micro-epd contributors
+
+import os
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+for _path in (os.path.join(_HERE, 'hw'), os.path.join(_HERE, '..', '..', 'src')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import board                                                    # pylint: disable=wrong-import-position
+from .uc8156 import UC8156, SPIBus, RealClock, VirtualClock, TIMINGS    # pylint: disable=wrong-import-position
+
+
+# the bus of the simulated board, created by the first install()
+bus = None
+# board-pins connected by install()
+_pins = []
+
+
+def install(panel=21, *, clock=None, cs='D5', rst='D12', busy='D9', timings=None):     # pylint: disable=too-many-arguments
+# Connects a simulated display with the panel ``panel`` (epdsize) to the pins ``cs``, ``rst``
+# and ``busy`` (names of board-pins, the wiring of the examples by default) and to the SPI-bus
+# at board.SCK. The first call sets the clock of the bus (VirtualClock by default), further
+# calls add displays to the same bus. Returns the chip-model.
+    global bus      # pylint: disable=global-statement
+    if bus is None:
+        bus = SPIBus(clock or VirtualClock())
+        board.SCK.device = bus
+    pins = [getattr(board, name) if name else None for name in (cs, rst, busy)]
+    chip = UC8156(panel, bus.clock, cs=pins[0], rst=pins[1], busy=pins[2], timings=timings)
+    for pin in pins:
+        if pin is not None:
+            pin.device = chip
+            _pins.append(pin)
+    bus.chips.append(chip)
+    return chip
+
+
+def reset():
+# disconnects all simulated displays and the bus, the next install() starts a new board
+    global bus      # pylint: disable=global-statement
+    for pin in _pins:
+        pin.device = None
+    del _pins[:]
+    board.SCK.device = None
+    bus = None
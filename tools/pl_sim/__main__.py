@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# runs a CircuitPython-script (e.g. examples/simpletest.py) against a simulated display and
+# saves what the panel shows at the end
+#
+# usage: python3 tools/pl_sim examples/simpletest.py --panel 21 -o panel.png
+
+import argparse
+import os
+import runpy
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import pl_sim       # pylint: disable=wrong-import-position
+import pl_epdimage  # pylint: disable=wrong-import-position,wrong-import-order
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs a script with a simulated Plastic Logic display.')
+    parser.add_argument('script', help='CircuitPython-script, run in its own directory')
+    parser.add_argument('--panel', type=int, default=21, choices=sorted(pl_epdimage.PANELS))
+    parser.add_argument('--realtime', action='store_true', help='wait for the busy-times of the display')
+    parser.add_argument('-o', '--output', default='panel.png', help='image of the panel')
+    options = parser.parse_args(argv)
+
+    clock = pl_sim.RealClock() if options.realtime else pl_sim.VirtualClock()
+    chip = pl_sim.install(options.panel, clock=clock)
+    output = os.path.abspath(options.output)
+    script = os.path.abspath(options.script)
+    os.chdir(os.path.dirname(script))
+    start = clock.now()
+    sys.path.insert(0, os.path.dirname(script))
+    runpy.run_path(script, run_name='__main__')
+    chip.render().save(output)
+    print('%d updates, %.2f s display-time, panel saved to %s' % (chip.updates, clock.now() - start, output))
+    for warning in chip.warnings:
+        print('warning:', warning)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# 'board' stand-in of pl_sim for running the drivers under CPython
+# The pins are plain objects, pl_sim.install connects the ones used by a simulated display
+# (``device``) to the SPI-bus or to the driver-chip model.
+
+
+class Pin:
+
+    def __init__(self, name):
+        self.name = name
+        self.device = None      # model handling the level of the pin, None if unconnected
+
+    def __repr__(self):
+        return 'board.' + self.name
+
+
+SCK = Pin('SCK')
+MOSI = Pin('MOSI')
+MISO = Pin('MISO')
+TX = Pin('TX')
+RX = Pin('RX')
+SDA = Pin('SDA')
+SCL = Pin('SCL')
+D0 = Pin('D0')
+D1 = Pin('D1')
+D2 = Pin('D2')
+D3 = Pin('D3')
+D4 = Pin('D4')
+D5 = Pin('D5')
+D6 = Pin('D6')
+D7 = Pin('D7')
+D8 = Pin('D8')
+D9 = Pin('D9')
+D10 = Pin('D10')
+D11 = Pin('D11')
+D12 = Pin('D12')
+D13 = Pin('D13')
+A0 = Pin('A0')
+A1 = Pin('A1')
+A2 = Pin('A2')
+A3 = Pin('A3')
+A4 = Pin('A4')
+A5 = Pin('A5')
@@ -0,0 +1,54 @@
+# 'busio' stand-in of pl_sim for running the drivers under CPython
+# An SPI-object talks to the simulated bus connected to its clock-pin (see pl_sim.install),
+# which hands the bytes to the driver-chip(s) selected by their chip-select pin.
+
+
+class SPI:
+
+    def __init__(self, clock, MOSI=None, MISO=None):     # pylint: disable=invalid-name
+        self._bus = clock.device
+        self._locked = False
+        self.frequency = 100000
+        self.polarity = 0
+        self.phase = 0
+        self.bits = 8
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def configure(self, *, baudrate=100000, polarity=0, phase=0, bits=8):
+        self.frequency = baudrate
+        self.polarity = polarity
+        self.phase = phase
+        self.bits = bits
+
+    def write(self, buffer, *, start=0, end=None):
+        if not self._locked:
+            raise RuntimeError('SPI not locked')
+        if self._bus is not None:
+            self._bus.write(self, bytes(buffer[start:end]))
+
+    def readinto(self, buffer, *, start=0, end=None, write_value=0):
+        if not self._locked:
+            raise RuntimeError('SPI not locked')
+        if end is None:
+            end = len(buffer)
+        if self._bus is None:
+            for i in range(start, end):
+                buffer[i] = 0xff
+            return
+        buffer[start:end] = self._bus.read(self, end - start, write_value)
+
+    def write_readinto(self, buffer_out, buffer_in, *, out_start=0, out_end=None,   # pylint: disable=too-many-arguments
+                       in_start=0, in_end=None):
+        self.write(buffer_out, start=out_start, end=out_end)
+        self.readinto(buffer_in, start=in_start, end=in_end)
+
+    def deinit(self):
+        self._bus = None
@@ -0,0 +1,58 @@
+# 'digitalio' stand-in of pl_sim for running the drivers under CPython
+# Levels of connected pins (see board.Pin.device) are set on/ read from the driver-chip model,
+# unconnected pins just keep their value.
+
+
+class Direction:
+    INPUT = 0
+    OUTPUT = 1
+
+
+class Pull:
+    UP = 1
+    DOWN = 2
+
+
+class DriveMode:
+    PUSH_PULL = 0
+    OPEN_DRAIN = 1
+
+
+class DigitalInOut:
+
+    def __init__(self, pin):
+        self._pin = pin
+        self._value = False
+        self.direction = Direction.INPUT
+        self.pull = None
+        self.drive_mode = DriveMode.PUSH_PULL
+
+    @property
+    def value(self):
+        if self._pin.device is not None:
+            return self._pin.device.get_pin(self._pin)
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = bool(value)
+        if self._pin.device is not None:
+            self._pin.device.set_pin(self._pin, self._value)
+
+    def switch_to_output(self, value=False, drive_mode=DriveMode.PUSH_PULL):
+        self.direction = Direction.OUTPUT
+        self.drive_mode = drive_mode
+        self.value = value
+
+    def switch_to_input(self, pull=None):
+        self.direction = Direction.INPUT
+        self.pull = pull
+
+    def deinit(self):
+        self._pin = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.deinit()
@@ -0,0 +1,6 @@
+# 'micropython' stand-in of pl_sim for running the drivers under CPython
+
+
+def const(value):
+# compile-time constants are plain values under CPython
+    return value
@@ -0,0 +1,367 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2026 The pl-micro-epd contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# 'pl_sim.uc8156' - model of the UC8156 driver-chip
+# ====================================================
+# Behaves on the simulated SPI-bus like the driver-chip does for src/pl_uc8156.py:
+# - commands are framed by the chip-select pin, the first byte is the register (bit 7 set
+#   for reads), the following bytes its data
+# - register values are kept, the revision, status and MTP registers can be read
+# - WRITERAM fills the display-RAM (240x160 pixel, 2 bit) inside the window of WRITEPXRECTSET,
+#   starting at PIXELACESSPOS. DATENTRYMODE bit 0 counts the source lines down, bit 1 the
+#   gate lines (the driver uses 0x00 and 0x02, the other bits aren't modelled)
+# - DISPLAYENGINE copies the RAM to the panel (BLACK/ WHITE only with the mono waveform,
+#   PROGRAMMTP 0x02), while the busy-pin is low for the duration of the update
+# The panel-ID in the MTP selects one of the displays of pl_epdimage.PANELS.
+# * Author(s): pl-micro-epd contributors
+
+import time
+
+import pl_epdimage
+import pl_scrambler
+
+
+REVISION = 0x00
+POWERCONTROL = 0x03
+WRITEPXRECTSET = 0x0d
+PIXELACESSPOS = 0x0e
+DATENTRYMODE = 0x0f
+WRITERAM = 0x10
+DISPLAYENGINE = 0x14
+STATUS = 0x15
+SOFTWARERESET = 0x20
+SLEEPMODE = 0x21
+PROGRAMMTP = 0x40
+MTPADDRESSSETTING = 0x41
+MTPREAD = 0x43
+
+RAM_WIDTH = 240
+RAM_HEIGHT = 160
+
+# address of the panel-ID (two ASCII-characters, e.g. b'21') in the MTP
+MTP_PANEL_ID = 0x04f2
+
+# busy-times in seconds: after a reset, until the voltage-pumps are ready, power down and
+# the updates with the normal and the mono waveform
+TIMINGS = {
+    'reset': 0.002,
+    'power_up': 0.005,
+    'power_down': 0.07,
+    'update': 0.8,
+    'update_mono': 0.25,
+}
+
+# 2 bit pixels of a RAM-byte shown with the mono waveform: dark gray and black get black,
+# light gray and white get white
+_MONO = bytes(sum((0x03 if (value >> shift) & 0x02 else 0x00) << shift for shift in (0, 2, 4, 6))
+              for value in range(256))
+
+
+class RealClock:
+    # the time of the host: the driver really waits for busy-periods, scaled by ``scale``
+    # (0: the chip is never busy)
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+
+    def now(self):
+        return time.monotonic()
+
+    def after(self, seconds):
+    # point in time ``seconds`` of chip-time from now
+        return self.now() + seconds * self.scale
+
+    def wait(self, until):
+    # called when the driver polls for a point in time, real time passes on its own
+        pass
+
+    def spend(self, seconds):
+    # called for the duration of SPI-transfers, real time passes on its own
+        pass
+
+
+class VirtualClock:
+    # simulated time: SPI-transfers advance it, and polling for the end of a busy-period jumps
+    # to it. Nothing is waited for, ``now()`` is the time the display would have needed.
+
+    def __init__(self):
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+    def after(self, seconds):
+        return self.time + seconds
+
+    def wait(self, until):
+        if until > self.time:
+            self.time = until
+
+    def spend(self, seconds):
+        self.time += seconds
+
+
+class SPIBus:
+    # the SPI-bus of the simulated board, bytes go to every chip with its chip-select low
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.chips = []
+
+    def write(self, spi, data):
+        self.clock.spend(len(data) * spi.bits / spi.frequency)
+        for chip in self.chips:
+            if chip.selected:
+                chip.receive(data)
+
+    def read(self, spi, count, write_value=0):      # pylint: disable=unused-argument
+        self.clock.spend(count * spi.bits / spi.frequency)
+        for chip in self.chips:
+            if chip.selected:
+                return chip.transmit(count)
+        return bytes([0xff] * count)
+
+
+class UC8156:
+    # model of one driver-chip with the panel ``panel`` (epdsize, see pl_epdimage.PANELS)
+
+    def __init__(self, panel, clock, *, cs=None, rst=None, busy=None, timings=None):     # pylint: disable=too-many-arguments
+        if panel not in pl_epdimage.PANELS:
+            raise ValueError('Unknown panel %r' % (panel,))
+        self.panel = panel
+        self.width, self.height, self.scramblemode = pl_epdimage.PANELS[panel]
+        self.clock = clock
+        self.timings = dict(TIMINGS)
+        if timings:
+            self.timings.update(timings)
+        self._cs = cs
+        self._rst = rst
+        self._busy = busy
+        self.mtp = bytearray(0x800)
+        self.mtp[MTP_PANEL_ID:MTP_PANEL_ID + 2] = str(panel).encode()
+        self.revision = 0x56
+        self.ram = bytearray(RAM_WIDTH * RAM_HEIGHT // 4)
+        self.screen = bytearray(len(self.ram))      # RAM-content shown on the panel
+        self.updates = 0            # display-updates run so far
+        self.warnings = []          # commands the real chip would not have executed
+        self.selected = False
+        self.reset()
+
+    def reset(self):
+    # state after a hardware-reset (the RAM and panel keep their content)
+        self.registers = {}
+        self.asleep = False
+        self.powered = False
+        self._power_ready = 0.0
+        self._busy_until = self.clock.after(self.timings['reset'])
+        self._in_reset = False
+        self._command = None
+        self._data = bytearray()
+        self._mtp_address = 0
+        self._mtp_dummy = True
+        self._x = 0
+        self._y = 0
+
+    # pins
+
+    def set_pin(self, pin, value):
+        if pin is self._cs:
+            if not value:
+                self.selected = True
+                self._command = None
+                self._data = bytearray()
+            elif self.selected:
+                self.selected = False
+                if self._command is not None:
+                    self._execute(self._command, self._data)
+        elif pin is self._rst:
+            if not value:
+                self._in_reset = True
+            elif self._in_reset:
+                self.reset()
+
+    def get_pin(self, pin):
+        if pin is self._busy:
+            # low while busy, polling waits for the end (see VirtualClock)
+            self.clock.wait(self._busy_until)
+            return self.clock.now() >= self._busy_until
+        if pin is self._cs:
+            return not self.selected
+        return not self._in_reset
+
+    @property
+    def busy(self):
+        return self.clock.now() < self._busy_until
+
+    # SPI
+
+    def receive(self, data):
+    # bytes written while selected
+        if self._command is None:
+            self._command = data[0]
+            data = data[1:]
+            if not self.asleep and self._command == WRITERAM:
+                self._x, self._y = self.registers.get(PIXELACESSPOS, b'\x00\x00')[:2]
+        if self._command == WRITERAM:
+            self._write_ram(data)
+        else:
+            self._data += data
+
+    def transmit(self, count):
+    # bytes read while selected
+        register = (self._command or 0) & 0x7f
+        if self._command is None or not self._command & 0x80:
+            self.warnings.append('read without read-command')
+            return bytes(count)
+        if register == REVISION:
+            value = self.revision
+        elif register == STATUS:
+            # voltage-pumps ready, polled by the driver after power up
+            self.clock.wait(self._power_ready)
+            value = 0x01 if self.powered and self.clock.now() >= self._power_ready else 0x00
+        elif register == MTPREAD:
+            # the first byte after setting the address is a dummy
+            if self._mtp_dummy:
+                self._mtp_dummy = False
+                return bytes(count)
+            data = bytes(self.mtp[(self._mtp_address + i) % len(self.mtp)] for i in range(count))
+            self._mtp_address += count
+            return data
+        else:
+            value = self.registers.get(register, b'\x00')[0]
+        return bytes([value] * count)
+
+    def _execute(self, command, data):
+    # a write-command with all of its data, at the end of the transfer
+        if command & 0x80:
+            return
+        if self.asleep:
+            self.warnings.append('command 0x%02x in sleep mode' % command)
+            return
+        if self.busy:
+            self.warnings.append('command 0x%02x while busy' % command)
+        data = bytes(data)
+        if command != WRITERAM:
+            self.registers[command] = data
+        if command == POWERCONTROL and data:
+            if data[0] & 0x01:
+                if not self.powered:
+                    self._power_ready = self.clock.after(self.timings['power_up'])
+                self.powered = True
+            elif self.powered:
+                self.powered = False
+                self._busy_until = self.clock.after(self.timings['power_down'])
+        elif command == DISPLAYENGINE and data and data[0] & 0x01:
+            self._update()
+        elif command == MTPADDRESSSETTING and len(data) >= 2:
+            self._mtp_address = data[0] | (data[1] << 8)
+            self._mtp_dummy = True
+        elif command == SOFTWARERESET:
+            self.reset()
+        elif command == SLEEPMODE:
+            self.asleep = True
+
+    def _window(self):
+    # (x0, x1, y0, y1) of WRITEPXRECTSET, the whole RAM by default
+        window = self.registers.get(WRITEPXRECTSET, b'')
+        if len(window) < 4:
+            return 0, RAM_WIDTH - 1, 0, RAM_HEIGHT - 1
+        return tuple(window[:4])
+
+    def _write_ram(self, data):
+        if self.asleep:
+            return
+        x_0, x_1, y_0, y_1 = self._window()
+        entry = self.registers.get(DATENTRYMODE, b'\x00')[0]
+        d_x = -4 if entry & 0x01 else 4
+        d_y = -1 if entry & 0x02 else 1
+        ram = self.ram
+        x, y = self._x, self._y
+        for value in data:
+            if 0 <= x < RAM_WIDTH and 0 <= y < RAM_HEIGHT:
+                ram[y * (RAM_WIDTH // 4) + (x >> 2)] = value
+            x += d_x
+            if x > x_1 or x < x_0:
+                x = x_0 if d_x > 0 else x_1 & ~0x03
+                y += d_y
+                if y > y_1:
+                    y = y_0
+                elif y < y_0:
+                    y = y_1
+        self._x, self._y = x, y
+
+    def _update(self):
+        if not self.powered or self.clock.now() < self._power_ready:
+            self.warnings.append('display update without power')
+            return
+        mono = self.registers.get(PROGRAMMTP, b'\x00')[0] & 0x02
+        if mono:
+            self.screen[:] = self.ram.translate(_MONO)
+        else:
+            self.screen[:] = self.ram
+        self.updates += 1
+        self._busy_until = self.clock.after(self.timings['update_mono' if mono else 'update'])
+
+    # rendering
+
+    def stream(self, ram=False):
+    # content of the panel (or of the RAM) in the order written by the driver, i.e. the
+    # scrambled image-data
+        source = self.ram if ram else self.screen
+        x_0, x_1, y_0, y_1 = self._window()
+        entry = self.registers.get(DATENTRYMODE, b'\x00')[0]
+        columns = range(x_0 >> 2, (x_1 >> 2) + 1)
+        if entry & 0x01:
+            columns = columns[::-1]
+        rows = range(y_0, y_1 + 1)
+        if entry & 0x02:
+            rows = rows[::-1]
+        data = bytearray()
+        for y in rows:
+            line = y * (RAM_WIDTH // 4)
+            data += bytes(source[line + column] for column in columns)
+        return data
+
+    def levels(self, ram=False):
+    # graylevels (0...3) of the panel (or RAM) as bytes, width * height, descrambled into the
+    # orientation of the driver's framebuffer
+        data = self.stream(ram)[:self.width * self.height // 4]
+        config = (pl_scrambler.getscramblemode(), pl_scrambler.getslcount(), pl_scrambler.getglcount(),
+                  pl_scrambler.getrotation())
+        pl_scrambler.setscramblemode(self.scramblemode)
+        pl_scrambler.setslcount(self.width)
+        pl_scrambler.setglcount(self.height)
+        pl_scrambler.setrotation(0)
+        try:
+            data = pl_scrambler.descramble_array(data)
+        finally:
+            pl_scrambler.setscramblemode(config[0])
+            pl_scrambler.setslcount(config[1])
+            pl_scrambler.setglcount(config[2])
+            pl_scrambler.setrotation(config[3])
+        return bytes((value >> shift) & 0x03 for value in data for shift in (6, 4, 2, 0))
+
+    def render(self, ram=False):
+    # the panel (or RAM) as PIL-image in mode 'L', the four graylevels as 0, 85, 170 and 255
+        from PIL import Image     # pylint: disable=import-outside-toplevel
+        return Image.frombytes('L', (self.width, self.height),
+                               bytes(level * 85 for level in self.levels(ram)))